@@ -0,0 +1,217 @@
+import collections
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager, redirect_stdout
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    import pymupdf
+
+# The PDF engines are imported on first use: pymupdf alone takes a quarter of
+# a second and the layout model several times that, which tools working on
+# cached layout JSON should not pay for.
+
+DEFAULT_BACKEND = "pymupdf4llm"
+
+# A text block counts as a section header when all of it is bold or set at
+# least this much larger than the page's body text, and it is this short.
+_HEADER_SIZE_RATIO = 1.2
+_HEADER_MAX_LINES = 2
+
+
+class LayoutBackend(Protocol):
+    """Turns PDF pages into the page dicts extract_from_pages() consumes.
+
+    Each page dict has page_number (1-based), width, height and boxes; each box
+    has x0, y0, x1, y1, boxclass ("text", "section-header", "table", ...),
+    textlines (list of {"bbox", "spans": [{"text", ...}]}) or None, and table
+    ({"extract": rows of cell strings, ...}) or None.
+    """
+
+    name: str
+    ocr: bool  # whether layout may OCR images, finding numbers the text layer lacks
+
+    def version(self) -> str:
+        """Engine version string, part of the layout cache key."""
+        ...
+
+    def layout(self, doc: "str | pymupdf.Document", pages: list[int] | None) -> list[dict]:
+        """Lay out the given 0-based page indices (None = all pages)."""
+        ...
+
+
+def _dist_version(dist: str) -> str:
+    """"dist=version" read from package metadata, without importing the package."""
+    import importlib.metadata
+
+    try:
+        return f"{dist}={importlib.metadata.version(dist)}"
+    except importlib.metadata.PackageNotFoundError:
+        return f"{dist}=?"
+
+
+class Pymupdf4llmBackend:
+    """The pymupdf4llm / PyMuPDF-Layout model: slow, but finds borderless tables."""
+
+    name = "pymupdf4llm"
+    ocr = True  # parse_document()'s use_ocr default, when Tesseract is installed
+
+    def version(self) -> str:
+        return f"{_dist_version('pymupdf4llm')},{_dist_version('pymupdf')}"
+
+    def layout(self, doc, pages):
+        import pymupdf.layout  # noqa: F401 — activate PyMuPDF-Layout before pymupdf4llm
+        import pymupdf4llm
+
+        # pymupdf4llm prints notices such as "OCR disabled ..." to stdout,
+        # where they would corrupt JSONL streamed there
+        with redirect_stdout(sys.stderr):
+            parsed = pymupdf4llm.parse_document(doc, pages=pages)
+        return [_page_dict(page) for page in parsed.pages]
+
+
+def _page_dict(page) -> dict:
+    """Shallow dict view of a pymupdf4llm PageLayout in its JSON shape.
+
+    Boxes are the LayoutBox instance dicts themselves (no copy). The heavy
+    fulltext/words/links fields are dropped: extraction never reads them.
+    """
+    return {
+        "page_number": page.page_number,
+        "width": page.width,
+        "height": page.height,
+        "boxes": [vars(box) for box in page.boxes],
+    }
+
+
+class NativeBackend:
+    """Plain PyMuPDF: find_tables() for ruled tables, get_text("dict") blocks for text.
+
+    Much faster than the layout model. Tables without ruling lines come out as
+    text blocks, and section headers are guessed from bold or large fonts.
+    """
+
+    name = "native"
+    ocr = False
+
+    def version(self) -> str:
+        return _dist_version("pymupdf")
+
+    def layout(self, doc, pages):
+        import pymupdf
+
+        if isinstance(doc, str):
+            with pymupdf.open(doc) as opened:
+                return self.layout(opened, pages)
+        indices = range(doc.page_count) if pages is None else pages
+        with _layout_model_disabled():
+            return [_native_page(doc[i]) for i in indices]
+
+
+@contextmanager
+def _layout_model_disabled() -> Iterator[None]:
+    """Restore plain PyMuPDF text extraction for the duration.
+
+    Importing pymupdf.layout and pymupdf4llm makes find_tables() run the layout
+    model first and turns off quad corrections, which is slow and splits cell
+    text like "1,655.9" apart.
+    """
+    import pymupdf
+
+    saved_layout = pymupdf._get_layout
+    saved_quads = pymupdf.TOOLS.unset_quad_corrections()
+    pymupdf._get_layout = None
+    pymupdf.TOOLS.unset_quad_corrections(False)
+    try:
+        yield
+    finally:
+        pymupdf._get_layout = saved_layout
+        pymupdf.TOOLS.unset_quad_corrections(saved_quads)
+
+
+def _native_page(page: "pymupdf.Page") -> dict:
+    import pymupdf
+
+    boxes = []
+    table_rects = []
+    for table in page.find_tables().tables:
+        rect = pymupdf.Rect(table.bbox)
+        table_rects.append(rect)
+        boxes.append({
+            "x0": rect.x0, "y0": rect.y0, "x1": rect.x1, "y1": rect.y1,
+            "boxclass": "table", "image": None, "textlines": None,
+            "table": {
+                "bbox": list(rect),
+                "row_count": table.row_count,
+                "col_count": table.col_count,
+                "cells": table.cells,
+                "extract": table.extract(),
+            },
+        })
+
+    blocks = [
+        b for b in page.get_text("dict", sort=True)["blocks"]
+        if b["type"] == 0 and not any(_center(b["bbox"]) in r for r in table_rects)
+    ]
+    body_size = _body_font_size(blocks)
+    for block in blocks:
+        lines = [
+            {"bbox": pymupdf.Rect(line["bbox"]), "spans": line["spans"]}
+            for line in block["lines"] if line["spans"]
+        ]
+        if not lines:
+            continue
+        x0, y0, x1, y1 = block["bbox"]
+        boxes.append({
+            "x0": x0, "y0": y0, "x1": x1, "y1": y1,
+            "boxclass": "section-header" if _is_header(lines, body_size) else "text",
+            "image": None, "textlines": lines, "table": None,
+        })
+
+    return {
+        "page_number": page.number + 1,
+        "width": page.rect.width,
+        "height": page.rect.height,
+        "boxes": boxes,
+    }
+
+
+def _center(bbox) -> "pymupdf.Point":
+    import pymupdf
+
+    x0, y0, x1, y1 = bbox
+    return pymupdf.Point((x0 + x1) / 2, (y0 + y1) / 2)
+
+
+def _body_font_size(blocks: list[dict]) -> float:
+    """The font size covering the most characters on the page."""
+    sizes = collections.Counter()
+    for block in blocks:
+        for line in block["lines"]:
+            for span in line["spans"]:
+                sizes[round(span["size"], 1)] += len(span["text"].strip())
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def _is_header(lines: list[dict], body_size: float) -> bool:
+    import pymupdf
+
+    spans = [s for line in lines for s in line["spans"] if s["text"].strip()]
+    if not spans or len(lines) > _HEADER_MAX_LINES:
+        return False
+    bold = all(s["flags"] & pymupdf.TEXT_FONT_BOLD for s in spans)
+    large = min(s["size"] for s in spans) >= body_size * _HEADER_SIZE_RATIO
+    return bold or large
+
+
+BACKENDS: dict[str, LayoutBackend] = {
+    backend.name: backend for backend in (Pymupdf4llmBackend(), NativeBackend())
+}
+
+
+def get_backend(name: str) -> LayoutBackend:
+    """Look up a backend by name, raising ValueError for unknown names."""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown layout backend {name!r} (choose from {', '.join(BACKENDS)})") from None
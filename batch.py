@@ -0,0 +1,211 @@
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import pathlib
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import TextIO, TypedDict
+
+from backends import BACKENDS, DEFAULT_BACKEND
+from cache import DEFAULT_CACHE_DIR, DiskCache
+from extract import extract_from_pdf
+from results import ExtractionResult
+
+logger = logging.getLogger(__name__)
+
+
+class FileResult(TypedDict):
+    path: str
+    pages: int
+    seconds: float
+    numbers: ExtractionResult
+    error: str | None
+
+
+def collect_pdfs(inputs: list[str]) -> list[pathlib.Path]:
+    """Expand files, directories (searched recursively) and glob patterns into PDF paths.
+
+    Order follows the inputs; duplicates are dropped.
+    """
+    found: dict[pathlib.Path, None] = {}
+    for item in inputs:
+        path = pathlib.Path(item)
+        if path.is_dir():
+            matches = sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(
+                pathlib.Path(p) for p in glob.glob(item, recursive=True) if p.lower().endswith(".pdf")
+            )
+            if not matches:
+                logger.warning("no PDFs match %s", item)
+        for match in matches:
+            found.setdefault(match, None)
+    return list(found)
+
+
+# Per-worker state, set once by _init_worker so every file reuses it
+_worker_cache: DiskCache | None = None
+_worker_backend = DEFAULT_BACKEND
+
+
+def _init_worker(cache_dir: str | None, backend: str = DEFAULT_BACKEND) -> None:
+    """Process pool initializer: open the cache (the PDF engine loads with the first file)."""
+    global _worker_cache, _worker_backend
+    _worker_cache = DiskCache(cache_dir) if cache_dir else None
+    _worker_backend = backend
+
+
+def process_file(path: str) -> FileResult:
+    """Extract one PDF, capturing any failure instead of raising."""
+    import pymupdf
+
+    t0 = time.perf_counter()
+    try:
+        with pymupdf.open(path) as doc:
+            pages = doc.page_count
+        numbers = extract_from_pdf(path, cache=_worker_cache, backend=_worker_backend)
+    except Exception as e:
+        return _failure(path, e, time.perf_counter() - t0)
+    return {
+        "path": path, "pages": pages, "seconds": time.perf_counter() - t0,
+        "numbers": numbers, "error": None,
+    }
+
+
+def _failure(path: str, error: BaseException, seconds: float = 0.0) -> FileResult:
+    return {
+        "path": path, "pages": 0, "seconds": seconds,
+        "numbers": ExtractionResult(), "error": f"{type(error).__name__}: {error}",
+    }
+
+
+def _pool(workers: int, cache_dir: str | None, backend: str) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker, initargs=(cache_dir, backend),
+    )
+
+
+def iter_results(
+    paths: Iterable[str | os.PathLike],
+    workers: int = 1,
+    cache_dir: str | None = None,
+    backend: str = DEFAULT_BACKEND,
+) -> Iterator[FileResult]:
+    """Yield a process_file() result per path from a process pool, in completion order.
+
+    A worker that dies outright (a crash in the PDF engine, the OOM killer)
+    breaks the pool and fails every file still queued in it. Those files are
+    retried afterwards, each in a pool of its own, so only a file that kills
+    its worker again is reported as failed.
+    """
+    broken = []
+    with _pool(workers, cache_dir, backend) as pool:
+        futures = {pool.submit(process_file, str(p)): str(p) for p in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                broken.append(futures[future])
+            except Exception as e:
+                yield _failure(futures[future], e)
+    if broken:
+        logger.warning("a worker died; retrying %d files one at a time", len(broken))
+    for path in broken:
+        with _pool(1, cache_dir, backend) as pool:
+            try:
+                yield pool.submit(process_file, path).result()
+            except Exception as e:
+                yield _failure(path, e)
+
+
+def run_batch(
+    paths: list[pathlib.Path],
+    sink: TextIO,
+    workers: int = 1,
+    cache_dir: str | None = None,
+    backend: str = DEFAULT_BACKEND,
+) -> list[FileResult]:
+    """Extract every PDF in a long-lived process pool, streaming numbers to a JSONL sink.
+
+    Each file's numbers are written as soon as that file finishes (completion
+    order, not input order). Failures are logged and the batch continues.
+    Returns the per-file results without their numbers.
+    """
+    summaries = []
+    for result in iter_results(paths, workers, cache_dir, backend):
+        if result["error"]:
+            logger.warning("FAILED %s: %s", result["path"], result["error"])
+        else:
+            for n in result["numbers"]:
+                sink.write(json.dumps(n) + "\n")
+            sink.flush()
+            logger.info(
+                "%s: %d numbers from %d pages in %.2fs",
+                result["path"], len(result["numbers"]), result["pages"], result["seconds"],
+            )
+        result["numbers"] = ExtractionResult()
+        summaries.append(result)
+    return summaries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract numbers from a corpus of budget PDFs")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument(
+        "-o", "--output", default="-",
+        help="JSONL output file, one extracted number per line (default: stdout)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument("--cache-dir", type=pathlib.Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the on-disk cache")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND, help="Layout engine")
+    parser.add_argument("--debug", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    paths = collect_pdfs(args.inputs)
+    if not paths:
+        parser.error("no PDF files found")
+    cache_dir = None if args.no_cache else str(args.cache_dir)
+
+    t0 = time.perf_counter()
+    if args.output == "-":
+        summaries = run_batch(
+            paths, sys.stdout, workers=args.workers, cache_dir=cache_dir, backend=args.backend,
+        )
+    else:
+        with open(args.output, "w", encoding="utf-8") as sink:
+            summaries = run_batch(
+                paths, sink, workers=args.workers, cache_dir=cache_dir, backend=args.backend,
+            )
+    elapsed = time.perf_counter() - t0
+
+    failed = [s for s in summaries if s["error"]]
+    pages = sum(s["pages"] for s in summaries)
+    done = len(summaries) - len(failed)
+    print(
+        f"Processed {done}/{len(summaries)} files, {pages} pages in {elapsed:.1f}s "
+        f"({pages / elapsed:.2f} pages/s, {done / elapsed:.2f} files/s)",
+        file=sys.stderr,
+    )
+    for s in failed:
+        print(f"  FAILED {s['path']}: {s['error']}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
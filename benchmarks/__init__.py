@@ -0,0 +1 @@
+"""Repeatable throughput benchmarks for the extractor; run with `python -m benchmarks.run`."""
@@ -0,0 +1,80 @@
+"""Run every layout backend on the same PDFs and compare speed and extracted numbers.
+
+    python -m benchmarks.compare_backends ./inputs --repeat 3
+
+The first backend listed is the reference; agreement is the share of its
+numbers (matched on page, raw text, multiplier, row and column) that another
+backend also finds, over the larger of the two counts.
+"""
+
+import argparse
+import collections
+import logging
+import time
+
+from backends import BACKENDS, DEFAULT_BACKEND
+from batch import collect_pdfs
+from extract import extract_from_pdf
+from results import ExtractionResult
+
+
+def _keys(numbers: ExtractionResult) -> collections.Counter:
+    return collections.Counter(
+        (n["page"], n["raw"], n["multiplier"], n["row_label"], n["column"]) for n in numbers
+    )
+
+
+def agreement(reference: ExtractionResult, other: ExtractionResult) -> float:
+    """Share of numbers both results contain, over the larger count (1.0 when both are empty)."""
+    ref_keys, other_keys = _keys(reference), _keys(other)
+    total = max(len(reference), len(other))
+    if not total:
+        return 1.0
+    return sum((ref_keys & other_keys).values()) / total
+
+
+def time_backend(path: str, backend: str, repeat: int) -> tuple[float, ExtractionResult]:
+    """Best wall time of extract_from_pdf() over `repeat` runs, and its output."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        numbers = extract_from_pdf(path, backend=backend)
+        best = min(best, time.perf_counter() - t0)
+    return best, numbers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare layout backends on a set of PDFs")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(BACKENDS),
+        default=[DEFAULT_BACKEND] + [name for name in BACKENDS if name != DEFAULT_BACKEND],
+        help="Backends to run; the first is the reference (default: all)",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per PDF and backend; the best time counts")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    reference, *others = args.backends
+    header = f"{'file':<30} {'backend':<12} {'seconds':>8} {'numbers':>8} {'agree':>7}"
+    print(header)
+    print("-" * len(header))
+    totals = collections.defaultdict(float)
+    for path in collect_pdfs(args.inputs):
+        ref_seconds, ref_numbers = time_backend(str(path), reference, args.repeat)
+        totals[reference] += ref_seconds
+        print(f"{path.name:<30} {reference:<12} {ref_seconds:>8.2f} {len(ref_numbers):>8} {'ref':>7}")
+        for backend in others:
+            seconds, numbers = time_backend(str(path), backend, args.repeat)
+            totals[backend] += seconds
+            share = agreement(ref_numbers, numbers)
+            print(f"{'':<30} {backend:<12} {seconds:>8.2f} {len(numbers):>8} {share:>7.1%}")
+    print()
+    for backend in args.backends:
+        speedup = totals[reference] / totals[backend] if totals[backend] else float("inf")
+        print(f"{backend:<12} total {totals[backend]:.2f}s ({speedup:.1f}x vs {reference})")
+
+
+if __name__ == "__main__":
+    main()
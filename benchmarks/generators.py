@@ -0,0 +1,121 @@
+"""Synthetic inputs in the pymupdf4llm page/box JSON shape, at any scale.
+
+Every generator takes a seed, so the same arguments always give the same data.
+"""
+
+import random
+
+_SENTENCES = [
+    "The program supports readiness across all components.",
+    "Funding sustains operations at current levels.",
+    "This line item was realigned from the prior year.",
+    "No changes are proposed for the budget year.",
+]
+_SCALED = [
+    "The request includes ${amount} million for procurement.",
+    "About {amount} billion is planned for sustainment.",
+    "Costs grew by ${amount}M over the prior estimate.",
+    "The account holds ${amount} billion in carryover.",
+]
+_UNIT_LINES = ["(Dollars in Millions)", "($ in Thousands)", "($M)", "(Amounts in Billions)"]
+
+
+def make_narrative(sentences: int, density: float = 0.3, seed: int = 0) -> str:
+    """Running text of `sentences` sentences; `density` of them carry a scaled amount."""
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(sentences):
+        if rng.random() < density:
+            amount = f"{rng.randint(1, 999)}.{rng.randint(0, 9)}"
+            parts.append(rng.choice(_SCALED).format(amount=amount))
+        else:
+            parts.append(rng.choice(_SENTENCES))
+    return " ".join(parts)
+
+
+def make_table_rows(rows: int, cols: int, header_rows: int = 1, seed: int = 0) -> list[list[str | None]]:
+    """A table["extract"]-style grid: header rows, then labelled rows of accounting numbers.
+
+    With more than one header row, upper rows have merged-cell gaps (None)
+    like fiscal-year groups spanning sub-columns.
+    """
+    rng = random.Random(seed)
+    grid: list[list[str | None]] = []
+    for h in range(header_rows):
+        if h == header_rows - 1:
+            grid.append(["Item"] + [f"FY{2020 + c}" for c in range(1, cols)])
+        else:
+            grid.append([None] + [f"Group {c}" if c % 3 == 1 else None for c in range(1, cols)])
+    for r in range(rows):
+        row: list[str | None] = [f"Line item {r}"]
+        for _ in range(1, cols):
+            value = rng.randint(0, 999_999) / 10
+            cell = f"{value:,.1f}"
+            row.append(f"({cell})" if rng.random() < 0.05 else cell)
+        grid.append(row)
+    return grid
+
+
+def _text_box(text: str, y0: float, boxclass: str = "text") -> dict:
+    return {
+        "x0": 50.0, "y0": y0, "x1": 550.0, "y1": y0 + 12.0,
+        "boxclass": boxclass, "image": None, "table": None,
+        "textlines": [{
+            "bbox": [50.0, y0, 550.0, y0 + 12.0],
+            "spans": [{"text": text, "size": 10.0, "flags": 0, "font": "Helvetica"}],
+        }],
+    }
+
+
+def _table_box(rows: list[list[str | None]], y0: float) -> dict:
+    height = 18.0 * len(rows)
+    return {
+        "x0": 50.0, "y0": y0, "x1": 550.0, "y1": y0 + height,
+        "boxclass": "table", "image": None, "textlines": None,
+        "table": {
+            "bbox": [50.0, y0, 550.0, y0 + height],
+            "row_count": len(rows),
+            "col_count": max((len(r) for r in rows), default=0),
+            "cells": None,
+            "extract": rows,
+            "markdown": "",
+        },
+    }
+
+
+def make_pages(
+    pages: int = 10,
+    boxes: int = 20,
+    table_rows: int = 20,
+    table_cols: int = 6,
+    tables_per_page: int = 1,
+    density: float = 0.3,
+    seed: int = 0,
+) -> list[dict]:
+    """Pages in the pymupdf4llm JSON shape, as consumed by extract_from_pages().
+
+    Each page has a section header, a unit declaration, `tables_per_page`
+    tables of table_rows x table_cols, and narrative boxes up to `boxes` in
+    total, `density` of whose sentences carry scaled amounts.
+    """
+    rng = random.Random(seed)
+    out = []
+    for p in range(pages):
+        y = 40.0
+        page_boxes = [_text_box(f"Section {p} Programs", y, "section-header")]
+        y += 20.0
+        page_boxes.append(_text_box(rng.choice(_UNIT_LINES), y))
+        y += 20.0
+        narrative = max(0, boxes - 2 - tables_per_page)
+        per_gap = narrative // (tables_per_page + 1)
+        for t in range(tables_per_page + 1):
+            count = per_gap if t < tables_per_page else narrative - per_gap * tables_per_page
+            for _ in range(count):
+                page_boxes.append(_text_box(make_narrative(3, density, rng.randrange(1 << 30)), y))
+                y += 14.0
+            if t < tables_per_page:
+                rows = make_table_rows(table_rows, table_cols, seed=rng.randrange(1 << 30))
+                page_boxes.append(_table_box(rows, y))
+                y += 18.0 * len(rows) + 10.0
+        out.append({"page_number": p + 1, "width": 612.0, "height": max(792.0, y), "boxes": page_boxes})
+    return out
@@ -0,0 +1,165 @@
+"""Time the extractor's hot paths on synthetic inputs and gate on a stored baseline.
+
+    python -m benchmarks.run                    # compare against benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline    # record this machine's numbers
+    python -m benchmarks.run --scale quick --only tokenize parse_cell_number
+
+Each case reports throughput (units of work per second, best of --repeat
+runs). A case regresses when its throughput falls more than --threshold below
+the baseline, and any regression makes the run exit with status 1. Baselines
+are only comparable on the machine that recorded them.
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import sys
+import timeit
+from collections.abc import Callable
+from typing import NamedTuple
+
+from benchmarks.generators import make_narrative, make_pages, make_table_rows
+from extract import extract_from_pages, extract_from_table, extract_inline_numbers, resolve_column_headers
+from patterns import find_header_multiplier, is_number, parse_cell_number, resolve_multiplier, tokenize
+
+DEFAULT_BASELINE = pathlib.Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25  # fail when throughput drops by more than 25%
+
+# Input sizes per scale, and the minimum length of one timed run
+MIN_TIME = {"quick": 0.02, "full": 0.1}
+SCALES = {
+    "quick": {"pages": 5, "boxes": 20, "table_rows": 20, "table_cols": 6, "sentences": 200, "cells": 2_000},
+    "full": {"pages": 40, "boxes": 40, "table_rows": 60, "table_cols": 10, "sentences": 5_000, "cells": 50_000},
+}
+
+
+class Case(NamedTuple):
+    name: str
+    unit: str                  # what one unit of work is, e.g. "cells"
+    units: int                 # units of work per call of func
+    func: Callable[[], object]
+
+
+class Result(NamedTuple):
+    name: str
+    unit: str
+    seconds: float             # best time for one call
+    throughput: float          # units per second
+
+
+def build_cases(scale: str) -> list[Case]:
+    """Generate the inputs for every case at the given scale."""
+    s = SCALES[scale]
+    pages = make_pages(s["pages"], s["boxes"], s["table_rows"], s["table_cols"])
+    table = make_table_rows(s["table_rows"] * 10, s["table_cols"])
+    header_tables = [make_table_rows(5, s["table_cols"] * 2, header_rows=3, seed=i) for i in range(100)]
+    text = make_narrative(s["sentences"], density=0.5)
+    cells = [row[c] for row in make_table_rows(s["cells"] // 10, 11)[1:] for c in range(1, 11)]
+    units = ["M", "Millions", "thousand", "B", "billions", "K", "widgets", "T"] * (s["cells"] // 80)
+    headers = [f"Program {i % 200} ($M)" if i % 3 else f"Program {i % 200}" for i in range(s["cells"] // 10)]
+    box_count = sum(len(p["boxes"]) for p in pages)
+    table_cells = sum(len(r) for r in table)
+
+    return [
+        Case("extract_from_pages", "boxes", box_count, lambda: extract_from_pages(pages, "bench.pdf")),
+        Case("extract_from_table", "cells", table_cells, lambda: extract_from_table(table, "Million", 1_000_000)),
+        Case("extract_inline_numbers", "chars", len(text), lambda: extract_inline_numbers(text)),
+        Case(
+            "resolve_column_headers", "tables", len(header_tables),
+            lambda: [resolve_column_headers(t) for t in header_tables],
+        ),
+        Case("tokenize", "chars", len(text), lambda: tokenize(text)),
+        Case("find_header_multiplier", "headers", len(headers), lambda: [find_header_multiplier(h) for h in headers]),
+        Case("resolve_multiplier", "tokens", len(units), lambda: [resolve_multiplier(u) for u in units]),
+        Case("is_number", "cells", len(cells), lambda: [is_number(c) for c in cells]),
+        Case("parse_cell_number", "cells", len(cells), lambda: [parse_cell_number(c) for c in cells]),
+    ]
+
+
+def time_case(case: Case, repeat: int = 5, min_time: float = 0.1) -> Result:
+    """Best per-call time over `repeat` runs of at least min_time seconds each."""
+    timer = timeit.Timer(case.func)
+    number = 1
+    while (elapsed := timer.timeit(number)) < min_time:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)) + 1)
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return Result(case.name, case.unit, best, case.units / best)
+
+
+def compare(results: list[Result], baseline: dict, threshold: float) -> list[str]:
+    """Describe every result whose throughput fell more than threshold below its baseline."""
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None:
+            continue
+        floor = base["throughput"] * (1 - threshold)
+        if r.throughput < floor:
+            regressions.append(
+                f"{r.name}: {r.throughput:,.0f} {r.unit}/s is {1 - r.throughput / base['throughput']:.0%} "
+                f"below baseline {base['throughput']:,.0f}"
+            )
+    return regressions
+
+
+def load_baseline(path: pathlib.Path, scale: str) -> dict:
+    """Baseline results for a scale, keyed by case name ({} if none recorded)."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get(scale, {}).get("results", {})
+
+
+def save_baseline(path: pathlib.Path, scale: str, results: list[Result]) -> None:
+    """Record results for a scale, keeping other scales already in the file."""
+    data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    data[scale] = {
+        "machine": f"{platform.python_implementation()} {platform.python_version()} on {platform.machine()}",
+        "results": {r.name: {"unit": r.unit, "seconds": r.seconds, "throughput": r.throughput} for r in results},
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the extractor against a stored baseline")
+    parser.add_argument("--scale", choices=list(SCALES), default="full")
+    parser.add_argument("--only", nargs="+", metavar="CASE", help="Run only these cases")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case; the best counts")
+    parser.add_argument("--baseline", type=pathlib.Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"Allowed throughput drop as a fraction (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.scale)
+    if args.only:
+        unknown = set(args.only) - {c.name for c in cases}
+        if unknown:
+            parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+        cases = [c for c in cases if c.name in args.only]
+
+    baseline = load_baseline(args.baseline, args.scale)
+    results = []
+    print(f"{'case':<24} {'per call':>12} {'throughput':>25} {'vs baseline':>12}")
+    for case in cases:
+        r = time_case(case, args.repeat, MIN_TIME[args.scale])
+        results.append(r)
+        base = baseline.get(r.name)
+        change = f"{r.throughput / base['throughput'] - 1:+.0%}" if base else "-"
+        print(f"{r.name:<24} {r.seconds * 1000:>9.2f} ms {r.throughput:>14,.0f} {r.unit + '/s':<10} {change:>12}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, args.scale, results)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
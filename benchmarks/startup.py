@@ -0,0 +1,74 @@
+"""Measure cold-import time of the entry modules with `python -X importtime`.
+
+    python -m benchmarks.startup                  # extract, main, daemon
+    python -m benchmarks.startup extract --budget 0.3
+
+Each module is imported in a fresh interpreter. The run fails (exit status 1)
+when a module pulls in the PDF engine (pymupdf, pymupdf4llm), which should only
+load once a PDF is actually opened, or when its best cumulative import time
+exceeds --budget seconds.
+"""
+
+import argparse
+import pathlib
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ["extract", "main", "daemon"]
+DEFAULT_BUDGET = 0.5  # seconds; pymupdf alone takes about half of that
+HEAVY_MODULES = ("pymupdf", "pymupdf4llm")
+
+
+def import_profile(module: str) -> dict[str, float]:
+    """Cumulative import seconds of every module loaded by a cold `import module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |      cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            profile[name.strip()] = int(cumulative) / 1e6
+    return profile
+
+
+def heavy_imports(profile: dict[str, float]) -> list[str]:
+    """The PDF engine modules (and their submodules) in an import profile."""
+    return sorted(m for m in profile if m.split(".")[0] in HEAVY_MODULES)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Guard cold-import time of the entry modules")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5, help="Cold imports per module; the best counts")
+    parser.add_argument(
+        "--budget", type=float, default=DEFAULT_BUDGET,
+        help=f"Allowed cumulative import seconds per module (default: {DEFAULT_BUDGET})",
+    )
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'module':<12} {'import':>10}  slowest dependencies")
+    for module in args.modules:
+        profiles = [import_profile(module) for _ in range(args.repeat)]
+        best = min(profiles, key=lambda p: p[module])
+        slowest = sorted((m for m in best if m != module), key=best.get, reverse=True)[:3]
+        print(f"{module:<12} {best[module] * 1000:>7.1f} ms  "
+              + ", ".join(f"{m} {best[m] * 1000:.0f} ms" for m in slowest))
+        if heavy := heavy_imports(best):
+            failures.append(f"{module} imports the PDF engine: {', '.join(heavy[:5])}")
+        if best[module] > args.budget:
+            failures.append(f"{module}: {best[module]:.3f}s exceeds the {args.budget}s budget")
+
+    for line in failures:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import os
+import pathlib
+import tempfile
+
+from patterns import config_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = pathlib.Path("./.cache")
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB across both tiers
+
+# Tier names, also used as subdirectory names under the cache root
+LAYOUT = "layout"    # per-page layout output, keyed by PDF hash + page index + backend/engine version
+RESULTS = "results"  # per-page extract_from_pages output, keyed by layout hash + patterns
+
+
+def file_hash(path: str | os.PathLike) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def data_hash(data: bytes | memoryview) -> str:
+    """Return the SHA-256 hex digest of a bytes-like object, read in place."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """Return the SHA-256 hex digest of a string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def layout_key(pdf_hash: str, page_index: int, engine: str) -> str:
+    """Tier-1 key: one page of one PDF, as laid out by one backend and engine version."""
+    return text_hash(f"{pdf_hash}:{page_index}:{engine}")
+
+
+def results_key(layout_hash: str, source: str) -> str:
+    """Tier-2 key: one page layout, extracted under the current pattern configuration."""
+    return text_hash(f"{layout_hash}:{config_fingerprint()}:{source}")
+
+
+class DiskCache:
+    """Size-bounded LRU store of text values, one file per key.
+
+    Recency is tracked with file mtimes: reads touch the file, and when the
+    total size exceeds max_bytes the least recently used entries are deleted
+    until the cache is back under 90% of the bound. Writes are atomic, so
+    several processes can share one cache directory.
+    """
+
+    def __init__(self, root: str | os.PathLike = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = pathlib.Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: int | None = None  # computed lazily on first write
+
+    def _path(self, tier: str, key: str) -> pathlib.Path:
+        return self.root / tier / key[:2] / f"{key}.json"
+
+    def _entries(self) -> list[pathlib.Path]:
+        return [p for p in self.root.glob("*/*/*.json") if p.is_file()]
+
+    def get(self, tier: str, key: str) -> str | None:
+        """Return the cached text for key, or None on a miss."""
+        path = self._path(tier, key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+
+    def put(self, tier: str, key: str, text: str) -> None:
+        """Store text under key, evicting old entries if the size bound is exceeded."""
+        path = self._path(tier, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = text.encode("utf-8")
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp, path)
+
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self._entries())
+        else:
+            self._size += len(data) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until under 90% of max_bytes."""
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:  # removed by a concurrent process
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+
+        size = sum(s for _, s, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, entry_size, p in entries:
+            if size <= target:
+                break
+            p.unlink(missing_ok=True)
+            size -= entry_size
+            removed += 1
+        self._size = size
+        logger.debug("cache eviction: removed %d entries, %d bytes remain", removed, size)
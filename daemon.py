@@ -0,0 +1,303 @@
+"""Long-running extraction server on a Unix domain socket.
+
+    python daemon.py --socket /tmp/numbers.sock --workers 4
+    python main.py report.pdf --daemon /tmp/numbers.sock
+
+Worker processes import the layout engine and load its model once, at
+startup, so each request only pays for its own pages. The wire format is one
+JSON header line per request, optionally followed by `size` bytes of PDF
+data, and one JSON line per response:
+
+    {"path": "/abs/report.pdf", "backend": "native", "triage": false}
+    {"name": "upload.pdf", "size": 12345}\\n<12345 bytes of PDF>
+    {"op": "stats"}
+
+Responses carry {"ok": true, "numbers": [...], "timing": {...}} or
+{"ok": false, "error": "..."}. Requests from different connections run
+concurrently; a connection's own requests are answered in order. Jobs wait in a
+bounded queue; when it is full, connections stop being read until a slot frees
+up, which pushes back on callers instead of buffering without limit.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import pathlib
+import signal
+import socket
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backends import BACKENDS, DEFAULT_BACKEND
+from cache import DEFAULT_CACHE_DIR, DiskCache
+from extract import extract_from_pdf, layout_pdf, triage_pdf
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = pathlib.Path(tempfile.gettempdir()) / "numbers-extract.sock"
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_MAX_REQUEST_BYTES = 256 * 1024 * 1024  # largest PDF accepted inline
+
+
+# --- Worker side ---
+
+# Per-worker state, set once by _init_worker
+_worker_cache: DiskCache | None = None
+
+
+def _init_worker(cache_dir: str | None, warm_backend: str | None = DEFAULT_BACKEND) -> None:
+    """Process pool initializer: open the cache and load the layout model."""
+    global _worker_cache
+    _worker_cache = DiskCache(cache_dir) if cache_dir else None
+    if warm_backend:
+        _warm_up(warm_backend)
+
+
+def _warm_up(backend: str) -> None:
+    """Lay out a one-page document so the first real job doesn't load the model."""
+    import pymupdf
+
+    with pymupdf.open() as doc:
+        doc.new_page().insert_text((72, 72), "Warm-up ($M) 1,234.5")
+        data = doc.tobytes()
+    layout_pdf(data, backend=backend)
+
+
+def run_job(job: dict) -> dict:
+    """Extract one request in a worker; failures come back as {"ok": False, ...}."""
+    t0 = time.perf_counter()
+    try:
+        if "data" in job:
+            pdf, source = job["data"], pathlib.Path(job["name"]).name if job.get("name") else None
+        else:
+            pdf, source = job["path"], None
+        page_classes = triage_pdf(pdf) if job.get("triage") else None
+        numbers = extract_from_pdf(
+            pdf, cache=_worker_cache, page_classes=page_classes,
+            backend=job.get("backend", DEFAULT_BACKEND), source=source,
+        )
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}", "timing": {"extract": time.perf_counter() - t0}}
+    return {"ok": True, "numbers": numbers.to_list(), "timing": {"extract": time.perf_counter() - t0}}
+
+
+# --- Server side ---
+
+class ExtractionDaemon:
+    """Accepts jobs on a Unix socket and feeds them to an executor through a bounded queue.
+
+    `new_executor` builds the executor, and builds a replacement whenever a
+    dead worker process breaks the current one. `concurrency` dispatcher tasks
+    pull from the queue, one job each at a time, so it should match the
+    executor's worker count. Requests announcing more than `max_request_bytes`
+    of PDF data are refused before any of it is read.
+    """
+
+    def __init__(
+        self,
+        new_executor: Callable[[], Executor],
+        concurrency: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_request_bytes: int = DEFAULT_MAX_REQUEST_BYTES,
+    ):
+        self.new_executor = new_executor
+        self.executor = new_executor()
+        self.concurrency = concurrency
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.max_request_bytes = max_request_bytes
+        self.stats: Counter[str] = Counter()
+
+    async def serve(self, socket_path: str | os.PathLike, started: asyncio.Event | None = None) -> None:
+        """Listen on socket_path until cancelled."""
+        server = await asyncio.start_unix_server(self._handle, path=str(socket_path))
+        dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.concurrency)]
+        logger.info("listening on %s", socket_path)
+        if started is not None:
+            started.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in dispatchers:
+                task.cancel()
+            pathlib.Path(socket_path).unlink(missing_ok=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    job = await self._read_job(reader)
+                except (ValueError, asyncio.IncompleteReadError) as e:
+                    await self._reply(writer, {"ok": False, "error": f"bad request: {e}"})
+                    break
+                if job is None:
+                    break
+                received = time.perf_counter()
+                if job.get("op") == "stats":
+                    await self._reply(writer, {"ok": True, "stats": self._stats()})
+                    continue
+                done = asyncio.get_running_loop().create_future()
+                await self.queue.put((job, done, received))  # waits while the queue is full
+                await self._reply(writer, await done)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_job(self, reader: asyncio.StreamReader) -> dict | None:
+        """Read one request header and its PDF data; None once the client is done.
+
+        Raises ValueError for a header that isn't a JSON object, or whose
+        size isn't a non-negative integer within max_request_bytes.
+        """
+        header = await reader.readline()  # ValueError past the stream's line limit
+        if not header:
+            return None
+        job = json.loads(header)
+        if not isinstance(job, dict):
+            raise ValueError("header must be a JSON object")
+        size = job.pop("size", 0)
+        if isinstance(size, bool) or not isinstance(size, int) or size < 0:
+            raise ValueError(f"size must be a non-negative integer, not {size!r}")
+        if size > self.max_request_bytes:
+            raise ValueError(f"{size} bytes of data exceeds the limit of {self.max_request_bytes}")
+        if size:
+            job["data"] = await reader.readexactly(size)
+        return job
+
+    async def _dispatch(self) -> None:
+        while True:
+            job, done, received = await self.queue.get()
+            started = time.perf_counter()
+            try:
+                reply = await self._run(job)
+            except BrokenProcessPool:
+                # Every job in the dead pool lands here; retry each once in the new
+                # one, so only a job that kills its worker again fails
+                try:
+                    reply = await self._run(job)
+                except Exception as e:
+                    reply = {"ok": False, "error": f"{type(e).__name__}: {e}", "timing": {}}
+            except Exception as e:  # the executor itself failed
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}", "timing": {}}
+            finished = time.perf_counter()
+            reply["timing"] = {"queued": started - received, **reply["timing"], "total": finished - received}
+            self.stats["ok" if reply["ok"] else "failed"] += 1
+            if not done.cancelled():
+                done.set_result(reply)
+            self.queue.task_done()
+
+    async def _run(self, job: dict) -> dict:
+        """run_job() in the executor, replacing the executor if a worker died under it."""
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, run_job, job)
+        except BrokenProcessPool:
+            if self.executor is executor:  # the first dispatcher to notice replaces it for all
+                logger.warning("a worker process died; starting a new pool")
+                self.executor = self.new_executor()
+                self.stats["restarts"] += 1
+                executor.shutdown(wait=False)
+            raise
+
+    def _stats(self) -> dict:
+        return {"ok": self.stats["ok"], "failed": self.stats["failed"], "restarts": self.stats["restarts"],
+                "queued": self.queue.qsize(), "queue_size": self.queue.maxsize}
+
+    @staticmethod
+    async def _reply(writer: asyncio.StreamWriter, reply: dict) -> None:
+        writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+        await writer.drain()
+
+
+# --- Client side ---
+
+def request(
+    socket_path: str | os.PathLike,
+    job: dict,
+    data: bytes | memoryview | None = None,
+    timeout: float | None = None,
+) -> dict:
+    """Send one job to a running daemon and return its reply.
+
+    `job` holds the request fields ("path" or "name", "backend", "triage", or
+    "op"); pass PDF bytes as `data` instead of a path.
+    """
+    header = dict(job)
+    if data is not None:
+        header["size"] = memoryview(data).nbytes
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(os.fspath(socket_path))
+        sock.sendall(json.dumps(header).encode("utf-8") + b"\n")
+        if data is not None:
+            sock.sendall(data)
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("daemon closed the connection without replying")
+    return json.loads(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve extraction requests on a Unix socket")
+    parser.add_argument("--socket", type=pathlib.Path, default=DEFAULT_SOCKET)
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Worker processes, each with its own warm layout model (default: CPU count)",
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+        help=f"Jobs that may wait for a worker before callers are held back (default: {DEFAULT_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--max-request-mb", type=int, default=DEFAULT_MAX_REQUEST_BYTES >> 20, metavar="MB",
+        help=f"Largest PDF a request may send inline (default: {DEFAULT_MAX_REQUEST_BYTES >> 20})",
+    )
+    parser.add_argument("--warm-backend", choices=list(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--cache-dir", type=pathlib.Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the on-disk cache")
+    parser.add_argument("--debug", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+    if args.socket.exists():
+        args.socket.unlink()  # stale socket from a previous run
+    cache_dir = None if args.no_cache else str(args.cache_dir)
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        ctx = multiprocessing.get_context("spawn")
+
+        def new_pool() -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(
+                max_workers=args.workers, mp_context=ctx,
+                initializer=_init_worker, initargs=(cache_dir, args.warm_backend),
+            )
+
+        daemon = ExtractionDaemon(
+            new_pool, concurrency=args.workers, queue_size=args.queue_size,
+            max_request_bytes=args.max_request_mb << 20,
+        )
+        serving = asyncio.create_task(daemon.serve(args.socket))
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, serving.cancel)
+        try:
+            await serving
+        except asyncio.CancelledError:
+            logger.info("shutting down")
+        finally:
+            daemon.executor.shutdown()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
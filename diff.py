@@ -0,0 +1,309 @@
+"""Compare the numbers extracted from two revisions of a document.
+
+    python diff.py old.json new.jsonl -o changes.jsonl --page-tolerance 2
+
+Inputs can be any file main.py or batch.py writes: a JSON array (tmp.json,
+--format json), JSONL, or the columnar binary format. Numbers are hash-joined
+on a normalized (section, row_label, column) key. Within a key, old and new
+numbers are paired in page order when their pages differ by at most the page
+tolerance, so inserted or removed pages don't break the match. Each
+difference is streamed to the output as one JSON line:
+
+    {"change": "changed", "old": {...}, "new": {...}, "relative_change": 0.25}
+    {"change": "added", "old": null, "new": {...}, "relative_change": null}
+
+Both sides are held as columnar results plus a key index. With --partitions N
+the inputs are first split into N hash partitions on disk and joined one
+partition at a time, which bounds memory by the largest partition.
+"""
+
+import argparse
+import io
+import json
+import logging
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import IO
+
+from results import ExtractedNumber, ExtractionResult
+from writers import COLUMNAR_MAGIC, ColumnarWriter, iter_columnar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION_BYTES = 256 * 1024 * 1024  # input bytes per partition when --partitions is auto
+CHUNK_ROWS = 65_536  # rows per ExtractionResult read from JSON or JSONL
+_READ_SIZE = 1 << 20  # characters of a JSON array decoded per read
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def normalize(text: str | None) -> str:
+    """Key form of a label: case-folded, whitespace collapsed, None as ""."""
+    return " ".join(text.split()).casefold() if text else ""
+
+
+def _keys(result: ExtractionResult) -> list[tuple[str, str, str]]:
+    """Normalized (section, row_label, column) key of every row.
+
+    Labels are dictionary-encoded in the result, so each distinct label is
+    normalized once however many rows share it.
+    """
+    columns = []
+    for name in ("section", "row_label", "column"):
+        category = result.categories[name]
+        normalized = [normalize(v) for v in category.values]
+        columns.append([normalized[c] for c in category.codes])
+    return list(zip(*columns))
+
+
+def match_rows(
+    old: ExtractionResult, new: ExtractionResult, page_tolerance: float = 0,
+) -> Iterator[tuple[int | None, int | None]]:
+    """Pair row indices of old and new; (i, None) is removed, (None, j) added.
+
+    Rows with the same key are walked in page order (document order within a
+    page) and paired while their pages are within page_tolerance; rows
+    without a page count as page 0. O(n) hashing plus a sort within each key.
+    """
+    by_key: dict[tuple, tuple[list[int], list[int]]] = {}
+    for i, key in enumerate(_keys(old)):
+        by_key.setdefault(key, ([], []))[0].append(i)
+    for j, key in enumerate(_keys(new)):
+        by_key.setdefault(key, ([], []))[1].append(j)
+
+    old_pages, new_pages = [max(p, 0) for p in old.pages], [max(p, 0) for p in new.pages]
+    for old_rows, new_rows in by_key.values():
+        old_rows.sort(key=old_pages.__getitem__)
+        new_rows.sort(key=new_pages.__getitem__)
+        a = b = 0
+        while a < len(old_rows) and b < len(new_rows):
+            i, j = old_rows[a], new_rows[b]
+            if old_pages[i] < new_pages[j] - page_tolerance:
+                yield i, None
+                a += 1
+            elif new_pages[j] < old_pages[i] - page_tolerance:
+                yield None, j
+                b += 1
+            else:
+                yield i, j
+                a += 1
+                b += 1
+        for i in old_rows[a:]:
+            yield i, None
+        for j in new_rows[b:]:
+            yield None, j
+
+
+def relative_change(old: float, new: float) -> float:
+    """|new - old| / |old|; infinite when a zero became nonzero."""
+    if old == 0:
+        return 0.0 if new == 0 else math.inf
+    return abs(new - old) / abs(old)
+
+
+class DiffSummary:
+    """Counts of each kind of change, and the largest relative change seen."""
+
+    def __init__(self):
+        self.counts = {"unchanged": 0, "changed": 0, "added": 0, "removed": 0}
+        self.largest: tuple[float, ExtractedNumber, ExtractedNumber] | None = None
+
+    def add(self, change: str, old: ExtractedNumber | None, new: ExtractedNumber | None) -> float | None:
+        """Count one change and return its relative change (None unless changed)."""
+        self.counts[change] += 1
+        if change != "changed":
+            return None
+        rel = relative_change(old["adjusted_value"], new["adjusted_value"])
+        if self.largest is None or rel > self.largest[0]:
+            self.largest = (rel, old, new)
+        return rel
+
+
+def diff_results(
+    old: ExtractionResult,
+    new: ExtractionResult,
+    page_tolerance: float = 0,
+    summary: DiffSummary | None = None,
+) -> Iterator[dict]:
+    """Yield a change record (see module docstring) for every number that differs.
+
+    Matched numbers differ when their adjusted_value does. Unchanged pairs
+    are only counted, in `summary` if one is given.
+    """
+    if summary is None:
+        summary = DiffSummary()
+    old_adjusted, new_adjusted = old.adjusted_values(), new.adjusted_values()
+    for i, j in match_rows(old, new, page_tolerance):
+        if i is not None and j is not None and old_adjusted[i] == new_adjusted[j]:
+            summary.counts["unchanged"] += 1
+            continue
+        before = old[i] if i is not None else None
+        after = new[j] if j is not None else None
+        change = "added" if before is None else "removed" if after is None else "changed"
+        rel = summary.add(change, before, after)
+        yield {"change": change, "old": before, "new": after, "relative_change": rel}
+
+
+# --- Reading inputs ---
+
+def iter_numbers(path: str | os.PathLike) -> Iterator[ExtractionResult]:
+    """Read a JSON array, JSONL or columnar file of numbers, in chunks.
+
+    JSON arrays are decoded one element at a time, so no input format is
+    ever held whole in memory.
+    """
+    with open(path, "rb") as f:
+        head = f.read(len(COLUMNAR_MAGIC))
+        f.seek(0)
+        if head == COLUMNAR_MAGIC:
+            yield from iter_columnar(f)
+            return
+        if head.lstrip()[:1] == b"[":
+            rows = _iter_json_array(io.TextIOWrapper(f, encoding="utf-8"))
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        while chunk := ExtractionResult(islice(rows, CHUNK_ROWS)):
+            yield chunk
+
+
+def _iter_json_array(text: IO[str]) -> Iterator[dict]:
+    """Yield the objects of a JSON array, reading the text a block at a time."""
+    decoder = json.JSONDecoder()
+    buf = text.read(_READ_SIZE).lstrip()
+    pos = 1  # past the "["
+    while True:
+        pos = _SEPARATORS.match(buf, pos).end()
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            row, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Most likely the element runs past the end of the buffer
+            more = text.read(_READ_SIZE)
+            if not more:
+                raise
+            buf, pos = buf[pos:] + more, 0
+            continue
+        if not isinstance(row, dict):
+            raise ValueError(f"expected an object in the JSON array, got {type(row).__name__}")
+        yield row
+        pos = end
+
+
+def load_numbers(path: str | os.PathLike) -> ExtractionResult:
+    """Read a whole file of numbers (see iter_numbers()) into one result."""
+    result = ExtractionResult()
+    for chunk in iter_numbers(path):
+        result.extend(chunk)
+    return result
+
+
+def _partition(path: str | os.PathLike, partitions: int, workdir: str, side: str) -> list[str]:
+    """Split a file of numbers into columnar files by hash of the join key.
+
+    The hash is CRC-32, not hash(), so partitions are the same in every
+    process whatever PYTHONHASHSEED is.
+    """
+    paths = [os.path.join(workdir, f"{side}-{p}.col") for p in range(partitions)]
+    writers = [ColumnarWriter(open(p, "wb"), owned=True) for p in paths]
+    try:
+        for chunk in iter_numbers(path):
+            for key, n in zip(_keys(chunk), chunk):
+                writers[zlib.crc32("\x1f".join(key).encode()) % partitions].write(n)
+    finally:
+        for writer in writers:
+            writer.close()
+    return paths
+
+
+def diff_files(
+    old_path: str | os.PathLike,
+    new_path: str | os.PathLike,
+    page_tolerance: float = 0,
+    partitions: int = 1,
+    summary: DiffSummary | None = None,
+) -> Iterator[dict]:
+    """diff_results() on two files, joining `partitions` hash partitions one at a time.
+
+    Rows only ever match within a partition, since both sides are split on
+    the same key hash, so memory is bounded by the largest partition.
+    """
+    if partitions <= 1:
+        yield from diff_results(load_numbers(old_path), load_numbers(new_path), page_tolerance, summary)
+        return
+    with tempfile.TemporaryDirectory(prefix="numbers-diff-") as workdir:
+        old_parts = _partition(old_path, partitions, workdir, "old")
+        new_parts = _partition(new_path, partitions, workdir, "new")
+        for old_part, new_part in zip(old_parts, new_parts):
+            yield from diff_results(load_numbers(old_part), load_numbers(new_part), page_tolerance, summary)
+
+
+def _write_records(records: Iterable[dict], sink: IO[str], only: set[str] | None) -> None:
+    for record in records:
+        if only is None or record["change"] in only:
+            sink.write(json.dumps(record) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff the numbers extracted from two document revisions")
+    parser.add_argument("old", help="Numbers from the earlier revision (JSON, JSONL or columnar)")
+    parser.add_argument("new", help="Numbers from the later revision")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file of changes (default: stdout)")
+    parser.add_argument(
+        "--page-tolerance", type=int, default=0, metavar="N",
+        help="Match numbers whose pages differ by up to N (default: 0)",
+    )
+    parser.add_argument(
+        "--only", action="append", choices=["changed", "added", "removed"],
+        help="Only write these kinds of change (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--partitions", type=int,
+        help="Join in N on-disk hash partitions to bound memory "
+             f"(default: one per {DEFAULT_PARTITION_BYTES >> 20} MiB of input)",
+    )
+    parser.add_argument("--debug", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+
+    partitions = args.partitions
+    if partitions is None:
+        size = os.path.getsize(args.old) + os.path.getsize(args.new)
+        partitions = max(1, math.ceil(size / DEFAULT_PARTITION_BYTES))
+    only = set(args.only) if args.only else None
+
+    t0 = time.perf_counter()
+    summary = DiffSummary()
+    records = diff_files(args.old, args.new, args.page_tolerance, partitions, summary)
+    if args.output == "-":
+        _write_records(records, sys.stdout, only)
+    else:
+        with open(args.output, "w", encoding="utf-8") as sink:
+            _write_records(records, sink, only)
+
+    counts = summary.counts
+    print(
+        f"{counts['changed']} changed, {counts['added']} added, {counts['removed']} removed, "
+        f"{counts['unchanged']} unchanged in {time.perf_counter() - t0:.1f}s",
+        file=sys.stderr,
+    )
+    if summary.largest:
+        rel, old, new = summary.largest
+        print(
+            f"Largest relative change: {rel:.1%} ({old['adjusted_value']:,.0f} -> "
+            f"{new['adjusted_value']:,.0f}) — {new['row_label']} / {new['column']} "
+            f"[page {old['page']} -> {new['page']}, {new['section']}]",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
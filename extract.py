@@ -1,79 +1,57 @@
+import base64
+import bisect
+import functools
+import io
 import json
 import logging
+import math
+import mmap
+import multiprocessing
+import os
 import pathlib
+import re
 import time
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
-from typing import Literal, TypedDict
-
-import pymupdf.layout  # noqa: F401 — activate PyMuPDF-Layout
-import pymupdf4llm
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, BinaryIO, Literal, NamedTuple
 
+from backends import DEFAULT_BACKEND, get_backend
+from cache import LAYOUT, RESULTS, DiskCache, data_hash, file_hash, layout_key, results_key, text_hash
+from metrics import Metrics
 from patterns import (
+    BARE,
     CONTEXT_WINDOW,
-    HEADER_UNIT_PATTERNS,
-    INLINE_BARE_PATTERN,
-    INLINE_DOLLAR_PATTERN,
+    DOLLAR,
+    HEADER_UNIT,
+    Token,
     find_header_multiplier,
+    header_multiplier,
     is_number,
-    parse_number,
+    parse_cell_number,
     resolve_multiplier,
+    strip_header_units,
+    tokenize,
 )
+from results import ExtractedNumber, ExtractionResult, TopK
 
-logger = logging.getLogger(__name__)
-
-
-class ExtractedNumber(TypedDict):
-    value: float
-    raw: str
-    multiplier_label: str | None
-    multiplier: int
-    adjusted_value: float
-    row_label: str
-    column: str
-    section: str | None
-    page: int | None
-    source: str | None
-    source_type: Literal["table", "narrative", "table_narrative"]
-    context: str | None
-
+if TYPE_CHECKING:
+    import pymupdf
 
-def _make_result(
-    *,
-    value: float,
-    raw: str,
-    multiplier_label: str | None,
-    multiplier: int,
-    row_label: str,
-    column: str,
-    source_type: Literal["table", "narrative", "table_narrative"],
-    section: str | None = None,
-    page: int | None = None,
-    source: str | None = None,
-    context: str | None = None,
-) -> ExtractedNumber:
-    """Build an ExtractedNumber dict with computed adjusted_value."""
-    return {
-        "value": value,
-        "raw": raw,
-        "multiplier_label": multiplier_label,
-        "multiplier": multiplier,
-        "adjusted_value": value * multiplier,
-        "row_label": row_label,
-        "column": column,
-        "section": section,
-        "page": page,
-        "source": source,
-        "source_type": source_type,
-        "context": context,
-    }
+logger = logging.getLogger(__name__)
 
 
 @contextmanager
-def _log_timing(label: str):
-    """Context manager that logs elapsed time at DEBUG level."""
+def _log_timing(label: str, metrics: Metrics | None = None):
+    """Context manager that logs elapsed time at DEBUG level (and records it as a metrics stage)."""
     t0 = time.perf_counter()
     yield
-    logger.debug("%s: %.2fs", label, time.perf_counter() - t0)
+    elapsed = time.perf_counter() - t0
+    logger.debug("%s: %.2fs", label, elapsed)
+    if metrics is not None:
+        metrics.add_stage(label, elapsed)
 
 
 def get_box_text(box: dict) -> str:
@@ -90,6 +68,108 @@ def get_box_text(box: dict) -> str:
     return " ".join(parts)
 
 
+class TableAnalysis:
+    """Everything extraction needs to know about a table, from one pass over its rows.
+
+    Each cell is split into lines once. The same pass finds data_start (the
+    first row with a number-like cell), collects the joined table text, parses
+    the number-like lines of every data cell from column 1 onwards, and keeps
+    the cells that may hold inline amounts (cells that are all numbers can't).
+    Headers and the table-level multiplier are derived on first use.
+    """
+
+    def __init__(self, rows: list[list]):
+        self.rows = rows
+        self.col_count = 0
+        self.data_start: int | None = None
+        # Per data row (from data_start on): (col_idx, line_idx, text, value) of
+        # each cell line that parses as a number
+        self.numbers: list[list[tuple[int, int, str, float]]] = []
+        # Non-empty cells in row order, minus data cells whose every line is a number
+        self.text_cells: list[str] = []
+        cell_texts = []
+        for i, row in enumerate(rows):
+            self.col_count = max(self.col_count, len(row))
+            lines = []
+            for cell in row:
+                if not cell:
+                    lines.append(None)
+                    continue
+                cell_texts.append(cell)
+                cell_lines = cell.split("\n")
+                lines.append(cell_lines)
+                if self.data_start is None and is_number(cell_lines[0]):
+                    self.data_start = i
+            numeric_cols = ()
+            if self.data_start is not None:
+                found, numeric_cols = _parse_row_numbers(lines)
+                self.numbers.append(found)
+            self.text_cells.extend(
+                cell for j, cell in enumerate(row) if cell and j not in numeric_cols
+            )
+        self.text = " ".join(cell_texts)
+        self.cell_count = len(cell_texts)  # non-empty cells
+
+    @property
+    def has_data(self) -> bool:
+        return self.data_start is not None
+
+    @functools.cached_property
+    def multiplier(self) -> tuple[str, int] | None:
+        """Multiplier declared anywhere in the table's cells."""
+        return find_header_multiplier(self.text)
+
+    @functools.cached_property
+    def headers(self) -> list[str] | None:
+        """Column headers from the rows above data_start; see resolve_column_headers()."""
+        if not self.data_start:
+            return None
+        return _combine_header_rows(self.rows[:self.data_start], self.col_count)
+
+    def bound(self, factor: int) -> float:
+        """Upper bound on |adjusted_value| of the numbers extract_from_table() finds
+        here under table multiplier `factor`, without building any of them.
+        """
+        if not self.headers:
+            return 0.0
+        peak = 0.0
+        for row, numbers in zip(self.rows[self.data_start:], self.numbers):
+            if not numbers:
+                continue
+            row_mult = find_header_multiplier((row[0] or "").replace("\n", " ").strip())
+            row_factor = row_mult[1] if row_mult else factor
+            peak = max(peak, max(abs(value) for *_, value in numbers) * row_factor)
+        for cell in self.text_cells:
+            peak = max(peak, _inline_peak(tokenize(cell)))
+        return peak
+
+
+def _parse_row_numbers(
+    lines: list[list[str] | None],
+) -> tuple[list[tuple[int, int, str, float]], set[int]]:
+    """Parse the number-like lines of a data row's cells (column 1 onwards).
+
+    Also returns the columns whose every line parsed, which therefore hold
+    nothing but digits, separators and parentheses.
+    """
+    found = []
+    numeric_cols = set()
+    for col_idx in range(1, len(lines)):
+        cell_lines = lines[col_idx]
+        if not cell_lines:
+            continue
+        parsed = 0
+        for vi, val_text in enumerate(cell_lines):
+            val_text = val_text.strip()
+            value = parse_cell_number(val_text)
+            if value is not None:
+                found.append((col_idx, vi, val_text, value))
+                parsed += 1
+        if parsed == len(cell_lines):
+            numeric_cols.add(col_idx)
+    return found, numeric_cols
+
+
 def resolve_column_headers(rows: list[list]) -> list[str] | None:
     """Determine column headers from the first few rows of a table.
 
@@ -99,24 +179,10 @@ def resolve_column_headers(rows: list[list]) -> list[str] | None:
     """
     if not rows:
         return None
+    return TableAnalysis(rows).headers
 
-    col_count = max(len(r) for r in rows)
-
-    # Find the first row that contains actual numeric data
-    data_start = None
-    for i, row in enumerate(rows):
-        for cell in row:
-            if cell and is_number(cell.split("\n")[0]):
-                data_start = i
-                break
-        if data_start is not None:
-            break
-
-    if data_start is None or data_start == 0:
-        return None
-
-    header_rows = rows[:data_start]
 
+def _combine_header_rows(header_rows: list[list], col_count: int) -> list[str]:
     # Simple case: single header row
     if len(header_rows) == 1:
         return [(cell or "").replace("\n", " ").strip() for cell in header_rows[0]]
@@ -151,49 +217,57 @@ def resolve_column_headers(rows: list[list]) -> list[str] | None:
     return headers
 
 
-def extract_inline_numbers(text: str) -> list[ExtractedNumber]:
-    """Find inline numbers like '$9.6 billion', '$6M', '2.0 million' in text."""
-    found = []
-    dollar_spans = []
-
-    for match in INLINE_DOLLAR_PATTERN.finditer(text):
-        num_str = match.group(1).replace(",", "")
-        scale = resolve_multiplier(match.group(2))
-        if not scale:
-            continue
-        label, factor = scale
-        value = float(num_str)
-        start = max(0, match.start() - CONTEXT_WINDOW)
-        end = min(len(text), match.end() + CONTEXT_WINDOW)
-        context = text[start:end].replace("\n", " ").strip()
-        found.append(_make_result(
-            value=value, raw=match.group(0).strip(),
-            multiplier_label=label, multiplier=factor,
-            row_label="inline", column="narrative",
-            source_type="narrative", context=context,
-        ))
-        dollar_spans.append((match.start(), match.end()))
-
-    for match in INLINE_BARE_PATTERN.finditer(text):
-        # Skip if this match overlaps with a dollar-pattern match
-        if any(ds <= match.start() < de for ds, de in dollar_spans):
-            continue
-        num_str = match.group(1).replace(",", "")
-        scale = resolve_multiplier(match.group(2))
-        if not scale:
-            continue
-        label, factor = scale
-        value = float(num_str)
-        start = max(0, match.start() - CONTEXT_WINDOW)
-        end = min(len(text), match.end() + CONTEXT_WINDOW)
-        context = text[start:end].replace("\n", " ").strip()
-        found.append(_make_result(
-            value=value, raw=match.group(0).strip(),
-            multiplier_label=label, multiplier=factor,
-            row_label="inline", column="narrative",
-            source_type="narrative", context=context,
-        ))
+def _append_inline_numbers(
+    out: ExtractionResult,
+    text: str,
+    *,
+    column: str,
+    source_type: Literal["narrative", "table_narrative"],
+    section: str | None = None,
+    page: int | None = None,
+    source: str | None = None,
+    tokens: list[Token] | None = None,
+) -> None:
+    """Append inline numbers found in text to out, with the given provenance.
 
+    Consumes the lexer's dollar and bare-scaled tokens; pass `tokens` to reuse
+    a scan already made of text. Dollar amounts are emitted before bare ones.
+    """
+    if tokens is None:
+        tokens = tokenize(text)
+    for kind in (DOLLAR, BARE):
+        for token in tokens:
+            if token.kind != kind:
+                continue
+            scale = resolve_multiplier(token.unit)
+            if not scale:
+                continue
+            label, factor = scale
+            value = float(token.number.replace(",", ""))
+            start = max(0, token.start - CONTEXT_WINDOW)
+            end = min(len(text), token.end + CONTEXT_WINDOW)
+            context = text[start:end].replace("\n", " ").strip()
+            out.append(
+                value=value, raw=text[token.start:token.end].strip(),
+                multiplier_label=label, multiplier=factor,
+                row_label="inline", column=column, source_type=source_type,
+                section=section, page=page, source=source, context=context,
+            )
+
+
+def _inline_peak(tokens: list[Token]) -> float:
+    """Largest adjusted amount among a text's dollar and bare-scaled tokens (0.0 if none)."""
+    peak = 0.0
+    for token in tokens:
+        if token.kind in (DOLLAR, BARE) and (scale := resolve_multiplier(token.unit)):
+            peak = max(peak, float(token.number.replace(",", "")) * scale[1])
+    return peak
+
+
+def extract_inline_numbers(text: str) -> ExtractionResult:
+    """Find inline numbers like '$9.6 billion', '$6M', '2.0 million' in text."""
+    found = ExtractionResult()
+    _append_inline_numbers(found, text, column="narrative", source_type="narrative")
     return found
 
 
@@ -202,15 +276,17 @@ def extract_from_text(
     section: str | None = None,
     page: int | None = None,
     source: str | None = None,
-) -> list[ExtractedNumber]:
+) -> ExtractionResult:
     """Extract inline numbers from narrative text and attach provenance fields.
 
-    Wraps extract_inline_numbers() with section/page/source metadata.
+    Same matches as extract_inline_numbers(), with section/page/source metadata.
     Testable with plain strings: extract_from_text("budget is 9.6 billion")
     """
-    results = []
-    for inline in extract_inline_numbers(text):
-        results.append({**inline, "section": section, "page": page, "source": source})
+    results = ExtractionResult()
+    _append_inline_numbers(
+        results, text, column="narrative", source_type="narrative",
+        section=section, page=page, source=source,
+    )
     return results
 
 
@@ -221,12 +297,14 @@ def extract_from_table(
     section: str | None = None,
     page: int | None = None,
     source: str | None = None,
-) -> list[ExtractedNumber]:
+    analysis: TableAnalysis | None = None,
+) -> ExtractionResult:
     """Extract numbers from structured table rows.
 
     Takes row data (the table["extract"] format) and handles: header resolution,
     data-row iteration, sub-row splitting, decimal heuristic, row-level multiplier
-    override. Also scans cells for inline numbers.
+    override. Also scans cells for inline numbers. Pass `analysis` to reuse a
+    TableAnalysis already built for rows.
 
     Testable with list-of-lists:
         extract_from_table(
@@ -234,23 +312,19 @@ def extract_from_table(
             multiplier_label="Million", multiplier=1_000_000,
         )
     """
-    results = []
+    results = ExtractionResult()
+    if not rows:
+        return results
+    if analysis is None:
+        analysis = TableAnalysis(rows)
 
-    headers = resolve_column_headers(rows)
+    headers = analysis.headers
     if not headers:
         return results
 
-    # Find where data rows start (first row with a number)
-    data_start = 0
-    for i, row in enumerate(rows):
-        for cell in row:
-            if cell and is_number(cell.split("\n")[0]):
-                data_start = i
-                break
-        if data_start > 0:
-            break
-
-    for row in rows[data_start:]:
+    for row, numbers in zip(rows[analysis.data_start:], analysis.numbers):
+        if not numbers:
+            continue
         # Column 0 is typically the row label
         row_label = (row[0] or "").replace("\n", " ").strip() if row else ""
 
@@ -258,62 +332,39 @@ def extract_from_table(
         # e.g. "(Hours in Thousands)" — overrides the decimal heuristic
         row_mult = find_header_multiplier(row_label)
 
-        for col_idx in range(1, len(row)):
-            cell = row[col_idx] if col_idx < len(row) else None
-            if not cell:
-                continue
-
-            # A cell can contain multiple values separated by newlines
-            # (e.g. "1\n1" for Equipment + Total sub-rows)
-            sub_labels = row_label.split("\n") if "\n" in (row[0] or "") else [row_label]
-            sub_values = cell.split("\n")
-
-            for vi, val_text in enumerate(sub_values):
-                val_text = val_text.strip()
-                if not is_number(val_text):
-                    continue
-
-                parsed_val = parse_number(val_text)
-                if parsed_val is None:
-                    continue
-
-                col_header = headers[col_idx] if col_idx < len(headers) else f"col_{col_idx}"
-                sub_label = sub_labels[vi].strip() if vi < len(sub_labels) else sub_labels[-1].strip()
-
-                # If the row label itself declares a multiplier (e.g.
-                # "(Hours in Thousands)"), use that unconditionally.
-                # Otherwise, whole numbers (no decimal) are typically
-                # counts/headcounts — skip the table-level multiplier.
-                if row_mult:
-                    effective_label, effective_factor = row_mult
-                elif "." in val_text:
-                    effective_label, effective_factor = multiplier_label, multiplier
-                else:
-                    effective_label, effective_factor = None, 1
-
-                results.append(_make_result(
-                    value=parsed_val, raw=val_text,
-                    multiplier_label=effective_label, multiplier=effective_factor,
-                    row_label=sub_label, column=col_header,
-                    source_type="table",
-                    section=section, page=page, source=source,
-                ))
-
-    # Also scan all table cells for inline numbers in narrative text
-    for row in rows:
-        for cell in row:
-            if not cell:
-                continue
-            for inline in extract_inline_numbers(cell):
-                results.append({
-                    **inline,
-                    "row_label": "inline",
-                    "column": "table narrative",
-                    "source_type": "table_narrative",
-                    "section": section,
-                    "page": page,
-                    "source": source,
-                })
+        # A cell can contain multiple values separated by newlines
+        # (e.g. "1\n1" for Equipment + Total sub-rows)
+        sub_labels = row_label.split("\n") if "\n" in (row[0] or "") else [row_label]
+
+        for col_idx, vi, val_text, parsed_val in numbers:
+            col_header = headers[col_idx] if col_idx < len(headers) else f"col_{col_idx}"
+            sub_label = sub_labels[vi].strip() if vi < len(sub_labels) else sub_labels[-1].strip()
+
+            # If the row label itself declares a multiplier (e.g.
+            # "(Hours in Thousands)"), use that unconditionally.
+            # Otherwise, whole numbers (no decimal) are typically
+            # counts/headcounts — skip the table-level multiplier.
+            if row_mult:
+                effective_label, effective_factor = row_mult
+            elif "." in val_text:
+                effective_label, effective_factor = multiplier_label, multiplier
+            else:
+                effective_label, effective_factor = None, 1
+
+            results.append(
+                value=parsed_val, raw=val_text,
+                multiplier_label=effective_label, multiplier=effective_factor,
+                row_label=sub_label, column=col_header,
+                source_type="table",
+                section=section, page=page, source=source,
+            )
+
+    # Also scan table cells for inline numbers in narrative text
+    for cell in analysis.text_cells:
+        _append_inline_numbers(
+            results, cell, column="table narrative", source_type="table_narrative",
+            section=section, page=page, source=source,
+        )
 
     return results
 
@@ -329,50 +380,141 @@ def mult_for_y(
     return result
 
 
-def extract_from_pages(pages: list[dict], source: str) -> list[ExtractedNumber]:
-    """Extract numbers from pre-parsed page data (pymupdf4llm JSON structure).
+class MultiplierIndex:
+    """Multiplier declarations on a page, indexed by y-position.
 
-    Walks boxes, resolves page-level multipliers, handles banner table promotion,
-    delegates to extract_from_text() and extract_from_table().
-    Testable with synthetic page dicts.
+    Answers the same question as mult_for_y() (the most recently added
+    declaration at or above y) with a binary search. An entry added at or
+    above the y of an earlier entry shadows that entry for every query that
+    could reach both, so add() drops shadowed entries. The survivors are then
+    sorted by y and by insertion order at the same time, which is what makes
+    lookup() a bisect.
     """
-    results = []
 
-    for page in pages:
-        page_num = page["page_number"]
-        boxes = sorted(page.get("boxes", []), key=lambda b: b["y0"])
+    def __init__(self, positions: list[tuple[float, str, int]] = ()):
+        self._ys: list[float] = []
+        self._scales: list[tuple[str, int]] = []
+        for y, label, factor in positions:
+            self.add(y, label, factor)
 
-        # Find multiplier declarations and their y-positions from non-table boxes.
-        # Table-embedded multipliers (like "Cash ($M)") apply only to that table.
-        mult_positions = []
-        section_name = None
-        for box in boxes:
+    def add(self, y: float, label: str, factor: int) -> None:
+        """Record a declaration; amortized O(1) plus a bisect."""
+        i = bisect.bisect_left(self._ys, y)
+        del self._ys[i:]
+        del self._scales[i:]
+        self._ys.append(y)
+        self._scales.append((label, factor))
+
+    def lookup(self, y: float) -> tuple[str, int] | None:
+        """Return the most recent (label, factor) declared at or above y, in O(log n)."""
+        i = bisect.bisect_right(self._ys, y)
+        return self._scales[i - 1] if i else None
+
+    def __len__(self) -> int:
+        return len(self._ys)
+
+
+class BoxScan(NamedTuple):
+    text: str                       # get_box_text() of the box
+    tokens: list[Token]             # tokenize(text)
+    scale: tuple[str, int] | None   # header_multiplier(tokens)
+
+
+class PageView:
+    """One page's boxes in reading (y) order, with each box's text work done once.
+
+    scan(i) joins box i's text, lexes it and resolves its header multiplier on
+    first use and returns the memoized BoxScan afterwards, so the multiplier
+    pass and the extraction pass share a single scan per box.
+    """
+
+    def __init__(self, page: dict):
+        self.page_number = page["page_number"]
+        self.boxes = sorted(page.get("boxes", []), key=lambda b: b["y0"])
+        self._scans: dict[int, BoxScan] = {}
+
+    def scan(self, i: int) -> BoxScan:
+        scan = self._scans.get(i)
+        if scan is None:
+            text = get_box_text(self.boxes[i])
+            tokens = tokenize(text)
+            scan = self._scans[i] = BoxScan(text, tokens, header_multiplier(tokens))
+        return scan
+
+    @property
+    def tokens_scanned(self) -> int:
+        """Lexer matches across the boxes scanned so far."""
+        return sum(len(scan.tokens) for scan in self._scans.values())
+
+    def declarations(self) -> list[tuple[float, str, int]]:
+        """(y, label, factor) of every multiplier declared outside tables, top to bottom.
+
+        Table-embedded multipliers (like "Cash ($M)") apply only to that table.
+        """
+        found = []
+        for i, box in enumerate(self.boxes):
             if box["boxclass"] == "table":
                 continue
-            text = get_box_text(box)
-            scale = find_header_multiplier(text)
+            scale = self.scan(i).scale
             if scale:
-                label, factor = scale
-                mult_positions.append((box["y0"], label, factor))
+                found.append((box["y0"], *scale))
+        return found
+
+
+def _timed_boxes(boxes: list[dict], metrics: Metrics) -> Iterator[tuple[int, dict]]:
+    """enumerate(boxes), charging the caller's time on each box to its boxclass."""
+    for i, box in enumerate(boxes):
+        t0 = time.perf_counter()
+        yield i, box
+        metrics.add_box(box["boxclass"], time.perf_counter() - t0)
+
+
+def extract_from_pages(
+    pages: list[dict], source: str | None, metrics: Metrics | None = None, top: TopK | None = None,
+) -> ExtractionResult:
+    """Extract numbers from pre-parsed page data (pymupdf4llm JSON structure).
+
+    Walks boxes, resolves page-level multipliers, handles banner table promotion,
+    extracts inline numbers from text boxes and delegates tables to extract_from_table().
+    Testable with synthetic page dicts. With metrics, records per-page and
+    per-boxclass time and table/cell/token/number counts.
+
+    With `top`, each box's numbers are offered to it as they are found, and
+    tables whose TableAnalysis.bound() can't beat top.floor are skipped; the
+    returned result then lacks the skipped tables' numbers.
+    """
+    results = ExtractionResult()
+
+    for page in pages:
+        if metrics is not None:
+            t_page, emitted = time.perf_counter(), len(results)
+        view = PageView(page)
+        page_num = view.page_number
+        mult_index = MultiplierIndex(view.declarations())
+        section_name = None
+        if metrics is not None:
+            metrics.add_stage("page multipliers", time.perf_counter() - t_page)
 
-        for box in boxes:
+        boxes = enumerate(view.boxes) if metrics is None else _timed_boxes(view.boxes, metrics)
+        for i, box in boxes:
             bc = box["boxclass"]
 
             if bc == "section-header":
-                text = get_box_text(box)
+                scan = view.scan(i)
                 # Skip section headers that are only a multiplier declaration
-                stripped = text
-                for p in HEADER_UNIT_PATTERNS:
-                    stripped = p.sub("", stripped)
-                if not find_header_multiplier(text) or stripped.strip():
-                    section_name = text
+                if not scan.scale or strip_header_units(scan.text).strip():
+                    section_name = scan.text
 
             # Extract inline numbers from narrative text boxes
             if bc == "text":
-                text = get_box_text(box)
-                results.extend(extract_from_text(
-                    text, section=section_name, page=page_num, source=source,
-                ))
+                scan = view.scan(i)
+                emitted_before = len(results)
+                _append_inline_numbers(
+                    results, scan.text, column="narrative", source_type="narrative",
+                    section=section_name, page=page_num, source=source, tokens=scan.tokens,
+                )
+                if top is not None:
+                    top.extend(results, emitted_before)
 
             elif bc == "table" and box.get("table"):
                 table = box["table"]
@@ -380,21 +522,19 @@ def extract_from_pages(pages: list[dict], source: str) -> list[ExtractedNumber]:
                 if not rows:
                     continue
 
-                # Check if this table has any data rows (cells with numbers)
-                has_data = any(
-                    cell and is_number(cell.split("\n")[0])
-                    for row in rows for cell in row if cell
-                )
-
-                # Check for multiplier embedded in table cells/headers
-                table_text = " ".join(cell for row in rows for cell in row if cell)
-                table_mult = find_header_multiplier(table_text)
+                # One pass over the rows: data rows (cells with numbers),
+                # parsed cells, and any multiplier embedded in cells/headers
+                analysis = TableAnalysis(rows)
+                table_mult = analysis.multiplier
+                if metrics is not None:
+                    metrics.counters["tables"] += 1
+                    metrics.counters["table_cells"] += analysis.cell_count
 
-                if table_mult and not has_data:
+                if table_mult and not analysis.has_data:
                     # Pure metadata/banner table (e.g. Fund/Unit/FY info).
                     # Promote its multiplier to page-level so data tables below can use it.
                     label, factor = table_mult
-                    mult_positions.append((box["y0"], label, factor))
+                    mult_index.add(box["y0"], label, factor)
                     continue
 
                 # Use table-embedded multiplier if found, otherwise fall back to
@@ -402,7 +542,7 @@ def extract_from_pages(pages: list[dict], source: str) -> list[ExtractedNumber]:
                 if table_mult:
                     mult_label, mult_factor = table_mult
                 else:
-                    scale = mult_for_y(mult_positions, box["y0"])
+                    scale = mult_index.lookup(box["y0"])
                     if scale:
                         mult_label, mult_factor = scale
                     else:
@@ -414,6 +554,11 @@ def extract_from_pages(pages: list[dict], source: str) -> list[ExtractedNumber]:
                         )
                         logger.info("no multiplier for table '%s' [page %d]", table_name, page_num)
 
+                if top is not None and analysis.bound(mult_factor) <= top.floor:
+                    if metrics is not None:
+                        metrics.counters["pruned_tables"] += 1
+                    continue
+                emitted_before = len(results)
                 results.extend(extract_from_table(
                     rows,
                     multiplier_label=mult_label,
@@ -421,22 +566,512 @@ def extract_from_pages(pages: list[dict], source: str) -> list[ExtractedNumber]:
                     section=section_name,
                     page=page_num,
                     source=source,
+                    analysis=analysis,
                 ))
+                if top is not None:
+                    top.extend(results, emitted_before)
+
+        if metrics is not None:
+            numbers = len(results) - emitted
+            metrics.add_page(page_num, time.perf_counter() - t_page, len(view.boxes), numbers)
+            metrics.counters["pages"] += 1
+            metrics.counters["numbers"] += numbers
+            metrics.counters["tokens"] += view.tokens_scanned
 
     return results
 
 
-def extract_from_pdf(path: str) -> list[ExtractedNumber]:
+# Page triage classes: pages with nothing to extract, pages whose numbers are all
+# inline amounts in running text, and pages that need the layout engine.
+PageClass = Literal["skip", "narrative", "layout"]
+
+# Number-only lines needed before a page is treated as holding a table; a lone
+# page number or footnote marker doesn't count.
+TRIAGE_MIN_CELLS = 3
+
+
+def triage_page(text: str) -> PageClass:
+    """Classify a page from its plain text layer, without layout analysis.
+
+    Pages with table-like number lines or a header multiplier declaration go to
+    layout, as do pages with no text at all (scans, which may need OCR). Of the
+    rest, pages with inline scaled amounts are narrative and the others skip.
+    """
+    if not text.strip():
+        return "layout"
+    cells = 0
+    for line in text.splitlines():
+        if is_number(line):
+            cells += 1
+            if cells >= TRIAGE_MIN_CELLS:
+                return "layout"
+    tokens = tokenize(text)
+    if any(t.kind == HEADER_UNIT for t in tokens):
+        return "layout"
+    return "narrative" if tokens else "skip"
+
+
+_DIGIT_RUN = re.compile(r"[\d,]+")
+
+
+def page_bound(text: str) -> float:
+    """Upper bound on |adjusted_value| of any number extracted from a page, from its text layer.
+
+    Every number is at most its digit run long, and is scaled by at most the
+    largest multiplier mentioned anywhere on the page: 10 ** (longest digit run)
+    times that factor. Pages with no text (scans, which layout may OCR) are
+    unbounded.
+    """
+    if not text.strip():
+        return math.inf
+    factor = 1
+    for token in tokenize(text):
+        scale = resolve_multiplier(token.unit)
+        if scale:
+            factor = max(factor, scale[1])
+    digits = max((len(run) - run.count(",") for run in _DIGIT_RUN.findall(text)), default=0)
+    return 10.0 ** digits * factor
+
+
+# A PDF as a filesystem path, or its bytes in memory
+PdfInput = str | os.PathLike | bytes | bytearray | memoryview | mmap.mmap | BinaryIO
+
+
+@contextmanager
+def pdf_input(pdf: PdfInput) -> Iterator[str | memoryview]:
+    """Normalize a PDF argument to a path or a memoryview of its bytes.
+
+    Buffers (bytes, bytearray, memoryview, mmap) are viewed, not copied. File
+    objects backed by a real file are memory-mapped whole, io.BytesIO is viewed
+    through getbuffer(), and any other stream is read to its end. The view is
+    released on exit, so documents opened on it must be closed by then.
+    """
+    if isinstance(pdf, (str, os.PathLike)):
+        yield os.fspath(pdf)
+        return
+    mapped = None
+    if isinstance(pdf, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(pdf)
+    elif isinstance(pdf, io.BytesIO):
+        view = pdf.getbuffer()
+    else:
+        try:
+            mapped = mmap.mmap(pdf.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+        except (AttributeError, OSError, ValueError):  # no descriptor, a pipe, or an empty file
+            view = memoryview(pdf.read())
+    view = view.cast("B") if view.format != "B" else view
+    try:
+        yield view
+    finally:
+        view.release()
+        if mapped is not None:
+            mapped.close()
+
+
+def _open_pdf(pdf: str | memoryview) -> "pymupdf.Document":
+    """Open a pdf_input() value; PyMuPDF reads a memoryview in place."""
+    import pymupdf
+
+    if isinstance(pdf, str):
+        return pymupdf.open(pdf)
+    return pymupdf.open(stream=pdf, filetype="pdf")
+
+
+def _source_name(pdf: PdfInput) -> str | None:
+    """File name recorded on extracted numbers: the path's, or a file object's if it has one."""
+    name = pdf if isinstance(pdf, (str, os.PathLike)) else getattr(pdf, "name", None)
+    return pathlib.Path(name).name if isinstance(name, (str, os.PathLike)) else None
+
+
+def triage_pdf(path: PdfInput) -> list[PageClass]:
+    """Classify every page of a PDF with triage_page()."""
+    with pdf_input(path) as pdf, _open_pdf(pdf) as doc:
+        classes = [triage_page(page.get_text()) for page in doc]
+    counts = Counter(classes)
+    logger.info(
+        "triage: %d skip, %d narrative, %d layout",
+        counts["skip"], counts["narrative"], counts["layout"],
+    )
+    return classes
+
+
+def _narrative_blocks(page) -> Iterator[str]:
+    """A page's text-layer blocks, each joined onto one line like a layout box's text."""
+    for block in page.get_text("blocks"):
+        if block[6] == 0:  # text, not image
+            yield " ".join(block[4].split("\n")).strip()
+
+
+def _page_chunks(page_count: int, size: int) -> list[list[int]]:
+    """Split page indices into contiguous chunks of at most `size` pages."""
+    size = max(1, size)
+    return [list(range(i, min(i + size, page_count))) for i in range(0, page_count, size)]
+
+
+def _page_ranges(page_count: int, workers: int) -> list[list[int]]:
+    """Split page indices into at most `workers` contiguous, near-equal ranges."""
+    return _page_chunks(page_count, math.ceil(page_count / max(1, workers)))
+
+
+def _layout_range(
+    doc: "str | memoryview | pymupdf.Document", pages: list[int] | None, backend: str = DEFAULT_BACKEND,
+) -> list[dict]:
+    """Run a layout backend over a page range (None = all pages).
+
+    Accepts a path, PDF bytes or an open Document and returns page dicts built
+    directly from the in-memory layout, without a JSON round trip.
+    """
+    if isinstance(doc, memoryview):
+        with _open_pdf(doc) as opened:
+            return get_backend(backend).layout(opened, pages)
+    return get_backend(backend).layout(doc, pages)
+
+
+class _SharedPdf(NamedTuple):
+    """Picklable handle to PDF bytes the parent copied into shared memory."""
+    name: str
+    size: int
+
+
+def _layout_task(pdf: "str | _SharedPdf", pages: list[int], backend: str) -> list[dict]:
+    """Process pool task: map the PDF (file or shared block) and lay out a page range.
+
+    Workers read the document through a read-only mapping, so they all share
+    the same physical pages instead of each buffering its own copy.
+    """
+    if isinstance(pdf, _SharedPdf):
+        block = shared_memory.SharedMemory(name=pdf.name)
+        view, close = block.buf[:pdf.size], block.close
+    else:
+        with open(pdf, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view, close = memoryview(mapped), mapped.close
+    try:
+        return _layout_range(view, pages, backend)
+    finally:
+        view.release()
+        close()
+
+
+def _page_count(pdf: str | memoryview) -> int:
+    """Number of pages in a pdf_input() value."""
+    with _open_pdf(pdf) as doc:
+        return doc.page_count
+
+
+def layout_pdf(
+    path: PdfInput,
+    workers: int = 1,
+    pages: list[int] | None = None,
+    cache: DiskCache | None = None,
+    backend: str = DEFAULT_BACKEND,
+) -> list[dict]:
+    """Run layout analysis on a PDF, returning page dicts for extract_from_pages().
+
+    With workers > 1 the pages are split into contiguous ranges that are
+    analysed in a process pool; the page dicts are merged back in page order, so
+    the result is identical to a serial run. Workers map the input file, or one
+    shared-memory copy of in-memory input, rather than each reading it. `pages`
+    restricts analysis to the given 0-based page indices. With a cache,
+    previously analysed pages are loaded from disk instead.
+    """
+    with pdf_input(path) as pdf:
+        if cache is not None:
+            texts, fresh = _cached_layout(pdf, workers, cache, pages, backend)
+            return [page if page is not None else json.loads(text) for text, page in zip(texts, fresh)]
+
+        if pages is None:
+            if workers <= 1:
+                return _layout_range(pdf, None, backend)
+            pages = list(range(_page_count(pdf)))
+        if not pages:
+            return []
+
+        ranges = [[pages[i] for i in r] for r in _page_ranges(len(pages), workers)]
+        if len(ranges) <= 1:
+            return _layout_range(pdf, pages, backend)
+        return _layout_in_pool(pdf, ranges, backend)
+
+
+def _layout_in_pool(pdf: str | memoryview, ranges: list[list[int]], backend: str) -> list[dict]:
+    """Lay out each page range in its own worker process, in page order."""
+    block = None
+    if isinstance(pdf, memoryview):
+        block = shared_memory.SharedMemory(create=True, size=pdf.nbytes)
+        block.buf[:pdf.nbytes] = pdf
+        pdf = _SharedPdf(block.name, pdf.nbytes)
+    try:
+        # "spawn" avoids forking a parent that may already hold layout-model threads.
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=ctx) as pool:
+            parts = list(pool.map(_layout_task, [pdf] * len(ranges), ranges, [backend] * len(ranges)))
+    finally:
+        if block is not None:
+            block.close()
+            block.unlink()
+    return [page for part in parts for page in part]
+
+
+def _cached_layout(
+    path: PdfInput,
+    workers: int,
+    cache: DiskCache,
+    pages: list[int] | None = None,
+    backend: str = DEFAULT_BACKEND,
+) -> tuple[list[str], list[dict | None]]:
+    """Return each page's layout as JSON text, running layout only on cache misses.
+
+    Covers `pages` (0-based indices) or the whole document. Also returns the
+    page dicts that were freshly laid out (None for cache hits) so callers don't
+    have to parse them back from text.
+    """
+    with pdf_input(path) as pdf:
+        pdf_hash = file_hash(pdf) if isinstance(pdf, str) else data_hash(pdf)
+        if pages is None:
+            pages = list(range(_page_count(pdf)))
+        engine = get_backend(backend)
+        keys = [layout_key(pdf_hash, i, f"{engine.name}:{engine.version()}") for i in pages]
+        texts = [cache.get(LAYOUT, key) for key in keys]
+        fresh: list[dict | None] = [None] * len(pages)
+
+        missing = [j for j, text in enumerate(texts) if text is None]
+        if missing:
+            laid_out = layout_pdf(pdf, workers=workers, pages=[pages[j] for j in missing], backend=backend)
+            for j, page in zip(missing, laid_out):
+                texts[j] = json.dumps(page, ensure_ascii=False, default=_json_default)
+                cache.put(LAYOUT, keys[j], texts[j])
+                fresh[j] = page
+    logger.debug("layout cache: %d/%d pages reused", len(pages) - len(missing), len(pages))
+    return texts, fresh
+
+
+def _extract_page_cached(
+    text: str,
+    page: dict | None,
+    source: str | None,
+    cache: DiskCache,
+    metrics: Metrics | None = None,
+) -> ExtractionResult:
+    """extract_from_pages() on one page's layout JSON, via the results tier."""
+    key = results_key(text_hash(text), source)
+    cached = cache.get(RESULTS, key)
+    if cached is not None:
+        page_results = ExtractionResult(json.loads(cached))
+        if metrics is not None:
+            metrics.counters["cached_numbers"] += len(page_results)
+        return page_results
+    page_results = extract_from_pages([page if page is not None else json.loads(text)], source, metrics)
+    cache.put(RESULTS, key, json.dumps(page_results.to_list()))
+    return page_results
+
+
+def _json_default(obj):
+    """json.dumps fallback for layout objects (mirrors pymupdf4llm's encoder)."""
+    import pymupdf
+
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode()
+    if isinstance(obj, (pymupdf.Rect, pymupdf.Point, pymupdf.Matrix, pymupdf.IRect, pymupdf.Quad)):
+        return list(obj)
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_layout_json(pages: list[dict]) -> str:
+    """Serialize layout page dicts to a pymupdf4llm-style JSON string (debug only)."""
+    return json.dumps({"pages": pages}, ensure_ascii=False, default=_json_default)
+
+
+def iter_extract_pdf(
+    path: PdfInput, chunk_size: int = 1, backend: str = DEFAULT_BACKEND, source: str | None = None,
+) -> Iterator[ExtractedNumber]:
+    """Yield extracted numbers as each chunk of pages is laid out.
+
+    Layout runs `chunk_size` pages at a time on a single open document, so only
+    one chunk of layout data is held in memory and the first results arrive as
+    soon as the first page is analysed. Output order matches extract_from_pdf().
+    """
+    if source is None:
+        source = _source_name(path)
+    with pdf_input(path) as pdf, _open_pdf(pdf) as doc:
+        for pages in _page_chunks(doc.page_count, chunk_size):
+            yield from extract_from_pages(_layout_range(doc, pages, backend), source)
+
+
+def extract_from_pdf(
+    path: PdfInput,
+    workers: int = 1,
+    cache: DiskCache | None = None,
+    page_classes: list[PageClass] | None = None,
+    backend: str = DEFAULT_BACKEND,
+    metrics: Metrics | None = None,
+    source: str | None = None,
+) -> ExtractionResult:
     """Extract all numeric values from tables and narrative text in a PDF.
 
-    Thin wrapper: calls pymupdf4llm, then delegates to extract_from_pages().
+    Thin wrapper: runs a layout backend (pymupdf4llm by default; see
+    backends.py), then delegates to extract_from_pages().
+    Set workers > 1 to run layout analysis on page ranges in parallel. With a
+    cache, per-page layout and per-page results are reused across runs.
+    With page_classes from triage_pdf(), only "layout" pages are laid out;
+    "narrative" pages are read from the text layer with extract_from_text()
+    (their numbers carry no section) and "skip" pages are ignored.
+    Pass a Metrics to collect stage, page and box timings and counts.
     For debug output, use the CLI (main.py --debug).
+
+    `path` may also be the PDF itself in memory (bytes, memoryview, mmap or a
+    file object; see pdf_input()). `source` is the file name recorded on each
+    number, by default the path's or file object's name, else None.
     """
-    with _log_timing("to_json"):
-        data = pymupdf4llm.to_json(path, page_chunks=True)
-    with _log_timing("json.loads"):
-        parsed = json.loads(data)
-    with _log_timing("extraction"):
-        source = pathlib.Path(path).name
-        results = extract_from_pages(parsed["pages"], source)
+    results = ExtractionResult()
+    for page_results in extract_pdf_pages(path, workers, cache, page_classes, backend, metrics, source):
+        results.extend(page_results)
     return results
+
+
+def extract_pdf_pages(
+    path: PdfInput,
+    workers: int = 1,
+    cache: DiskCache | None = None,
+    page_classes: list[PageClass] | None = None,
+    backend: str = DEFAULT_BACKEND,
+    metrics: Metrics | None = None,
+    source: str | None = None,
+) -> Iterator[ExtractionResult]:
+    """extract_from_pdf(), yielding each page's numbers as soon as they are extracted.
+
+    Layout still runs up front, but numbers never pile up: a consumer that
+    writes each page out holds one page of results at a time. Pages with no
+    numbers yield an empty result. The "extraction" metrics stage includes
+    time the consumer spends between pages.
+    """
+    if source is None:
+        source = _source_name(path)
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+
+    with pdf_input(path) as pdf:
+        if page_classes is not None:
+            yield from _extract_triaged(pdf, workers, cache, page_classes, source, backend, metrics)
+        elif cache is not None:
+            with _log_timing("layout", metrics):
+                texts, fresh = _cached_layout(pdf, workers, cache, backend=backend)
+            with _log_timing("extraction", metrics):
+                for text, page in zip(texts, fresh):
+                    yield _extract_page_cached(text, page, source, cache, metrics)
+            logger.debug("cache: %d hits, %d misses", cache.hits, cache.misses)
+        else:
+            with _log_timing("layout", metrics):
+                pages = layout_pdf(pdf, workers=workers, backend=backend)
+            with _log_timing("extraction", metrics):
+                for page in pages:
+                    yield extract_from_pages([page], source, metrics)
+
+    if metrics is not None and cache is not None:
+        metrics.counters["cache_hits"] += cache.hits - hits
+        metrics.counters["cache_misses"] += cache.misses - misses
+
+
+def _extract_triaged(
+    pdf: str | memoryview,
+    workers: int,
+    cache: DiskCache | None,
+    page_classes: list[PageClass],
+    source: str | None,
+    backend: str,
+    metrics: Metrics | None = None,
+) -> Iterator[ExtractionResult]:
+    """extract_pdf_pages() for triaged pages, one result per non-skipped page in page order."""
+    layout_pages = [i for i, c in enumerate(page_classes) if c == "layout"]
+    with _log_timing("layout", metrics):
+        if not layout_pages:
+            laid_out = []
+        elif cache is not None:
+            texts, fresh = _cached_layout(pdf, workers, cache, layout_pages, backend)
+            laid_out = list(zip(texts, fresh))
+        else:
+            laid_out = layout_pdf(pdf, workers=workers, pages=layout_pages, backend=backend)
+    by_index = dict(zip(layout_pages, laid_out))
+
+    with _log_timing("extraction", metrics), _open_pdf(pdf) as doc:
+        for i, page_class in enumerate(page_classes):
+            if page_class == "narrative":
+                results = ExtractionResult()
+                for text in _narrative_blocks(doc[i]):
+                    results.extend(extract_from_text(text, page=i + 1, source=source))
+                if metrics is not None:
+                    metrics.counters["numbers"] += len(results)
+                yield results
+            elif page_class == "layout":
+                if cache is not None:
+                    yield _extract_page_cached(*by_index[i], source, cache, metrics)
+                else:
+                    yield extract_from_pages([by_index[i]], source, metrics)
+
+
+def _page_bounds(doc: "pymupdf.Document", backend: str = DEFAULT_BACKEND) -> list[float]:
+    """page_bound() of every page, unbounded for pages with images if the backend OCRs.
+
+    OCR can find numbers in an image that the text layer doesn't have, so a
+    page's text says nothing about what an OCRing backend will extract from it.
+    """
+    ocr = get_backend(backend).ocr
+    return [math.inf if ocr and page.get_images() else page_bound(page.get_text()) for page in doc]
+
+
+# Pages laid out per worker in each round of largest_in_pdf(); with workers > 1
+# every round starts a process pool, so rounds are a few pages per worker.
+TOP_ROUND_PAGES = 4
+
+
+def largest_in_pdf(
+    path: PdfInput,
+    k: int = 1,
+    workers: int = 1,
+    cache: DiskCache | None = None,
+    backend: str = DEFAULT_BACKEND,
+    metrics: Metrics | None = None,
+    source: str | None = None,
+) -> TopK:
+    """Find the k numbers with the largest |adjusted_value| in a PDF without extracting them all.
+
+    Pages are ranked by page_bound() of their text layer and laid out in that
+    order (pages with images first when the backend may OCR them), one page per round (TOP_ROUND_PAGES per worker with workers > 1).
+    Once the k-th best number found beats a page's bound, that page and every
+    page after it is skipped; inside laid-out pages, extract_from_pages()
+    skips tables that can't beat it either. The magnitudes found match the k
+    largest of extract_from_pdf(), though which of several equal numbers is
+    kept may differ.
+    """
+    if source is None:
+        source = _source_name(path)
+    top = TopK(k)
+    with pdf_input(path) as pdf:
+        with _log_timing("page bounds", metrics), _open_pdf(pdf) as doc:
+            bounds = _page_bounds(doc, backend)
+        order = sorted(range(len(bounds)), key=lambda i: -bounds[i])
+        round_size = 1 if workers <= 1 else workers * TOP_ROUND_PAGES
+        laid_out = 0
+        for start in range(0, len(order), round_size):
+            pages = sorted(i for i in order[start:start + round_size] if bounds[i] > top.floor)
+            if not pages:
+                break  # later pages have lower bounds still
+            laid_out += len(pages)
+            with _log_timing("layout", metrics):
+                if cache is not None:
+                    texts, fresh = _cached_layout(pdf, workers, cache, pages, backend)
+                else:
+                    layouts = layout_pdf(pdf, workers=workers, pages=pages, backend=backend)
+            with _log_timing("extraction", metrics):
+                if cache is not None:
+                    for text, page in zip(texts, fresh):
+                        top.extend(_extract_page_cached(text, page, source, cache, metrics))
+                else:
+                    for page in layouts:
+                        extract_from_pages([page], source, metrics, top)
+    logger.info("top %d: laid out %d of %d pages", k, laid_out, len(bounds))
+    if metrics is not None:
+        metrics.counters["pruned_pages"] += len(bounds) - laid_out
+    return top
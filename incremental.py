@@ -0,0 +1,221 @@
+"""Incremental re-extraction of revised PDFs.
+
+A manifest records, for each page of a previous run, a hash of the page's
+content stream and resources and the numbers extracted from it.
+extract_incremental() hashes the new revision's pages the same way and runs
+layout and extraction only on pages whose hash the manifest doesn't know. Every
+other page reuses its stored numbers, restamped with its current page number
+and file name, and the run reports which numbers were added, removed or
+changed.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from backends import DEFAULT_BACKEND, get_backend
+from cache import DiskCache, data_hash
+from diff import diff_results
+from extract import (
+    PdfInput,
+    _log_timing,
+    _open_pdf,
+    _source_name,
+    extract_from_pages,
+    layout_pdf,
+    pdf_input,
+)
+from metrics import Metrics
+from patterns import config_fingerprint
+from results import ExtractedNumber, ExtractionResult
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 2
+
+_REFERENCE = re.compile(r"\b(\d+) (\d+) R\b")
+
+
+def page_fingerprints(path: PdfInput) -> list[str]:
+    """SHA-256 of each page's content stream, resources, page box and rotation, in page order.
+
+    Reads raw PDF objects only, which is far cheaper than extracting text: the
+    drawing operators plus every object reachable from the page's /Resources
+    (fonts and their encodings, form XObjects, images), undecoded. Two pages
+    with equal fingerprints draw the same text in the same place.
+    """
+    with pdf_input(path) as pdf, _open_pdf(pdf) as doc:
+        memo: dict[int, str] = {}
+        return [
+            data_hash(
+                page.read_contents()
+                + f"|{tuple(page.rect)}|{page.rotation}|{_resources_digest(doc, page.xref, memo)}".encode()
+            )
+            for page in doc
+        ]
+
+
+def _resources_digest(doc, page_xref: int, memo: dict[int, str]) -> str:
+    """Digest of a page's /Resources, inherited from the page tree if need be."""
+    xref = page_xref
+    kind, value = doc.xref_get_key(xref, "Resources")
+    while kind == "null":
+        kind, parent = doc.xref_get_key(xref, "Parent")
+        if kind != "xref":
+            return ""
+        xref = int(parent.split()[0])
+        kind, value = doc.xref_get_key(xref, "Resources")
+    return _resolve(doc, value, memo, set())
+
+
+def _resolve(doc, text: str, memo: dict[int, str], active: set[int]) -> str:
+    """Object source with each indirect reference replaced by its target's digest.
+
+    Digests depend on content, not object numbers, so a page that is
+    unchanged in a rewritten file keeps its fingerprint.
+    """
+    def digest(match: re.Match) -> str:
+        xref = int(match.group(1))
+        if xref in memo:
+            return memo[xref]
+        if xref in active or not 0 < xref < doc.xref_length():
+            return match.group(0)
+        active.add(xref)
+        source = _resolve(doc, doc.xref_object(xref, compressed=True), memo, active).encode()
+        stream = doc.xref_stream_raw(xref) if doc.xref_is_stream(xref) else None
+        active.discard(xref)
+        memo[xref] = data_hash(source + b"|" + (stream or b""))
+        return memo[xref]
+
+    return _REFERENCE.sub(digest, text)
+
+
+class Manifest(NamedTuple):
+    """What one run extracted, page by page, and under which configuration."""
+    engine: str               # layout backend name and version
+    config: str               # patterns.config_fingerprint()
+    source: str | None        # file name of the run, informational only
+    hashes: list[str]         # page_fingerprints() of the PDF
+    pages: list[list[ExtractedNumber]]  # numbers per page, in page order
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "Manifest | None":
+        """Read a manifest written by save(), or None if there is none (or it is unreadable)."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning("ignoring unreadable manifest %s: %s", path, e)
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(data["engine"], data["config"], data["source"], data["hashes"], data["pages"])
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Write the manifest as JSON, replacing the file atomically."""
+        tmp = f"{os.fspath(path)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, **self._asdict()}, f)
+        os.replace(tmp, path)
+
+
+class Delta(NamedTuple):
+    """Numbers that differ between two runs, as paired by diff.match_rows().
+
+    Changed pairs are (old, new).
+    """
+    added: list[ExtractedNumber]
+    removed: list[ExtractedNumber]
+    changed: list[tuple[ExtractedNumber, ExtractedNumber]]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_numbers(old: Iterable[ExtractedNumber], new: Iterable[ExtractedNumber]) -> Delta:
+    """Join old and new numbers on their labels, at any page distance, and report the differences."""
+    delta = Delta([], [], [])
+    for record in diff_results(ExtractionResult(old), ExtractionResult(new), page_tolerance=math.inf):
+        if record["change"] == "added":
+            delta.added.append(record["new"])
+        elif record["change"] == "removed":
+            delta.removed.append(record["old"])
+        else:
+            delta.changed.append((record["old"], record["new"]))
+    return delta
+
+
+def _restamped(numbers: list[ExtractedNumber], page_number: int, source: str | None) -> list[ExtractedNumber]:
+    if all(n["page"] == page_number and n["source"] == source for n in numbers):
+        return numbers
+    return [{**n, "page": page_number, "source": source} for n in numbers]
+
+
+def extract_incremental(
+    path: PdfInput,
+    manifest_path: str | os.PathLike,
+    workers: int = 1,
+    cache: DiskCache | None = None,
+    backend: str = DEFAULT_BACKEND,
+    metrics: Metrics | None = None,
+    source: str | None = None,
+) -> tuple[ExtractionResult, Delta | None]:
+    """extract_from_pdf(), reusing the numbers of pages unchanged since the manifest's run.
+
+    Pages are matched by fingerprint, so pages that were inserted, deleted or
+    moved don't force the rest to be redone, and reused numbers are
+    restamped with this run's page and source, so a revision saved under a
+    new file name still reuses its unchanged pages. The manifest is only
+    trusted when it was written with the same backend version and pattern
+    configuration; otherwise every page is extracted. Either way it is
+    rewritten for this run. The delta compares the numbers of pages that are
+    new in this revision with those of pages that are gone; reused pages
+    contribute nothing to it. It is None when there was no usable manifest
+    to compare against.
+    """
+    if source is None:
+        source = _source_name(path)
+    engine = get_backend(backend)
+    engine_id = f"{engine.name}:{engine.version()}"
+    config = config_fingerprint()
+
+    with pdf_input(path) as pdf:
+        with _log_timing("fingerprints", metrics):
+            hashes = page_fingerprints(pdf)
+        old = Manifest.load(manifest_path)
+        if old is not None and (old.engine, old.config) != (engine_id, config):
+            logger.info("manifest %s is from a different configuration; extracting every page", manifest_path)
+            old = None
+        known = dict(zip(old.hashes, old.pages)) if old else {}
+
+        fresh = [i for i, h in enumerate(hashes) if h not in known]
+        with _log_timing("layout", metrics):
+            laid_out = layout_pdf(pdf, workers=workers, pages=fresh, cache=cache, backend=backend) if fresh else []
+        fresh_pages = {}
+        with _log_timing("extraction", metrics):
+            for i, page in zip(fresh, laid_out):
+                fresh_pages[i] = extract_from_pages([page], source, metrics).to_list()
+
+    pages = [
+        fresh_pages[i] if i in fresh_pages else _restamped(known[h], i + 1, source)
+        for i, h in enumerate(hashes)
+    ]
+    Manifest(engine_id, config, source, hashes, pages).save(manifest_path)
+
+    current = set(hashes)
+    gone = [n for h, numbers in known.items() if h not in current for n in numbers]
+    delta = diff_numbers(gone, (n for i in fresh for n in fresh_pages[i])) if old else None
+    logger.info("incremental: %d of %d pages re-extracted", len(fresh), len(hashes))
+    if metrics is not None:
+        metrics.counters["reused_pages"] += len(hashes) - len(fresh)
+
+    results = ExtractionResult()
+    for numbers in pages:
+        results.extend(numbers)
+    return results, delta
@@ -0,0 +1,253 @@
+"""Persistent SQLite index of extracted numbers, for queries across a corpus.
+
+    python index.py ingest ./inputs 'archive/**/*.pdf' --db numbers.db --workers 8
+    python index.py query --db numbers.db --top 10 --section Procurement --min 1e9
+
+Each document is keyed by the SHA-256 of its contents. Ingesting a file whose
+hash is already indexed is a no-op, and a file whose contents changed replaces
+the rows previously indexed under its path. Queries read the index only; they
+never re-extract.
+"""
+
+import argparse
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from backends import BACKENDS, DEFAULT_BACKEND
+from batch import collect_pdfs, iter_results
+from cache import DEFAULT_CACHE_DIR, file_hash
+from results import ExtractedNumber
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB = pathlib.Path("./numbers.db")
+INSERT_BATCH = 10_000  # rows per executemany() call
+
+_NUMBER_FIELDS = list(ExtractedNumber.__annotations__)
+_COLUMNS = ", ".join(f'"{f}"' for f in _NUMBER_FIELDS)  # quoted: "column" is an SQL keyword
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    pages INTEGER,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS numbers (
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    {_COLUMNS},
+    magnitude REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS numbers_adjusted_value ON numbers(adjusted_value);
+CREATE INDEX IF NOT EXISTS numbers_magnitude ON numbers(magnitude);
+CREATE INDEX IF NOT EXISTS numbers_source ON numbers(source);
+CREATE INDEX IF NOT EXISTS numbers_section ON numbers(section);
+CREATE INDEX IF NOT EXISTS numbers_document ON numbers(document_id);
+CREATE INDEX IF NOT EXISTS documents_path ON documents(path);
+"""
+
+
+class NumberIndex:
+    """SQLite store of ExtractedNumber rows, one document per distinct file hash.
+
+    Rows carry a magnitude column, abs(adjusted_value), so "largest" means the
+    same thing here as in main.py's report.
+    """
+
+    def __init__(self, path: str | os.PathLike = DEFAULT_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def has(self, content_hash: str) -> bool:
+        """Whether a document with these contents is already indexed."""
+        row = self.conn.execute("SELECT 1 FROM documents WHERE hash = ?", (content_hash,)).fetchone()
+        return row is not None
+
+    def add(
+        self,
+        path: str,
+        content_hash: str,
+        numbers: Iterable[ExtractedNumber],
+        pages: int | None = None,
+    ) -> int:
+        """Index one document's numbers in a single transaction; returns the rows inserted.
+
+        Older documents indexed under the same path are replaced. Returns 0
+        without touching the index if content_hash is already present.
+        """
+        with self.conn:
+            if self.has(content_hash):
+                return 0
+            self._delete_path(path)
+            doc_id = self.conn.execute(
+                "INSERT INTO documents (hash, path, pages, ingested_at) VALUES (?, ?, ?, ?)",
+                (content_hash, path, pages, time.time()),
+            ).lastrowid
+            placeholders = ", ".join("?" * (len(_NUMBER_FIELDS) + 2))
+            sql = f"INSERT INTO numbers VALUES ({placeholders})"
+            rows = (
+                (doc_id, *(n[f] for f in _NUMBER_FIELDS), abs(n["adjusted_value"]))
+                for n in numbers
+            )
+            inserted = 0
+            while batch := list(islice(rows, INSERT_BATCH)):
+                self.conn.executemany(sql, batch)
+                inserted += len(batch)
+        return inserted
+
+    def _delete_path(self, path: str) -> None:
+        stale = [r["id"] for r in self.conn.execute("SELECT id FROM documents WHERE path = ?", (path,))]
+        for doc_id in stale:
+            self.conn.execute("DELETE FROM numbers WHERE document_id = ?", (doc_id,))
+            self.conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def query(
+        self,
+        top: int | None = None,
+        min_value: float | None = None,
+        max_value: float | None = None,
+        section: str | None = None,
+        source: str | None = None,
+    ) -> Iterator[ExtractedNumber]:
+        """Yield numbers matching every given filter, largest magnitude first.
+
+        min_value and max_value bound adjusted_value (inclusive); section
+        matches exactly; top limits the number of rows.
+        """
+        where, params = [], []
+        if min_value is not None:
+            where.append("adjusted_value >= ?")
+            params.append(min_value)
+        if max_value is not None:
+            where.append("adjusted_value <= ?")
+            params.append(max_value)
+        if section is not None:
+            where.append("section = ?")
+            params.append(section)
+        if source is not None:
+            where.append("source = ?")
+            params.append(source)
+        sql = f"SELECT {_COLUMNS} FROM numbers"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY magnitude DESC"
+        if top is not None:
+            sql += " LIMIT ?"
+            params.append(top)
+        for row in self.conn.execute(sql, params):
+            yield dict(row)
+
+    def stats(self) -> dict[str, int]:
+        """Counts of indexed documents and numbers."""
+        (docs,) = self.conn.execute("SELECT count(*) FROM documents").fetchone()
+        (numbers,) = self.conn.execute("SELECT count(*) FROM numbers").fetchone()
+        return {"documents": docs, "numbers": numbers}
+
+
+def ingest(
+    index: NumberIndex,
+    paths: list[pathlib.Path],
+    workers: int = 1,
+    cache_dir: str | None = None,
+    backend: str = DEFAULT_BACKEND,
+) -> dict[str, int]:
+    """Extract and index every PDF not already indexed, using batch mode's worker pool.
+
+    Files are hashed up front so unchanged ones are never extracted. Failures
+    are logged and skipped. Returns counts of indexed, unchanged and failed files.
+    """
+    counts = {"indexed": 0, "unchanged": 0, "failed": 0}
+    hashes = {}
+    for path in paths:
+        content_hash = file_hash(path)
+        if index.has(content_hash):
+            counts["unchanged"] += 1
+        else:
+            hashes[str(path)] = content_hash
+    if not hashes:
+        return counts
+
+    for result in iter_results(hashes, workers, cache_dir, backend):
+        if result["error"]:
+            logger.warning("FAILED %s: %s", result["path"], result["error"])
+            counts["failed"] += 1
+            continue
+        rows = index.add(result["path"], hashes[result["path"]], result["numbers"], result["pages"])
+        logger.info("%s: indexed %d numbers", result["path"], rows)
+        counts["indexed"] += 1
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Index extracted numbers in SQLite and query them")
+    parser.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB, help="Index database file")
+    parser.add_argument("--debug", action="store_true", help="Enable verbose logging")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Extract PDFs and add them to the index")
+    ingest_parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    ingest_parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes (default: CPU count)",
+    )
+    ingest_parser.add_argument("--cache-dir", type=pathlib.Path, default=DEFAULT_CACHE_DIR)
+    ingest_parser.add_argument("--no-cache", action="store_true", help="Disable the on-disk cache")
+    ingest_parser.add_argument("--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND, help="Layout engine")
+
+    query_parser = commands.add_parser("query", help="Print matching numbers as JSONL, largest first")
+    query_parser.add_argument("--top", type=int, metavar="K", help="Only the K largest matches")
+    query_parser.add_argument("--min", type=float, dest="min_value", help="Lowest adjusted_value")
+    query_parser.add_argument("--max", type=float, dest="max_value", help="Highest adjusted_value")
+    query_parser.add_argument("--section", help="Only numbers in this section")
+    query_parser.add_argument("--source", help="Only numbers from this source file name")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    with NumberIndex(args.db) as index:
+        if args.command == "ingest":
+            paths = collect_pdfs(args.inputs)
+            if not paths:
+                parser.error("no PDF files found")
+            cache_dir = None if args.no_cache else str(args.cache_dir)
+            t0 = time.perf_counter()
+            counts = ingest(index, paths, workers=args.workers, cache_dir=cache_dir, backend=args.backend)
+            stats = index.stats()
+            print(
+                f"Indexed {counts['indexed']} files ({counts['unchanged']} unchanged, "
+                f"{counts['failed']} failed) in {time.perf_counter() - t0:.1f}s; "
+                f"{args.db} holds {stats['numbers']} numbers from {stats['documents']} documents",
+                file=sys.stderr,
+            )
+            if counts["failed"]:
+                sys.exit(1)
+        else:
+            t0 = time.perf_counter()
+            matches = 0
+            for n in index.query(args.top, args.min_value, args.max_value, args.section, args.source):
+                sys.stdout.write(json.dumps(n) + "\n")
+                matches += 1
+            logger.info("%d matches in %.1f ms", matches, (time.perf_counter() - t0) * 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,94 +1,290 @@
 import argparse
-import json
+import contextlib
 import logging
 import pathlib
+import sys
+from collections import Counter
+from collections.abc import Iterator
+from typing import TextIO
 
-import pymupdf.layout  # noqa: F401 — activate PyMuPDF-Layout before pymupdf4llm
-import pymupdf4llm
-
-from extract import _log_timing, extract_from_pages
+from backends import BACKENDS, DEFAULT_BACKEND
+from cache import DEFAULT_CACHE_DIR, DiskCache
+from daemon import request
+from extract import (
+    _log_timing,
+    _open_pdf,
+    _source_name,
+    dump_layout_json,
+    extract_from_pages,
+    extract_pdf_pages,
+    largest_in_pdf,
+    layout_pdf,
+    pdf_input,
+    triage_pdf,
+)
+from incremental import Delta, extract_incremental
+from metrics import Metrics
+from results import ExtractedNumber, ExtractionResult, TopK
+from writers import WRITERS, open_writer
 
 logger = logging.getLogger(__name__)
 
 
+class _Summary:
+    """End-of-run report, accumulated one number at a time as results stream past."""
+
+    EXAMPLES = 5  # numbers without a multiplier listed by name
+
+    def __init__(self):
+        self.count = 0
+        self.largest_raw: ExtractedNumber | None = None
+        self.largest_adjusted: ExtractedNumber | None = None
+        self.unmultiplied: Counter[int | None] = Counter()  # page -> numbers without a multiplier
+        self.examples: list[ExtractedNumber] = []
+
+    def add(self, n: ExtractedNumber) -> None:
+        self.count += 1
+        if self.largest_raw is None or abs(n["value"]) > abs(self.largest_raw["value"]):
+            self.largest_raw = n
+        if n.get("adjusted_value") is not None and (
+            self.largest_adjusted is None or abs(n["adjusted_value"]) > abs(self.largest_adjusted["adjusted_value"])
+        ):
+            self.largest_adjusted = n
+        if not n.get("multiplier"):
+            self.unmultiplied[n["page"]] += 1
+            if len(self.examples) < self.EXAMPLES:
+                self.examples.append(n)
+
+    def print_warnings(self, file: TextIO) -> None:
+        total = sum(self.unmultiplied.values())
+        if not total:
+            return
+        pages = ", ".join(f"{page} ({count})" for page, count in self.unmultiplied.most_common(10))
+        more = ", ..." if len(self.unmultiplied) > 10 else ""
+        print(f"  WARNING: {total} numbers have no multiplier; by page: {pages}{more}", file=file)
+        for n in self.examples:
+            where = f"{n['row_label']} / {n['column']} [page {n['page']}, {n['section']}]"
+            print(f"    '{n['raw']}' — {where}", file=file)
+        if total > len(self.examples):
+            print(f"    ... and {total - len(self.examples)} more", file=file)
+
+
+def _print_top(top: TopK, pdf_path: str) -> None:
+    """Print the numbers kept by a TopK, largest first."""
+    print(f"Top {top.k} numbers by adjusted value in {pdf_path}:")
+    for rank, n in enumerate(top.items(), 1):
+        mult = f"x{n['multiplier']:,}" if n["multiplier_label"] else "NO MULTIPLIER"
+        print(
+            f"{rank:>4}. {n['adjusted_value']:,.0f} — '{n['raw']}' ({mult}) "
+            f"{n['row_label']} / {n['column']} [page {n['page']}, {n['section']}]"
+        )
+
+
+def _print_delta(delta: Delta, file: TextIO, limit: int = 10) -> None:
+    """Summarize an incremental run's delta, listing up to `limit` numbers of each kind."""
+    print(
+        f"Delta: {len(delta.added)} added, {len(delta.removed)} removed, {len(delta.changed)} changed",
+        file=file,
+    )
+    for sign, numbers in (("+", delta.added), ("-", delta.removed)):
+        for n in numbers[:limit]:
+            print(f"  {sign} '{n['raw']}' — {n['row_label']} / {n['column']} [page {n['page']}]", file=file)
+    for old, new in delta.changed[:limit]:
+        print(
+            f"  ~ '{old['raw']}' -> '{new['raw']}' — {new['row_label']} / {new['column']} [page {new['page']}]",
+            file=file,
+        )
+
+
+def _extract(
+    args: argparse.Namespace,
+    pdf: str | memoryview,
+    cache: DiskCache | None,
+    metrics: Metrics | None,
+    report: TextIO,
+) -> Iterator[ExtractionResult]:
+    """Run layout and extraction on a pdf_input() value as the CLI flags ask, page by page."""
+    output_dir = args.output_dir
+    if args.daemon:
+        job = {"backend": args.backend, "triage": args.triage}
+        if isinstance(pdf, str):
+            reply = request(args.daemon, {**job, "path": str(pathlib.Path(pdf).resolve())})
+        else:
+            reply = request(args.daemon, job, data=pdf)
+        if not reply["ok"]:
+            raise SystemExit(f"daemon failed: {reply['error']}")
+        logger.info("daemon timing: %s", reply["timing"])
+        yield ExtractionResult(reply["numbers"])
+        return
+    if args.debug:
+        # Debug runs always re-extract from the (possibly cached) layout so the
+        # dumps reflect the current code.
+        with _log_timing("layout", metrics):
+            pages = layout_pdf(pdf, workers=args.workers, cache=cache, backend=args.backend)
+        with _log_timing("json dump"):
+            output_dir.joinpath("tmp_raw.json").write_text(
+                dump_layout_json(pages), encoding="utf-8"
+            )
+        with _log_timing("extraction", metrics):
+            source = _source_name(pdf)
+            for page in pages:
+                yield extract_from_pages([page], source, metrics)
+        return
+
+    if args.manifest:
+        numbers, delta = extract_incremental(
+            pdf, args.manifest, workers=args.workers, cache=cache,
+            backend=args.backend, metrics=metrics,
+        )
+        if delta is not None:
+            _print_delta(delta, report)
+        yield numbers
+        return
+
+    page_classes = None
+    if args.triage:
+        with _log_timing("triage", metrics):
+            page_classes = triage_pdf(pdf)
+        print(
+            f"Triage: {page_classes.count('layout')} pages laid out, "
+            f"{page_classes.count('narrative')} narrative-only, "
+            f"{page_classes.count('skip')} skipped",
+            file=report,
+        )
+        if metrics:
+            metrics.counters.update(f"triage_{c}" for c in page_classes)
+    yield from extract_pdf_pages(
+        pdf, workers=args.workers, cache=cache,
+        page_classes=page_classes, backend=args.backend, metrics=metrics,
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Extract numbers from budget PDFs")
-    parser.add_argument("pdf_path", nargs="?", default="./inputs/complete.pdf")
+    parser.add_argument(
+        "pdf_path", nargs="?", default="./inputs/complete.pdf",
+        help="PDF to extract from, or - to read it from stdin (default: ./inputs/complete.pdf)",
+    )
     parser.add_argument("--debug", action="store_true", help="Write raw markdown/json debug files")
     parser.add_argument(
         "--output-dir", type=pathlib.Path, default="./tmp",
         help="Directory for debug output files (default: ./tmp)",
     )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Run layout analysis on page ranges in N processes (default: 1)",
+    )
+    parser.add_argument(
+        "--cache-dir", type=pathlib.Path, default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached layout and extraction results (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Disable the on-disk cache")
+    parser.add_argument(
+        "--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND,
+        help=f"Layout engine (default: {DEFAULT_BACKEND}; 'native' is faster but only finds ruled tables)",
+    )
+    parser.add_argument(
+        "--triage", action="store_true",
+        help="Only run layout on pages that look like they hold tables (ignored with --debug)",
+    )
+    parser.add_argument(
+        "--profile", type=pathlib.Path, metavar="OUT_JSON",
+        help="Write stage, page and box-class timings, counts and peak memory to this JSON file "
+             "(tracemalloc slows the run down)",
+    )
+    parser.add_argument(
+        "--daemon", type=pathlib.Path, metavar="SOCKET",
+        help="Send the job to a running daemon.py on this socket instead of extracting in-process",
+    )
+    parser.add_argument(
+        "--format", choices=list(WRITERS),
+        help="Stream every extracted number to --output in this format as pages finish",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-",
+        help="File for --format output (default: stdout; the report then goes to stderr)",
+    )
+    parser.add_argument(
+        "--top", type=int, metavar="K",
+        help="Only find the K largest numbers, skipping pages and tables that can't hold one",
+    )
+    parser.add_argument(
+        "--manifest", type=pathlib.Path, metavar="PATH",
+        help="Re-extract only pages that changed since the run that wrote PATH, print what "
+             "changed, and update PATH",
+    )
     args = parser.parse_args()
+    if args.daemon and (args.debug or args.profile):
+        parser.error("--daemon cannot be combined with --debug or --profile")
+    if args.top is not None and (args.debug or args.daemon or args.format or args.triage):
+        parser.error("--top cannot be combined with --debug, --daemon, --format or --triage")
+    if args.manifest and (args.debug or args.daemon or args.triage or args.top is not None):
+        parser.error("--manifest cannot be combined with --debug, --daemon, --triage or --top")
+    if args.top is not None and args.top < 1:
+        parser.error("--top must be at least 1")
 
     logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
 
     output_dir = args.output_dir
+    cache = None if args.no_cache else DiskCache(args.cache_dir)
 
+    # Keep stdout clean for data when a format is streamed there
+    report = sys.stderr if args.format and args.output == "-" else sys.stdout
+    writers = []
     if args.debug:
         output_dir.mkdir(parents=True, exist_ok=True)
-        with _log_timing("to_markdown"):
-            md_text = pymupdf4llm.to_markdown(args.pdf_path, page_chunks=False)
-        output_dir.joinpath("tmp_raw.md").write_text(md_text, encoding="utf-8")
-
-    with _log_timing("to_json"):
-        raw_json = pymupdf4llm.to_json(args.pdf_path, page_chunks=True)
-
-    if args.debug:
-        output_dir.joinpath("tmp_raw.json").write_text(raw_json, encoding="utf-8")
+        writers += [open_writer("json", output_dir / "tmp.json"), open_writer("markdown", output_dir / "tmp.md")]
+    if args.format:
+        writers.append(open_writer(args.format, args.output))
 
-    with _log_timing("json.loads"):
-        parsed = json.loads(raw_json)
-
-    with _log_timing("extraction"):
-        source = pathlib.Path(args.pdf_path).name
-        numbers = extract_from_pages(parsed["pages"], source)
-
-    if args.debug:
-        # Save as JSON for programmatic use
-        output_dir.joinpath("tmp.json").write_text(
-            json.dumps(numbers, indent=2), encoding="utf-8"
-        )
-
-        # Save readable markdown summary
-        lines = ["# Extracted Numbers\n"]
-        for n in numbers:
-            if n.get("multiplier"):
-                mult = f"x{n['multiplier']:,}"
-                adj = f", adjusted={n['adjusted_value']:,.0f}" if n.get("adjusted_value") else ""
-            else:
-                mult = "NO MULTIPLIER"
-                adj = ""
-            line = (
-                f"- **{n['raw']}** ({mult}{adj}) — "
-                f"{n['row_label']} / {n['column']} "
-                f"[page {n['page']}, {n['section']}]"
+    metrics = Metrics() if args.profile else None
+    if args.top is not None:
+        with metrics.trace_memory() if metrics else contextlib.nullcontext():
+            top = largest_in_pdf(
+                sys.stdin.buffer if args.pdf_path == "-" else args.pdf_path, args.top,
+                workers=args.workers, cache=cache, backend=args.backend, metrics=metrics,
             )
-            if n.get("context"):
-                line += f"\n  > ...{n['context']}..."
-            lines.append(line)
-        output_dir.joinpath("tmp.md").write_text("\n".join(lines), encoding="utf-8")
+        if metrics:
+            metrics.write(args.profile)
+        _print_top(top, args.pdf_path)
+        return
 
-    # Print warnings for numbers without multipliers
-    for n in numbers:
-        if not n.get("multiplier"):
-            print(f"  WARNING: no multiplier for '{n['raw']}' — {n['row_label']} / {n['column']} [page {n['page']}, {n['section']}]")
+    summary = _Summary()
+    with pdf_input(sys.stdin.buffer if args.pdf_path == "-" else args.pdf_path) as pdf:
+        if args.debug:
+            import pymupdf.layout  # noqa: F401 — activate PyMuPDF-Layout before pymupdf4llm
+            import pymupdf4llm
+
+            with _log_timing("to_markdown"), _open_pdf(pdf) as doc:
+                md_text = pymupdf4llm.to_markdown(doc, page_chunks=False)
+            output_dir.joinpath("tmp_raw.md").write_text(md_text, encoding="utf-8")
 
-    # Find largest numbers
-    largest_raw = max(numbers, key=lambda n: abs(n["value"]))
-    has_adjusted = [n for n in numbers if n.get("adjusted_value") is not None]
-    largest_adj = max(has_adjusted, key=lambda n: abs(n["adjusted_value"])) if has_adjusted else None
+        with metrics.trace_memory() if metrics else contextlib.nullcontext():
+            for page_results in _extract(args, pdf, cache, metrics, report):
+                for n in page_results:
+                    summary.add(n)
+                    for writer in writers:
+                        writer.write(n)
+    for writer in writers:
+        writer.close()
+    if metrics:
+        metrics.write(args.profile)
 
-    print(f"Extracted {len(numbers)} numbers from {args.pdf_path}")
+    summary.print_warnings(report)
+    print(f"Extracted {summary.count} numbers from {args.pdf_path}", file=report)
+    if args.format and args.output != "-":
+        print(f"  {args.output} — {args.format}", file=report)
     if args.debug:
-        print(f"  {output_dir}/tmp.json     — structured data")
-        print(f"  {output_dir}/tmp.md       — readable summary")
-        print(f"  {output_dir}/tmp_raw.md   — raw pymupdf4llm markdown")
-        print(f"  {output_dir}/tmp_raw.json — raw pymupdf4llm json")
-    print()
-    print(f"Largest raw: {largest_raw['raw']} [page {largest_raw['page']}]")
-    if largest_adj:
-        print(f"Largest adjusted: {largest_adj['adjusted_value']:,.0f} [page {largest_adj['page']}]")
+        print(f"  {output_dir}/tmp.json     — structured data", file=report)
+        print(f"  {output_dir}/tmp.md       — readable summary", file=report)
+        print(f"  {output_dir}/tmp_raw.md   — raw pymupdf4llm markdown", file=report)
+        print(f"  {output_dir}/tmp_raw.json — raw pymupdf4llm json", file=report)
+    print(file=report)
+    if summary.largest_raw:
+        print(f"Largest raw: {summary.largest_raw['raw']} [page {summary.largest_raw['page']}]", file=report)
+    if summary.largest_adjusted:
+        n = summary.largest_adjusted
+        print(f"Largest adjusted: {n['adjusted_value']:,.0f} [page {n['page']}]", file=report)
 
 
 if __name__ == "__main__":
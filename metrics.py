@@ -0,0 +1,71 @@
+import json
+import os
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class Metrics:
+    """Timings and counters for one extraction run, written out by main.py --profile.
+
+    Functions that accept `metrics=None` skip all bookkeeping when it is None,
+    so an unprofiled run pays one `is None` check per box. Collected:
+
+    - stages: wall seconds per pipeline stage (layout, extraction, ...)
+    - pages: per page, wall seconds in extract_from_pages, boxes and numbers emitted
+    - box_classes: per boxclass, boxes seen and wall seconds spent on them
+    - counters: tables, cells, tokens (lexer matches), numbers, cache hits/misses, ...
+    - peak_memory_bytes: tracemalloc peak inside trace_memory(), if used
+    """
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.pages: list[dict] = []
+        self.box_classes: dict[str, dict] = {}
+        self.counters: Counter[str] = Counter()
+        self.peak_memory_bytes: int | None = None
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_box(self, boxclass: str, seconds: float) -> None:
+        entry = self.box_classes.get(boxclass)
+        if entry is None:
+            entry = self.box_classes[boxclass] = {"count": 0, "seconds": 0.0}
+        entry["count"] += 1
+        entry["seconds"] += seconds
+
+    def add_page(self, page_number: int, seconds: float, boxes: int, numbers: int) -> None:
+        self.pages.append({"page": page_number, "seconds": seconds, "boxes": boxes, "numbers": numbers})
+
+    @contextmanager
+    def trace_memory(self) -> Iterator[None]:
+        """Record the tracemalloc peak of the enclosed block (slows it down noticeably)."""
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peak_memory_bytes = max(self.peak_memory_bytes or 0, peak)
+            if started:
+                tracemalloc.stop()
+
+    def to_dict(self) -> dict:
+        return {
+            "stages": self.stages,
+            "counters": dict(self.counters),
+            "box_classes": self.box_classes,
+            "pages": sorted(self.pages, key=lambda p: p["page"]),
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+
+    def write(self, path: str | os.PathLike) -> None:
+        """Write to_dict() as indented JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
@@ -1,5 +1,8 @@
+import functools
+import hashlib
 import logging
 import re
+from typing import NamedTuple
 
 logger = logging.getLogger(__name__)
 
@@ -22,57 +25,241 @@ _MULTIPLIER_COMPILED = [
     for pat, label, factor in MULTIPLIERS
 ]
 
+
+def _expand_spellings(pattern: str) -> list[str] | None:
+    """List every spelling a multiplier pattern matches, or None if it is not a
+    plain alternation of words with at most an optional last letter ("thousands?|k").
+    """
+    spellings = []
+    for alt in pattern.split("|"):
+        match = re.fullmatch(r"(\w*?)(\w)(\??)", alt)
+        if not match:
+            return None
+        stem, last, optional = match.groups()
+        if optional:
+            spellings.append(stem)
+        spellings.append(stem + last)
+    return spellings
+
+
+def _build_multiplier_lookup():
+    """Lowercased spelling -> (priority, label, factor), plus the MULTIPLIERS
+    entries that can't be enumerated, kept as (priority, regex, label, factor).
+    """
+    lookup: dict[str, tuple[int, str, int]] = {}
+    fallback = []
+    for priority, (pat, label, factor) in enumerate(MULTIPLIERS):
+        spellings = _expand_spellings(pat)
+        if spellings is None:
+            fallback.append((priority, re.compile(pat, re.IGNORECASE), label, factor))
+            continue
+        for spelling in spellings:
+            lookup.setdefault(spelling.lower(), (priority, label, factor))
+    return lookup, fallback
+
+
+_MULTIPLIER_LOOKUP, _MULTIPLIER_FALLBACK = _build_multiplier_lookup()
+
 # Build a single alternation from all multiplier patterns for inline regexes
 _mult_alt = "|".join(pat for pat, _, _ in MULTIPLIERS)
 
 # Patterns for detecting multipliers in headers and table cells.
 # Covers: "(Dollars in Millions)", "($ Millions)", "($M)", "Cash ($M)", etc.
-HEADER_UNIT_PATTERNS = [
+# Order is priority: find_header_multiplier prefers an earlier pattern anywhere
+# in the text over a later one. Each is written without its leading "(" (see
+# TOKEN_PATTERN) and has exactly one group: the scale token.
+_HEADER_UNIT_TAILS = [
     # "(Dollars in Millions)", "(Amounts in Thousands)"
-    re.compile(rf"\(\w+\s+in\s+({_mult_alt})\)", re.IGNORECASE),
+    rf"\w+\s+in\s+({_mult_alt})\)",
     # "($ IN MILLIONS)", "($ IN THOUSANDS)" — TWCF budget format
-    re.compile(rf"\(\s*\$\s+IN\s+({_mult_alt})\)", re.IGNORECASE),
+    rf"\s*\$\s+IN\s+({_mult_alt})\)",
     # "($ Millions)", "($Millions)", "($ M)"
-    re.compile(rf"\(\$\s*({_mult_alt})\)", re.IGNORECASE),
+    rf"\$\s*({_mult_alt})\)",
     # "($M)" embedded in longer text like "Cash ($M)" or "Financial Performance ($M)"
-    re.compile(rf"\(\s*\$\s*({_mult_alt})\s*\)", re.IGNORECASE),
+    rf"\s*\$\s*({_mult_alt})\s*\)",
 ]
+HEADER_UNIT_PATTERNS = [re.compile(rf"\({tail}", re.IGNORECASE) for tail in _HEADER_UNIT_TAILS]
+# All of the above in one pattern; the index of the group that matched is the
+# pattern's priority + 1.
+HEADER_UNIT_PATTERN = re.compile(r"\((?:" + "|".join(_HEADER_UNIT_TAILS) + ")", re.IGNORECASE)
+
+# --- Linear-time matching ---
+# Numbers are written "[\d,]+\.?\d*": a digit/comma run, an optional point and
+# more digits. Spelled that way the run and the trailing \d* can split a string
+# of digits in every possible place, and a failed match retries every split, so
+# a long digit run with no unit after it costs quadratic time per start. The
+# patterns below accept the same strings with the run written as
+# [\d,]++(?:\.\d*+)?+ instead: possessive quantifiers never give characters
+# back, which is safe because nothing that may follow a number can start with a
+# digit, comma or point. Whitespace runs next to an optional token are
+# possessive for the same reason. Bare amounts also only start where a run
+# starts (?<![\d,]): a match can't begin inside a run unless one begins at its
+# start, so those attempts are wasted, and skipping them keeps a long run from
+# being rescanned once per character. Every attempt then reads each character
+# a bounded number of times, and search time is linear in the text length.
+_NUMBER = r"[\d,]++(?:\.\d*+)?+"
+_NUMBER_TAIL = r"[\d,]*+(?:\.\d*+)?+"  # _NUMBER after its first digit/comma
 
-# Inline patterns built from the same multiplier definitions
+# Inline patterns built from the same multiplier definitions.
+# Each has two groups: the number and the scale token.
 # "$9.6 billion", "$ 9.6 billion", "$6M", "$6.5B"
-INLINE_DOLLAR_PATTERN = re.compile(
-    rf"\$\s*([\d,]+\.?\d*)\s*({_mult_alt})\b", re.IGNORECASE
-)
+_INLINE_DOLLAR_TAIL = rf"\s*+({_NUMBER})\s*+({_mult_alt})\b"
+INLINE_DOLLAR_PATTERN = re.compile(rf"\${_INLINE_DOLLAR_TAIL}", re.IGNORECASE)
 # "2.0 million", "9.6 billion" (no dollar sign, full words only to avoid false positives)
 _mult_words = "|".join(pat for pat, _, _ in MULTIPLIERS if len(pat) > 2)
+# Without its first digit/comma, so the number group here is missing one character
+_INLINE_BARE_TAIL = rf"({_NUMBER_TAIL})\s++({_mult_words})\b"
 INLINE_BARE_PATTERN = re.compile(
-    rf"([\d,]+\.?\d*)\s+({_mult_words})\b", re.IGNORECASE
+    rf"(?<![\d,])({_NUMBER})\s++({_mult_words})\b", re.IGNORECASE
 )
 
 # Matches table cell numbers: 8,137.477, .000, (.001), (48.843), 169,611.1
-NUMBER_PATTERN = re.compile(r"^\s*\(?\s*[\d,]+\.?\d*\s*\)?\s*$")
+# Groups: opening paren, digits, closing paren.
+NUMBER_PATTERN = re.compile(rf"^\s*+(\(?+)\s*+({_NUMBER})\s*+(\)?+)\s*+$")
+
+# --- Single-pass lexer ---
+# Token kinds
+HEADER_UNIT = "header_unit"  # "(Dollars in Millions)", "($M)"
+DOLLAR = "dollar"            # "$9.6 billion"
+BARE = "bare"                # "2.0 million"
+
+
+class Token(NamedTuple):
+    kind: str
+    start: int
+    end: int
+    number: str | None  # numeric text as written (commas kept); None for header units
+    unit: str           # scale token as written, e.g. "Millions" or "M"
+    priority: int = 0   # index into HEADER_UNIT_PATTERNS for header-unit tokens
+
+
+# Every header-unit, dollar and bare pattern as one alternation, so a text is
+# scanned once. The lead character ("(", "$", or a digit/comma) is consumed by a
+# plain character class, which lets the regex engine skip straight to candidate
+# offsets; each branch then checks the lead with a lookbehind. Header
+# alternatives come first, in priority order. No alternative can start inside
+# another's match (header units are the only ones containing "(", and their "$"
+# is never followed by digits), so the tokens are exactly the matches the
+# individual patterns find.
+TOKEN_PATTERN = re.compile(
+    r"[($\d,](?:(?<=\()(?:"
+    + "|".join(f"({tail})" for tail in _HEADER_UNIT_TAILS)
+    + rf")|(?<=\$)({_INLINE_DOLLAR_TAIL})|(?<=(?<![\d,])[\d,])({_INLINE_BARE_TAIL}))",
+    re.IGNORECASE,
+)
+
+
+def _token_groups() -> dict[int, tuple[str, int, int | None, int]]:
+    """Map each branch's outer group index to (kind, priority, number group, unit group)."""
+    branches = [(HEADER_UNIT, i, tail) for i, tail in enumerate(_HEADER_UNIT_TAILS)]
+    branches += [(DOLLAR, 0, _INLINE_DOLLAR_TAIL), (BARE, 0, _INLINE_BARE_TAIL)]
+    groups = {}
+    index = 1
+    for kind, priority, tail in branches:
+        if kind == HEADER_UNIT:
+            groups[index] = (kind, priority, None, index + 1)
+        else:
+            groups[index] = (kind, priority, index + 1, index + 2)
+        index += 1 + re.compile(tail).groups
+    return groups
+
+
+_TOKEN_GROUPS = _token_groups()
+
+
+def tokenize(text: str) -> list[Token]:
+    """Scan text once and return its header-unit, dollar and bare-scaled tokens in order.
+
+    Use when a text needs both header detection (header_multiplier()) and
+    inline amounts; for header detection alone find_header_multiplier() is
+    cheaper since it skips the inline patterns.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text):
+        kind, priority, num_group, unit_group = _TOKEN_GROUPS[match.lastindex]
+        if kind == HEADER_UNIT:
+            number = None
+        elif kind == BARE:
+            number = text[match.start():match.end(num_group)]  # re-attach the lead digit
+        else:
+            number = match.group(num_group)
+        tokens.append(Token(kind, match.start(), match.end(), number, match.group(unit_group), priority))
+    return tokens
 
 
 def resolve_multiplier(text: str) -> tuple[str, int] | None:
     """Match a scale word/abbreviation and return (label, factor) or None."""
     text = text.strip()
-    for pattern, label, factor in _MULTIPLIER_COMPILED:
+    if not text.isascii():
+        # Unicode case folding differs between str.lower() and re.IGNORECASE
+        for pattern, label, factor in _MULTIPLIER_COMPILED:
+            if pattern.fullmatch(text):
+                return label, factor
+        return None
+    hit = _MULTIPLIER_LOOKUP.get(text.lower())
+    for priority, pattern, label, factor in _MULTIPLIER_FALLBACK:
+        if hit is not None and priority > hit[0]:
+            break
         if pattern.fullmatch(text):
             return label, factor
-    return None
+    return hit[1:] if hit else None
+
+
+# Header strings shorter than this are memoized; longer ones (joined table
+# text) rarely repeat and would pin memory in the cache.
+_MEMO_MAX_LEN = 256
+
+
+@functools.lru_cache(maxsize=4096)
+def _find_header_multiplier_memo(text: str) -> tuple[str, int] | None:
+    return _find_header_multiplier(text)
+
+
+def _find_header_multiplier(text: str) -> tuple[str, int] | None:
+    best = None
+    for match in HEADER_UNIT_PATTERN.finditer(text):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
+            if best.lastindex == 1:  # nothing outranks the first pattern
+                break
+    return resolve_multiplier(best.group(best.lastindex)) if best else None
 
 
 def find_header_multiplier(text: str) -> tuple[str, int] | None:
     """Extract multiplier from header text.
 
     Handles: '(Dollars in Millions)', '($ Millions)', '($M)', 'Cash ($M)', etc.
-    Returns (label, factor) or None.
+    Returns (label, factor) or None. Short strings are memoized; see
+    header_multiplier_cache_info().
     """
+    if len(text) < _MEMO_MAX_LEN:
+        return _find_header_multiplier_memo(text)
+    return _find_header_multiplier(text)
+
+
+def strip_header_units(text: str) -> str:
+    """Remove every header unit declaration ("($M)", "(Dollars in Millions)") from text."""
     for pattern in HEADER_UNIT_PATTERNS:
-        match = pattern.search(text)
-        if match:
-            return resolve_multiplier(match.group(1))
-    return None
+        text = pattern.sub("", text)
+    return text
+
+
+def header_multiplier_cache_info() -> functools._CacheInfo:
+    """Hit/miss counters of the find_header_multiplier() memo."""
+    return _find_header_multiplier_memo.cache_info()
+
+
+def header_multiplier(tokens: list[Token]) -> tuple[str, int] | None:
+    """Resolve the multiplier declared by a text's tokens.
+
+    Same answer as find_header_multiplier() on the text: the earliest
+    HEADER_UNIT_PATTERNS entry wins; within one pattern, the leftmost match.
+    """
+    best = None
+    for token in tokens:
+        if token.kind == HEADER_UNIT and (best is None or token.priority < best.priority):
+            best = token
+    return resolve_multiplier(best.unit) if best else None
 
 
 def is_number(text: str) -> bool:
@@ -80,6 +267,23 @@ def is_number(text: str) -> bool:
     return bool(NUMBER_PATTERN.match(text))
 
 
+def parse_cell_number(text: str) -> float | None:
+    """Parse text as an accounting-formatted number in a single match.
+
+    Equivalent to `parse_number(text) if is_number(text) else None`.
+    """
+    match = NUMBER_PATTERN.match(text)
+    if not match:
+        return None
+    opening, digits, closing = match.groups()
+    try:
+        value = float(digits.replace(",", ""))
+    except ValueError:
+        logger.debug("parse_number failed: could not parse %r", text)
+        return None
+    return -value if opening and closing else value
+
+
 def parse_number(text: str) -> float | None:
     """Parse an accounting-formatted number string into a float."""
     text = text.strip()
@@ -93,3 +297,17 @@ def parse_number(text: str) -> float | None:
     except ValueError:
         logger.debug("parse_number failed: could not parse %r", text)
         return None
+
+
+def config_fingerprint() -> str:
+    """Hash of every constant and compiled pattern in this module.
+
+    Changes whenever MULTIPLIERS, the regexes built from them, or CONTEXT_WINDOW
+    change, so it can key caches of extraction output.
+    """
+    parts = [f"CONTEXT_WINDOW={CONTEXT_WINDOW!r}", f"MULTIPLIERS={MULTIPLIERS!r}"]
+    for name, value in sorted(globals().items()):
+        patterns = value if isinstance(value, list) else [value]
+        if patterns and all(isinstance(p, re.Pattern) for p in patterns):
+            parts.append(f"{name}=" + ";".join(f"{p.pattern}/{p.flags}" for p in patterns))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
@@ -0,0 +1,284 @@
+import heapq
+import json
+import math
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import BinaryIO, Literal, TypedDict
+
+
+class ExtractedNumber(TypedDict):
+    value: float
+    raw: str
+    multiplier_label: str | None
+    multiplier: int
+    adjusted_value: float
+    row_label: str
+    column: str
+    section: str | None
+    page: int | None
+    source: str | None
+    source_type: Literal["table", "narrative", "table_narrative"]
+    context: str | None
+
+
+_NO_PAGE = -1  # sentinel for page=None in the integer page column
+_U32 = struct.Struct("<I")
+
+
+class _Categories:
+    """Dictionary-encoded string column: each distinct value is stored once."""
+
+    def __init__(self):
+        self.values: list[str | None] = []
+        self.index: dict[str | None, int] = {}
+        self.codes = array("I")
+
+    def code(self, value: str | None) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str | None) -> None:
+        self.codes.append(self.code(value))
+
+    def extend(self, other: "_Categories") -> None:
+        remap = [self.code(v) for v in other.values]
+        self.codes.extend(remap[c] for c in other.codes)
+
+    def __getitem__(self, i: int) -> str | None:
+        return self.values[self.codes[i]]
+
+
+class ExtractionResult(Sequence):
+    """Columnar store of extracted numbers.
+
+    Numbers live in typed arrays and repeated strings (labels, columns,
+    sections, sources) are dictionary-encoded, so millions of rows cost a few
+    dozen bytes each instead of a 12-key dict. Indexing and iteration yield
+    ExtractedNumber dicts built on access, and a result compares equal to a
+    list of the same dicts, so it can be used wherever a list was returned
+    before. Rows are copies: mutating a yielded dict does not change the store.
+    """
+
+    _CATEGORY_FIELDS = ("multiplier_label", "row_label", "column", "section", "source", "source_type")
+
+    def __init__(self, rows: Iterable[ExtractedNumber] = ()):
+        self.values = array("d")
+        self.multipliers = array("q")
+        self.pages = array("q")
+        self.raws: list[str] = []
+        self.contexts: list[str | None] = []
+        self.categories = {name: _Categories() for name in self._CATEGORY_FIELDS}
+        self.extend(rows)
+
+    def append(
+        self,
+        *,
+        value: float,
+        raw: str,
+        multiplier_label: str | None,
+        multiplier: int,
+        row_label: str,
+        column: str,
+        source_type: Literal["table", "narrative", "table_narrative"],
+        section: str | None = None,
+        page: int | None = None,
+        source: str | None = None,
+        context: str | None = None,
+    ) -> None:
+        """Add one row; adjusted_value is derived as value * multiplier."""
+        self.values.append(value)
+        self.multipliers.append(multiplier)
+        self.pages.append(_NO_PAGE if page is None else page)
+        self.raws.append(raw)
+        self.contexts.append(context)
+        cats = self.categories
+        cats["multiplier_label"].append(multiplier_label)
+        cats["row_label"].append(row_label)
+        cats["column"].append(column)
+        cats["section"].append(section)
+        cats["source"].append(source)
+        cats["source_type"].append(source_type)
+
+    def extend(self, rows: "ExtractionResult | Iterable[ExtractedNumber]") -> None:
+        """Append all rows from another result (column-wise) or from dicts."""
+        if isinstance(rows, ExtractionResult):
+            self.values.extend(rows.values)
+            self.multipliers.extend(rows.multipliers)
+            self.pages.extend(rows.pages)
+            self.raws.extend(rows.raws)
+            self.contexts.extend(rows.contexts)
+            for name, column in self.categories.items():
+                column.extend(rows.categories[name])
+            return
+        for row in rows:
+            self.append(**{k: v for k, v in row.items() if k != "adjusted_value"})
+
+    def adjusted_values(self) -> array:
+        """The adjusted_value column (value * multiplier) as a float array."""
+        return array("d", (v * m for v, m in zip(self.values, self.multipliers)))
+
+    def _row(self, i: int) -> ExtractedNumber:
+        cats = self.categories
+        value, multiplier, page = self.values[i], self.multipliers[i], self.pages[i]
+        return {
+            "value": value,
+            "raw": self.raws[i],
+            "multiplier_label": cats["multiplier_label"][i],
+            "multiplier": multiplier,
+            "adjusted_value": value * multiplier,
+            "row_label": cats["row_label"][i],
+            "column": cats["column"][i],
+            "section": cats["section"][i],
+            "page": None if page == _NO_PAGE else page,
+            "source": cats["source"][i],
+            "source_type": cats["source_type"][i],
+            "context": self.contexts[i],
+        }
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("ExtractionResult index out of range")
+        return self._row(i)
+
+    def __iter__(self) -> Iterator[ExtractedNumber]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ExtractionResult, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ExtractionResult({len(self)} rows)"
+
+    def to_list(self) -> list[ExtractedNumber]:
+        """Materialize every row as an ExtractedNumber dict."""
+        return list(self)
+
+    # --- Binary chunks ---
+    #
+    # chunk := u32 rows, f64 values, i64 multipliers, i64 pages,
+    #          strings raws, strings contexts,
+    #          (strings dictionary, u32 codes) per _CATEGORY_FIELDS entry
+    # strings := u32 byte length, UTF-8 JSON array
+    # All integers and floats are little-endian, one per row.
+
+    def dump(self, f: BinaryIO) -> None:
+        """Write all rows to f as one binary chunk (read back with load())."""
+        f.write(_U32.pack(len(self)))
+        for column in (self.values, self.multipliers, self.pages):
+            _write_array(f, column)
+        _write_strings(f, self.raws)
+        _write_strings(f, self.contexts)
+        for name in self._CATEGORY_FIELDS:
+            _write_strings(f, self.categories[name].values)
+            _write_array(f, self.categories[name].codes)
+
+    @classmethod
+    def load(cls, f: BinaryIO) -> "ExtractionResult | None":
+        """Read one chunk written by dump(), or None at end of file."""
+        header = f.read(_U32.size)
+        if not header:
+            return None
+        rows = _U32.unpack(header)[0]
+        result = cls()
+        for column in (result.values, result.multipliers, result.pages):
+            _read_array(f, column, rows)
+        result.raws = _read_strings(f)
+        result.contexts = _read_strings(f)
+        for name in cls._CATEGORY_FIELDS:
+            column = result.categories[name]
+            column.values = _read_strings(f)
+            column.index = {v: i for i, v in enumerate(column.values)}
+            _read_array(f, column.codes, rows)
+        return result
+
+
+class TopK:
+    """The k numbers with the largest |adjusted_value| offered so far.
+
+    Kept in a bounded min-heap, so offering n rows costs O(n log k) and holds
+    k rows. A row must beat floor to get in; among rows of equal magnitude
+    the earliest offered wins, as with max().
+    """
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self._arrivals = 0
+        self._heap: list[tuple[float, int, ExtractedNumber]] = []  # (magnitude, -arrival, row)
+
+    @property
+    def floor(self) -> float:
+        """Magnitude a number has to exceed to enter: the k-th largest once k are held."""
+        return self._heap[0][0] if len(self._heap) == self.k else -math.inf
+
+    def offer(self, number: ExtractedNumber) -> None:
+        self._push(abs(number["adjusted_value"]), number)
+
+    def extend(self, result: ExtractionResult, start: int = 0) -> None:
+        """Offer rows start.. of a result; rows that can't get in are never built as dicts."""
+        values, multipliers = result.values, result.multipliers
+        for i in range(start, len(result)):
+            magnitude = abs(values[i] * multipliers[i])
+            if magnitude > self.floor:
+                self._push(magnitude, result[i])
+
+    def _push(self, magnitude: float, number: ExtractedNumber) -> None:
+        self._arrivals += 1
+        entry = (magnitude, -self._arrivals, number)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif magnitude > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> list[ExtractedNumber]:
+        """The kept numbers, largest magnitude first."""
+        return [n for _, _, n in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def _write_array(f: BinaryIO, column: array) -> None:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    f.write(memoryview(column))
+
+
+def _read_array(f: BinaryIO, column: array, rows: int) -> None:
+    size = rows * column.itemsize
+    data = f.read(size)
+    if len(data) != size:
+        raise EOFError("truncated ExtractionResult chunk")
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+
+
+def _write_strings(f: BinaryIO, strings: list[str | None]) -> None:
+    data = json.dumps(strings, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    f.write(_U32.pack(len(data)))
+    f.write(data)
+
+
+def _read_strings(f: BinaryIO) -> list[str | None]:
+    (size,) = _U32.unpack(f.read(_U32.size))
+    return json.loads(f.read(size))
@@ -0,0 +1,53 @@
+"""PDF fixtures shared by the test modules.
+
+pymupdf is imported inside the factories, so modules that build no PDFs
+don't load the engine at collection.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def make_table_pdf(tmp_path):
+    """Factory: one page per value, each with a bold heading, a multiplier line
+    and a ruled 2x2 table whose data cell holds the value."""
+    def make(name="table.pdf", values=("1,655.9",)):
+        import pymupdf
+
+        doc = pymupdf.open()
+        for value in values:
+            page = doc.new_page()
+            page.insert_text((50, 60), "Procurement", fontsize=16, fontname="hebo")
+            page.insert_text((50, 90), "(Dollars in Millions)", fontsize=10)
+            for r, row in enumerate([["Item", "FY2025"], ["Widget", value]]):
+                for c, cell in enumerate(row):
+                    rect = pymupdf.Rect(50 + 150 * c, 110 + 18 * r, 200 + 150 * c, 128 + 18 * r)
+                    page.draw_rect(rect, color=(0, 0, 0), width=0.5)
+                    page.insert_text((rect.x0 + 3, rect.y1 - 5), cell, fontsize=9)
+        path = tmp_path / name
+        doc.save(path)
+        return path
+
+    return make
+
+
+@pytest.fixture
+def table_pdf(make_table_pdf):
+    """One page with a ruled table holding 1,655.9 (Dollars in Millions)."""
+    return make_table_pdf()
+
+
+@pytest.fixture
+def make_text_pdf(tmp_path):
+    """Factory: one page per text, each drawn as a single line of running text."""
+    def make(name, texts):
+        import pymupdf
+
+        doc = pymupdf.open()
+        for text in texts:
+            doc.new_page().insert_text((50, 90), text, fontsize=10)
+        path = tmp_path / name
+        doc.save(path)
+        return path
+
+    return make
@@ -0,0 +1,58 @@
+"""Tests for the pluggable layout backends."""
+
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from backends import BACKENDS, get_backend
+from benchmarks.compare_backends import agreement
+from extract import extract_from_pages
+from results import ExtractionResult
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="unknown layout backend"):
+        get_backend("nope")
+
+
+def test_native_backend_page_structure(table_pdf):
+    [page] = BACKENDS["native"].layout(str(table_pdf), None)
+    assert page["page_number"] == 1
+    classes = [box["boxclass"] for box in page["boxes"]]
+    assert classes.count("table") == 1
+    assert "section-header" in classes
+    table = next(box["table"] for box in page["boxes"] if box["boxclass"] == "table")
+    assert table["extract"] == [["Item", "FY2025"], ["Widget", "1,655.9"]]
+
+
+def test_native_backend_feeds_extraction(table_pdf):
+    pages = BACKENDS["native"].layout(str(table_pdf), [0])
+    [number] = extract_from_pages(pages, "table.pdf")
+    assert number["adjusted_value"] == pytest.approx(1_655_900_000)
+    assert number["section"] == "Procurement"
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_jsonl_on_stdout_is_clean(table_pdf, backend):
+    """Nothing a layout engine prints may end up among the streamed numbers."""
+    proc = subprocess.run(
+        [sys.executable, "main.py", str(table_pdf), "--no-cache", "--backend", backend, "--format", "jsonl"],
+        cwd=pathlib.Path(__file__).parent.parent, capture_output=True, text=True, check=True,
+    )
+    numbers = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert [n["raw"] for n in numbers] == ["1,655.9"]
+
+
+def test_agreement():
+    row = {
+        "value": 1.0, "raw": "1", "multiplier_label": None, "multiplier": 1,
+        "row_label": "a", "column": "b", "source_type": "table", "page": 1,
+    }
+    one = ExtractionResult([row])
+    two = ExtractionResult([row, {**row, "raw": "2", "value": 2.0}])
+    assert agreement(one, one) == 1.0
+    assert agreement(one, two) == 0.5
+    assert agreement(ExtractionResult(), ExtractionResult()) == 1.0
@@ -0,0 +1,79 @@
+"""Tests for batch corpus mode helpers."""
+
+import io
+import json
+import os
+
+import batch
+from batch import collect_pdfs, process_file, run_batch
+from extract import extract_from_pdf
+
+
+class TestCollectPdfs:
+    def test_directory_is_searched_recursively(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "a.pdf").touch()
+        (tmp_path / "sub" / "b.PDF").touch()
+        (tmp_path / "notes.txt").touch()
+        found = collect_pdfs([str(tmp_path)])
+        assert [p.name for p in found] == ["a.pdf", "b.PDF"]
+
+    def test_glob_and_duplicates(self, tmp_path):
+        (tmp_path / "a.pdf").touch()
+        (tmp_path / "b.pdf").touch()
+        found = collect_pdfs([str(tmp_path / "a.pdf"), str(tmp_path / "*.pdf")])
+        assert [p.name for p in found] == ["a.pdf", "b.pdf"]
+
+    def test_glob_keeps_only_pdfs(self, tmp_path):
+        (tmp_path / "a.pdf").touch()
+        (tmp_path / "notes.txt").touch()
+        assert [p.name for p in collect_pdfs([str(tmp_path / "*")])] == ["a.pdf"]
+
+    def test_no_match(self, tmp_path):
+        assert collect_pdfs([str(tmp_path / "*.pdf")]) == []
+
+
+def test_process_file_reports_failure(tmp_path):
+    bad = tmp_path / "broken.pdf"
+    bad.write_text("not a pdf")
+    result = process_file(str(bad))
+    assert result["error"]
+    assert result["numbers"] == []
+
+
+def _sorted_lines(lines):
+    return sorted(lines, key=lambda n: (n["source"], n["page"], n["raw"]))
+
+
+def test_run_batch_matches_serial_extraction(make_table_pdf, tmp_path):
+    paths = [make_table_pdf("a.pdf", ["1,655.9", "2,000.5"]), make_table_pdf("b.pdf", ["3,100.0"])]
+    bad = tmp_path / "broken.pdf"
+    bad.write_text("not a pdf")
+    sink = io.StringIO()
+    summaries = run_batch([paths[0], bad, paths[1]], sink, workers=2, backend="native")
+
+    streamed = [json.loads(line) for line in sink.getvalue().splitlines()]
+    serial = [n for p in paths for n in extract_from_pdf(p, backend="native")]
+    assert _sorted_lines(streamed) == _sorted_lines(serial)
+    failed = [s["path"] for s in summaries if s["error"]]
+    assert failed == [str(bad)]
+    assert len(summaries) == 3
+
+
+def _die_on_crash(path):
+    if os.path.basename(path) == "crash.pdf":
+        os._exit(1)
+    return batch.process_file(path)
+
+
+def test_run_batch_survives_dead_worker(make_table_pdf, tmp_path, monkeypatch):
+    good = make_table_pdf("good.pdf")
+    crash = make_table_pdf("crash.pdf")
+    monkeypatch.setattr(batch, "process_file", _die_on_crash)
+    sink = io.StringIO()
+    summaries = run_batch([crash, good], sink, workers=2, backend="native")
+
+    errors = {s["path"]: s["error"] for s in summaries}
+    assert errors[str(good)] is None
+    assert "BrokenProcessPool" in errors[str(crash)]
+    assert [json.loads(line)["source"] for line in sink.getvalue().splitlines()] == ["good.pdf"]
@@ -0,0 +1,56 @@
+"""Tests for the benchmark generators and regression gate."""
+
+from benchmarks.generators import make_narrative, make_pages, make_table_rows
+from benchmarks.run import Result, compare, load_baseline, main, save_baseline
+from extract import extract_from_pages, resolve_column_headers
+
+
+def test_make_pages_shape_and_determinism():
+    pages = make_pages(pages=3, boxes=10, table_rows=5, table_cols=4, tables_per_page=2)
+    assert [p["page_number"] for p in pages] == [1, 2, 3]
+    assert all(len(p["boxes"]) == 10 for p in pages)
+    tables = [b for b in pages[0]["boxes"] if b["boxclass"] == "table"]
+    assert len(tables) == 2
+    assert len(tables[0]["table"]["extract"]) == 6  # header + 5 rows
+    assert pages == make_pages(pages=3, boxes=10, table_rows=5, table_cols=4, tables_per_page=2)
+
+
+def test_generated_pages_extract():
+    results = extract_from_pages(make_pages(pages=2, table_rows=4, table_cols=3, density=1.0), "bench.pdf")
+    assert {n["source_type"] for n in results} == {"table", "narrative"}
+    assert all(n["multiplier"] > 1 for n in results if n["source_type"] == "table")
+
+
+def test_multirow_headers_resolve():
+    rows = make_table_rows(2, 4, header_rows=2)
+    assert resolve_column_headers(rows) == ["Item", "Group 1 / FY2021", "Group 1 / FY2022", "Group 1 / FY2023"]
+
+
+def test_narrative_density():
+    assert "$" not in make_narrative(50, density=0.0)
+    assert make_narrative(50, density=1.0).count(".") >= 50
+
+
+def test_compare_flags_regressions_only():
+    baseline = {"fast": {"throughput": 100.0}, "slow": {"throughput": 100.0}}
+    results = [Result("fast", "cells", 0.01, 90.0), Result("slow", "cells", 0.01, 50.0), Result("new", "cells", 1, 1)]
+    regressions = compare(results, baseline, threshold=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("slow:")
+
+
+def test_baseline_roundtrip_keeps_other_scales(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_baseline(path, "quick", [Result("tokenize", "chars", 0.5, 2.0)])
+    save_baseline(path, "full", [Result("tokenize", "chars", 1.0, 1.0)])
+    assert load_baseline(path, "quick")["tokenize"]["throughput"] == 2.0
+    assert load_baseline(tmp_path / "missing.json", "quick") == {}
+
+
+def test_main_gates_on_baseline(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    args = ["--scale", "quick", "--only", "resolve_multiplier", "--repeat", "1", "--baseline", str(path)]
+    assert main(args + ["--save-baseline"]) == 0
+    assert main(args + ["--threshold", "0.9"]) == 0
+    save_baseline(path, "quick", [Result("resolve_multiplier", "tokens", 1e-9, 1e12)])
+    assert main(args) == 1
+    assert "REGRESSION resolve_multiplier" in capsys.readouterr().err
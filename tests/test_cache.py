@@ -0,0 +1,76 @@
+"""Tests for the on-disk layout/results cache."""
+
+import os
+
+import patterns
+from cache import LAYOUT, RESULTS, DiskCache, data_hash, file_hash, layout_key, results_key
+
+
+class TestDiskCache:
+    def test_miss_then_hit(self, tmp_path):
+        cache = DiskCache(tmp_path)
+        assert cache.get(LAYOUT, "ab" * 32) is None
+        cache.put(LAYOUT, "ab" * 32, '{"page_number": 1}')
+        assert cache.get(LAYOUT, "ab" * 32) == '{"page_number": 1}'
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_tiers_are_separate(self, tmp_path):
+        cache = DiskCache(tmp_path)
+        cache.put(LAYOUT, "cd" * 32, "layout")
+        assert cache.get(RESULTS, "cd" * 32) is None
+
+    def test_lru_eviction(self, tmp_path):
+        cache = DiskCache(tmp_path, max_bytes=250)
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(RESULTS, key, "x" * 100)
+            # Give each entry a distinct, increasing mtime
+            os.utime(cache._path(RESULTS, key), (i, i))
+        # The third put pushed the total to 300 bytes, so the oldest goes
+        assert cache.get(RESULTS, keys[0]) is None
+        assert cache.get(RESULTS, keys[2]) is not None
+
+    def test_overwrite_replaces_size(self, tmp_path):
+        cache = DiskCache(tmp_path, max_bytes=250)
+        other, key = "aa" * 32, "bb" * 32
+        cache.put(RESULTS, other, "x" * 100)
+        for _ in range(5):
+            cache.put(RESULTS, key, "x" * 100)
+        cache.put(RESULTS, key, "x" * 50)
+        assert cache._size == 150
+        assert cache.get(RESULTS, other) is not None
+
+    def test_read_refreshes_recency(self, tmp_path):
+        cache = DiskCache(tmp_path, max_bytes=250)
+        old, new = "aa" * 32, "bb" * 32
+        cache.put(RESULTS, old, "x" * 100)
+        cache.put(RESULTS, new, "x" * 100)
+        os.utime(cache._path(RESULTS, old), (1, 1))
+        os.utime(cache._path(RESULTS, new), (2, 2))
+        cache.get(RESULTS, old)  # touch: now the most recently used
+        cache.put(RESULTS, "cc" * 32, "x" * 100)
+        assert cache.get(RESULTS, new) is None
+        assert cache.get(RESULTS, old) is not None
+
+
+class TestKeys:
+    def test_layout_key_depends_on_page(self):
+        assert layout_key("abc", 0, "native:1") != layout_key("abc", 1, "native:1")
+        assert layout_key("abc", 0, "native:1") == layout_key("abc", 0, "native:1")
+
+    def test_layout_key_depends_on_engine(self):
+        assert layout_key("abc", 0, "native:1") != layout_key("abc", 0, "pymupdf4llm:1")
+
+    def test_results_key_tracks_pattern_config(self, monkeypatch):
+        before = results_key("layout", "a.pdf")
+        monkeypatch.setattr(patterns, "CONTEXT_WINDOW", patterns.CONTEXT_WINDOW + 1)
+        assert results_key("layout", "a.pdf") != before
+
+    def test_results_key_depends_on_source(self):
+        assert results_key("layout", "a.pdf") != results_key("layout", "b.pdf")
+
+
+def test_data_hash_matches_file_hash(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.7 not really")
+    assert data_hash(memoryview(path.read_bytes())) == file_hash(path)
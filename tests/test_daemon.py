@@ -0,0 +1,161 @@
+"""Tests for the extraction daemon, served from a thread pool in-process."""
+
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import daemon
+from daemon import ExtractionDaemon, request
+
+
+def start_daemon(concurrency=2, queue_size=8, new_executor=None, **kwargs):
+    """Serve on a fresh socket from a background event loop; returns (socket, daemon, stop)."""
+    # Unix socket paths are limited to ~100 bytes, so keep it short
+    socket_path = tempfile.mkdtemp(prefix="nd") + "/d.sock"
+    if new_executor is None:
+        new_executor = functools.partial(ThreadPoolExecutor, concurrency)
+    server = ExtractionDaemon(new_executor, concurrency, queue_size, **kwargs)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    async def run():
+        ready = asyncio.Event()
+        task = asyncio.create_task(server.serve(socket_path, ready))
+        await ready.wait()
+        started.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True)
+    thread.start()
+    started.wait(5)
+
+    def stop():
+        for task in asyncio.all_tasks(loop):
+            loop.call_soon_threadsafe(task.cancel)
+        thread.join(5)
+        server.executor.shutdown()
+
+    return socket_path, server, stop
+
+
+@pytest.fixture
+def served():
+    socket_path, server, stop = start_daemon()
+    yield socket_path, server
+    stop()
+
+
+def test_path_job(served, table_pdf):
+    socket_path, _ = served
+    reply = request(socket_path, {"path": str(table_pdf), "backend": "native"})
+    assert reply["ok"]
+    [number] = reply["numbers"]
+    assert number["adjusted_value"] == pytest.approx(1_655_900_000)
+    assert number["source"] == "table.pdf"
+    assert set(reply["timing"]) == {"queued", "extract", "total"}
+    assert reply["timing"]["total"] >= reply["timing"]["extract"]
+
+
+def test_bytes_job_keeps_name(served, table_pdf):
+    socket_path, _ = served
+    reply = request(socket_path, {"name": "upload.pdf", "backend": "native"}, data=table_pdf.read_bytes())
+    assert reply["ok"]
+    assert [n["source"] for n in reply["numbers"]] == ["upload.pdf"]
+
+
+def test_failures_are_replies(served, tmp_path):
+    socket_path, server = served
+    reply = request(socket_path, {"path": str(tmp_path / "missing.pdf"), "backend": "native"})
+    assert not reply["ok"]
+    assert reply["error"]
+    stats = request(socket_path, {"op": "stats"})["stats"]
+    assert stats["failed"] == 1
+
+
+def test_dead_worker_is_replaced(table_pdf):
+    new_pool = functools.partial(
+        ProcessPoolExecutor, max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+        initializer=daemon._init_worker, initargs=(None, None),
+    )
+    socket_path, server, stop = start_daemon(concurrency=1, new_executor=new_pool)
+    job = {"path": str(table_pdf), "backend": "native"}
+    try:
+        assert request(socket_path, job, timeout=60)["ok"]
+        for pid in list(server.executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        reply = request(socket_path, job, timeout=60)
+        assert reply["ok"], reply
+        assert request(socket_path, {"op": "stats"})["stats"]["restarts"] == 1
+        assert request(socket_path, job, timeout=60)["ok"]
+    finally:
+        stop()
+
+
+@pytest.mark.parametrize("header, error", [
+    (b"[1, 2]", "must be a JSON object"),
+    (b'{"name": "a.pdf", "size": "12"}', "non-negative integer"),
+    (b'{"name": "a.pdf", "size": -1}', "non-negative integer"),
+    (b'{"name": "a.pdf", "size": 1.5}', "non-negative integer"),
+    (b'{"name": "a.pdf", "size": 1025}', "exceeds the limit of 1024"),
+    (b"{not json", "bad request"),
+])
+def test_malformed_headers_are_refused(header, error):
+    socket_path, server, stop = start_daemon(max_request_bytes=1024)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(socket_path)
+            sock.sendall(header + b"\n")
+            with sock.makefile("rb") as f:
+                reply = json.loads(f.readline())
+                assert f.readline() == b""  # and the connection is closed
+        assert not reply["ok"]
+        assert error in reply["error"]
+        assert request(socket_path, {"op": "stats"})["ok"]  # the daemon keeps serving
+    finally:
+        stop()
+
+
+def test_bounded_queue_holds_back_callers(monkeypatch):
+    release = threading.Event()
+
+    def blocked_job(job):
+        release.wait(5)
+        return {"ok": True, "numbers": [], "timing": {"extract": 0.0}}
+
+    monkeypatch.setattr(daemon, "run_job", blocked_job)
+    socket_path, server, stop = start_daemon(concurrency=1, queue_size=1)
+    try:
+        replies = []
+        clients = [
+            threading.Thread(target=lambda: replies.append(request(socket_path, {"path": "x.pdf"}, timeout=10)))
+            for _ in range(3)
+        ]
+        for client in clients:
+            client.start()
+        # One job running, one waiting in the queue, the third held at put()
+        deadline = time.monotonic() + 5
+        while request(socket_path, {"op": "stats"})["stats"]["queued"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert server.queue.full()
+        release.set()
+        for client in clients:
+            client.join(10)
+        assert len(replies) == 3 and all(r["ok"] for r in replies)
+        assert server.stats["ok"] == 3
+    finally:
+        release.set()
+        stop()
@@ -0,0 +1,124 @@
+"""Tests for the cross-version diff engine."""
+
+import json
+import math
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+import diff
+from diff import (
+    DiffSummary,
+    diff_files,
+    diff_results,
+    iter_numbers,
+    load_numbers,
+    match_rows,
+    normalize,
+    relative_change,
+)
+from results import ExtractionResult
+from writers import open_writer
+
+
+def _row(label, value, page=1, section="Procurement", column="FY2025", context=None):
+    return {
+        "value": value, "raw": str(value), "multiplier_label": "Million", "multiplier": 1_000_000,
+        "row_label": label, "column": column, "section": section, "page": page,
+        "source": "budget.pdf", "source_type": "table", "context": context,
+    }
+
+
+def test_normalize():
+    assert normalize("  Aircraft \n Procurement ") == "aircraft procurement"
+    assert normalize(None) == ""
+
+
+def test_match_rows_page_tolerance():
+    old = ExtractionResult([_row("Jets", 1.0, page=3), _row("Jets", 2.0, page=9)])
+    new = ExtractionResult([_row("jets", 1.0, page=4), _row("Jets", 2.0, page=20)])
+    assert sorted(match_rows(old, new, page_tolerance=1), key=str) == sorted(
+        [(0, 0), (1, None), (None, 1)], key=str,
+    )
+    assert list(match_rows(old, new, page_tolerance=math.inf)) == [(0, 0), (1, 1)]
+
+
+def test_diff_results_records_and_summary():
+    old = ExtractionResult([_row("Jets", 10.0), _row("Ships", 4.0), _row("Tanks", 1.0)])
+    new = ExtractionResult([_row("Jets", 12.0), _row("Ships", 4.0), _row("Drones", 0.5)])
+    summary = DiffSummary()
+    records = {r["change"]: r for r in diff_results(old, new, summary=summary)}
+    assert summary.counts == {"unchanged": 1, "changed": 1, "added": 1, "removed": 1}
+    assert records["changed"]["relative_change"] == pytest.approx(0.2)
+    assert records["added"]["new"]["row_label"] == "Drones" and records["added"]["old"] is None
+    assert records["removed"]["old"]["row_label"] == "Tanks"
+    assert summary.largest[1]["row_label"] == "Jets"
+
+
+def test_relative_change():
+    assert relative_change(0.0, 0.0) == 0.0
+    assert relative_change(0.0, 1.0) == math.inf
+    assert relative_change(-4.0, -2.0) == 0.5
+
+
+def _write(path, fmt, rows):
+    writer = open_writer(fmt, path)
+    for row in rows:
+        writer.write({**row, "adjusted_value": row["value"] * row["multiplier"]})
+    writer.close()
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl"])
+def test_iter_numbers_reads_json_in_bounded_chunks(tmp_path, monkeypatch, fmt):
+    rows = [_row(f"Item {i}", float(i), context="a, b] {c}" if i % 3 else None) for i in range(50)]
+    path = _write(tmp_path / f"numbers.{fmt}", fmt, rows)
+    monkeypatch.setattr(diff, "CHUNK_ROWS", 8)
+    monkeypatch.setattr(diff, "_READ_SIZE", 64)  # smaller than one row
+    chunks = list(iter_numbers(path))
+    assert [len(c) for c in chunks] == [8] * 6 + [2]
+    assert load_numbers(path) == ExtractionResult(rows)
+
+
+def test_iter_numbers_rejects_non_object_elements(tmp_path):
+    path = tmp_path / "numbers.json"
+    path.write_text("[1, 2]")
+    with pytest.raises(ValueError, match="expected an object"):
+        list(iter_numbers(path))
+
+
+def test_partitions_ignore_hash_seed(tmp_path):
+    path = _write(tmp_path / "numbers.jsonl", "jsonl", [_row(f"Item {i}", float(i)) for i in range(100)])
+    script = (
+        "import sys, diff; "
+        "parts = diff._partition(sys.argv[1], 5, sys.argv[2], sys.argv[3]); "
+        "print([len(diff.load_numbers(p)) for p in parts])"
+    )
+    sizes = []
+    for seed in ["1", "2"]:
+        proc = subprocess.run(
+            [sys.executable, "-c", script, str(path), str(tmp_path), f"seed{seed}"],
+            cwd=pathlib.Path(__file__).parent.parent, env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True, text=True, check=True,
+        )
+        sizes.append(proc.stdout)
+    assert sizes[0] == sizes[1]
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl", "columnar"])
+def test_diff_files_formats_and_partitions(tmp_path, fmt):
+    old_rows = [_row(f"Item {i}", float(i), page=i // 10) for i in range(200)]
+    new_rows = [_row(f"Item {i}", float(i) + (i % 7 == 0), page=i // 10 + 1) for i in range(1, 201)]
+    paths = [_write(tmp_path / f"{name}.{fmt}", fmt, rows) for name, rows in [("old", old_rows), ("new", new_rows)]]
+
+    def run(partitions):
+        summary = DiffSummary()
+        records = list(diff_files(*paths, page_tolerance=1, partitions=partitions, summary=summary))
+        return summary.counts, sorted(json.dumps(r, sort_keys=True) for r in records)
+
+    counts, records = run(1)
+    assert counts == {"unchanged": 171, "changed": 28, "added": 1, "removed": 1}
+    assert run(7) == (counts, records)
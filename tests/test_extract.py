@@ -1,20 +1,49 @@
 """Tests for the extraction pipeline — exercises public functions without needing PDF files."""
 
+import random
+import re
+
 import pytest
 
 from patterns import (
+    BARE,
+    DOLLAR,
+    HEADER_UNIT,
+    INLINE_BARE_PATTERN,
+    INLINE_DOLLAR_PATTERN,
+    NUMBER_PATTERN,
+    TOKEN_PATTERN,
+    _HEADER_UNIT_TAILS,
+    _mult_alt,
+    _mult_words,
+    _expand_spellings,
+    _find_header_multiplier_memo,
     find_header_multiplier,
+    header_multiplier,
+    header_multiplier_cache_info,
+    is_number,
+    parse_cell_number,
     parse_number,
     resolve_multiplier,
+    strip_header_units,
+    tokenize,
 )
 from extract import (
     extract_from_pages,
     extract_from_table,
     extract_from_text,
     extract_inline_numbers,
+    MultiplierIndex,
+    PageView,
+    TableAnalysis,
+    _page_chunks,
+    _page_ranges,
     mult_for_y,
+    page_bound,
     resolve_column_headers,
+    triage_page,
 )
+from results import TopK
 
 
 # --- parse_number (T3: parametrized) ---
@@ -67,6 +96,91 @@ def test_resolve_multiplier(text, expected):
 ])
 def test_find_header_multiplier(text, expected):
     assert find_header_multiplier(text) == expected
+    assert header_multiplier(tokenize(text)) == expected
+
+
+def test_find_header_multiplier_priority_beats_position():
+    assert find_header_multiplier("Cash ($M) ... (Dollars in Thousands)") == ("Thousand", 1_000)
+
+
+def test_find_header_multiplier_memo_counters():
+    _find_header_multiplier_memo.cache_clear()
+    find_header_multiplier("Revenue ($M)")
+    find_header_multiplier("Revenue ($M)")
+    info = header_multiplier_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    # Long texts bypass the memo
+    find_header_multiplier("x" * 1000 + " ($M)")
+    assert header_multiplier_cache_info().misses == 1
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    (r"thousands?|k", ["thousand", "thousands", "k"]),
+    (r"m", ["m"]),
+    (r"mil+ions?", None),
+])
+def test_expand_spellings(pattern, expected):
+    assert _expand_spellings(pattern) == expected
+
+
+# --- tokenize (single-pass lexer) ---
+
+class TestTokenize:
+    def test_kinds_and_offsets(self):
+        text = "Cash ($M): $9.6 billion, about 2.0 million (Dollars in Thousands)"
+        tokens = tokenize(text)
+        assert [t.kind for t in tokens] == [HEADER_UNIT, DOLLAR, BARE, HEADER_UNIT]
+        assert [text[t.start:t.end] for t in tokens] == [
+            "($M)", "$9.6 billion", "2.0 million", "(Dollars in Thousands)",
+        ]
+        assert [t.number for t in tokens] == [None, "9.6", "2.0", None]
+
+    def test_header_priority_beats_position(self):
+        """An earlier HEADER_UNIT_PATTERNS entry wins even if it appears later."""
+        tokens = tokenize("Cash ($M) ... (Dollars in Thousands)")
+        assert header_multiplier(tokens) == ("Thousand", 1_000)
+
+    def test_bare_inside_dollar_not_emitted(self):
+        tokens = tokenize("$1,234.5 million")
+        assert [(t.kind, t.number) for t in tokens] == [(DOLLAR, "1,234.5")]
+
+    def test_no_tokens(self):
+        assert tokenize("no numbers here") == []
+
+
+# The backtracking-prone spellings these patterns had before they were made
+# linear-time; the rewrites must match exactly the same spans and groups.
+_REFERENCE_PATTERNS = {
+    "dollar": (INLINE_DOLLAR_PATTERN, re.compile(rf"\$\s*([\d,]+\.?\d*)\s*({_mult_alt})\b", re.IGNORECASE)),
+    "bare": (INLINE_BARE_PATTERN, re.compile(rf"([\d,]+\.?\d*)\s+({_mult_words})\b", re.IGNORECASE)),
+    "number": (NUMBER_PATTERN, re.compile(r"^\s*(\(?)\s*([\d,]+\.?\d*)\s*(\)?)\s*$")),
+    "token": (TOKEN_PATTERN, re.compile(
+        r"[($\d,](?:(?<=\()(?:" + "|".join(f"({tail})" for tail in _HEADER_UNIT_TAILS)
+        + rf")|(?<=\$)(\s*([\d,]+\.?\d*)\s*({_mult_alt})\b)|(?<=[\d,])(([\d,]*\.?\d*)\s+({_mult_words})\b))",
+        re.IGNORECASE,
+    )),
+}
+_FUZZ_PIECES = ["1", "23", ",", ".", " ", "\n", "$", "(", ")", "m", "M", "b", "million", "Billion",
+                "thousands", "in", "Dollars", "x", "s"]
+
+
+@pytest.mark.parametrize("name", list(_REFERENCE_PATTERNS))
+def test_linear_patterns_match_reference(name):
+    pattern, reference = _REFERENCE_PATTERNS[name]
+    rng = random.Random(name)
+    for _ in range(20_000):
+        text = "".join(rng.choice(_FUZZ_PIECES) for _ in range(rng.randint(1, 12)))
+        found = [(m.span(), m.groups()) for m in pattern.finditer(text)]
+        expected = [(m.span(), m.groups()) for m in reference.finditer(text)]
+        assert found == expected, text
+
+
+@pytest.mark.parametrize("text", [
+    "1,234", "(48.843)", ".001", "  12  ", "(5", "abc", "", ",", "1.2.3", "( 7 )",
+])
+def test_parse_cell_number_matches_two_step(text):
+    expected = parse_number(text) if is_number(text) else None
+    assert parse_cell_number(text) == expected
 
 
 # --- extract_inline_numbers ---
@@ -299,6 +413,35 @@ class TestResolveColumnHeaders:
         assert resolve_column_headers(rows) is None
 
 
+# --- TableAnalysis ---
+
+class TestTableAnalysis:
+    def test_single_pass_fields(self):
+        rows = [
+            ["($M)", "FY2024", "FY2025"],
+            ["Widget", "1,234.5", "note: $2M\n12"],
+        ]
+        analysis = TableAnalysis(rows)
+        assert analysis.data_start == 1
+        assert analysis.has_data
+        assert analysis.headers == ["($M)", "FY2024", "FY2025"]
+        assert analysis.multiplier == ("Million", 1_000_000)
+        assert analysis.numbers == [[(1, 0, "1,234.5", 1234.5), (2, 1, "12", 12.0)]]
+        # The all-numeric data cell can't hold inline amounts and is left out
+        assert analysis.text_cells == ["($M)", "FY2024", "FY2025", "Widget", "note: $2M\n12"]
+
+    def test_banner_table_has_no_data(self):
+        analysis = TableAnalysis([["Fund: O&M", "Unit: ($ in Thousands)"]])
+        assert not analysis.has_data
+        assert analysis.headers is None
+        assert analysis.multiplier == ("Thousand", 1_000)
+
+    def test_reused_analysis_matches_fresh(self, million_multiplier):
+        rows = [["Item", "FY2024"], ["A", "1.5"], ["B", "$3 million"]]
+        assert extract_from_table(rows, **million_multiplier, analysis=TableAnalysis(rows)) == \
+            extract_from_table(rows, **million_multiplier)
+
+
 # --- mult_for_y (T1/T4) ---
 
 class TestMultForY:
@@ -319,6 +462,39 @@ class TestMultForY:
         assert mult_for_y(positions, 10.0) == ("Thousand", 1_000)
 
 
+# --- MultiplierIndex ---
+
+class TestMultiplierIndex:
+    def test_sorted_declarations(self):
+        index = MultiplierIndex([(10.0, "Thousand", 1_000), (50.0, "Million", 1_000_000)])
+        assert index.lookup(60.0) == ("Million", 1_000_000)
+        assert index.lookup(30.0) == ("Thousand", 1_000)
+        assert index.lookup(5.0) is None
+
+    def test_later_declaration_above_shadows_earlier(self):
+        """A banner promoted after a lower text declaration wins, as in mult_for_y."""
+        positions = [(50.0, "Million", 1_000_000), (10.0, "Thousand", 1_000)]
+        index = MultiplierIndex(positions)
+        assert index.lookup(60.0) == mult_for_y(positions, 60.0) == ("Thousand", 1_000)
+        assert len(index) == 1
+
+    def test_empty(self):
+        assert MultiplierIndex().lookup(10.0) is None
+
+    def test_matches_mult_for_y(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            positions = [
+                (float(rng.randint(0, 20)), f"L{i}", i)
+                for i in range(rng.randint(0, 12))
+            ]
+            index = MultiplierIndex()
+            for n, (y, label, factor) in enumerate(positions, start=1):
+                index.add(y, label, factor)
+                for q in range(-1, 22):
+                    assert index.lookup(float(q)) == mult_for_y(positions[:n], float(q))
+
+
 # --- extract_from_pages (T5: integration) ---
 
 class TestExtractFromPages:
@@ -411,3 +587,94 @@ class TestExtractFromPages:
         assert results[0]["source_type"] == "narrative"
         assert results[0]["adjusted_value"] == 5_200_000_000
         assert results[0]["page"] == 2
+
+    def test_top_prunes_tables_that_cannot_win(self):
+        pages = [{
+            "page_number": 1,
+            "boxes": [
+                self._make_text_box("(Dollars in Millions)", y0=10.0),
+                self._make_table_box([["Item", "FY2023"], ["Jets", "500.0"]], y0=50.0),
+                self._make_table_box([["Item", "FY2023"], ["Ships", "20.0"]], y0=90.0),
+                self._make_text_box("A further $3 billion is requested.", y0=130.0),
+            ],
+        }]
+        full = extract_from_pages(pages, source="test.pdf")
+        top = TopK(1)
+        results = extract_from_pages(pages, source="test.pdf", top=top)
+        assert [n["row_label"] for n in results] == ["Jets", "inline"]  # Ships pruned
+        assert top.items() == [max(full, key=lambda n: abs(n["adjusted_value"]))]
+
+
+# --- PageView ---
+
+class TestPageView:
+    def test_boxes_sorted_and_scans_memoized(self, monkeypatch):
+        page = {"page_number": 3, "boxes": [
+            TestExtractFromPages._make_text_box("$2M later", y0=20.0),
+            TestExtractFromPages._make_text_box("(Dollars in Millions)", y0=10.0),
+        ]}
+        view = PageView(page)
+        assert [b["y0"] for b in view.boxes] == [10.0, 20.0]
+        assert view.declarations() == [(10.0, "Million", 1_000_000)]
+
+        calls = []
+        monkeypatch.setattr("extract.get_box_text", lambda box: calls.append(box) or "")
+        view.scan(0)
+        view.scan(1)
+        assert calls == []  # both scanned once already, by declarations()
+        assert view.scan(1).text == "$2M later"
+
+
+def test_strip_header_units():
+    assert strip_header_units("Procurement ($M)").strip() == "Procurement"
+    assert strip_header_units("(Dollars in Millions)").strip() == ""
+
+
+# --- _page_ranges (parallel layout split) ---
+
+class TestPageRanges:
+    def test_covers_all_pages_in_order(self):
+        ranges = _page_ranges(10, 3)
+        assert len(ranges) == 3
+        assert [p for r in ranges for p in r] == list(range(10))
+
+    def test_more_workers_than_pages(self):
+        assert _page_ranges(2, 8) == [[0], [1]]
+
+    def test_empty_document(self):
+        assert _page_ranges(0, 4) == []
+
+    def test_chunks_are_bounded(self):
+        chunks = _page_chunks(5, 2)
+        assert chunks == [[0, 1], [2, 3], [4]]
+
+
+# --- triage_page (text-layer pre-pass) ---
+
+@pytest.mark.parametrize("text, expected", [
+    ("Item\nFY2024\n1,655.9\n198\n(48.8)\n", "layout"),
+    ("Procurement (Dollars in Millions)\n", "layout"),
+    ("   \n", "layout"),
+    ("The program requests $30.5 billion in FY2025.\n12\n", "narrative"),
+    ("This page intentionally left blank.\n7\n", "skip"),
+])
+def test_triage_page(text, expected):
+    assert triage_page(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Item FY2024\n1,655.9\n(Dollars in Millions)", 1e4 * 1e6),
+    ("Requests $30.5 billion for 12 programs", 1e2 * 1e9),
+    ("Page 7", 10.0),
+    ("   \n", float("inf")),
+])
+def test_page_bound(text, expected):
+    assert page_bound(text) == expected
+
+
+def test_table_analysis_bound():
+    rows = [["Item", "FY2023", "Note"], ["Jets", "500.0", "about $2 billion"], ["(Hours in Thousands)", "75", ""]]
+    analysis = TableAnalysis(rows)
+    assert analysis.bound(1_000_000) == 2e9
+    assert analysis.bound(10_000_000) == 5e9
+    assert TableAnalysis([["Item", "FY2023"]]).bound(1_000_000) == 0.0
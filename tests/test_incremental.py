@@ -0,0 +1,102 @@
+"""Tests for incremental re-extraction against a page manifest."""
+
+import json
+
+import pymupdf
+import pytest
+
+from extract import extract_from_pdf
+from incremental import Manifest, diff_numbers, extract_incremental, page_fingerprints
+from metrics import Metrics
+
+
+@pytest.fixture
+def revisions(make_text_pdf):
+    v1 = make_text_pdf("v1.pdf", ["Alpha: $2 million", "Beta: $5 billion", "Gamma: $7 million"])
+    # Page 2 revised, page 3 deleted, a new page inserted first
+    v2 = make_text_pdf("v2.pdf", ["New: $1 billion", "Alpha: $2 million", "Beta: $6 billion"])
+    return v1, v2
+
+
+def test_fingerprints_follow_content(revisions):
+    v1, v2 = revisions
+    h1, h2 = page_fingerprints(v1), page_fingerprints(v2)
+    assert h1[0] == h2[1]
+    assert h1[1] != h2[2]
+    assert len(set(h1)) == 3
+
+
+def test_fingerprints_follow_xobjects(make_text_pdf, tmp_path):
+    """Pages that only place a form XObject differ when the XObject's text does."""
+    def placed(name, text):
+        src = make_text_pdf(f"src-{name}", [text])
+        doc = pymupdf.open()
+        page = doc.new_page()
+        with pymupdf.open(src) as source:
+            page.show_pdf_page(page.rect, source, 0)
+        doc.save(tmp_path / name)
+        return tmp_path / name
+
+    v1, v2 = placed("v1.pdf", "Alpha: $2 million"), placed("v2.pdf", "Alpha: $3 million")
+    with pymupdf.open(v1) as a, pymupdf.open(v2) as b:
+        assert a[0].read_contents() == b[0].read_contents()
+    assert page_fingerprints(v1) != page_fingerprints(v2)
+    assert page_fingerprints(v1) == page_fingerprints(placed("v1-again.pdf", "Alpha: $2 million"))
+
+    manifest = tmp_path / "m.json"
+    extract_incremental(v1, manifest, backend="native", source="book.pdf")
+    second, delta = extract_incremental(v2, manifest, backend="native", source="book.pdf")
+    assert [n["raw"] for n in second] == ["$3 million"]
+    assert len(delta.changed) == 1
+
+
+def test_reuses_unchanged_pages_and_reports_delta(revisions, tmp_path):
+    v1, v2 = revisions
+    manifest = tmp_path / "book.manifest.json"
+    first, delta = extract_incremental(v1, manifest, backend="native", source="book.pdf")
+    assert first == extract_from_pdf(v1, backend="native", source="book.pdf")
+    assert delta is None  # nothing to compare against yet
+
+    metrics = Metrics()
+    second, delta = extract_incremental(v2, manifest, backend="native", source="book.pdf", metrics=metrics)
+    assert second == extract_from_pdf(v2, backend="native", source="book.pdf")
+    assert metrics.counters["reused_pages"] == 1
+    assert [n["raw"] for n in second][1] == "$2 million" and second[1]["page"] == 2  # moved page renumbered
+    assert len(delta.changed) == 2  # $5 billion -> $1 billion, then $7 million -> $6 billion by key order
+    assert not delta.added and not delta.removed
+    assert Manifest.load(manifest).hashes == page_fingerprints(v2)
+
+
+def test_renamed_revision_reuses_pages(revisions, tmp_path):
+    v1, v2 = revisions  # v1.pdf, then v2.pdf: each run's source is its own file name
+    manifest = tmp_path / "book.manifest.json"
+    extract_incremental(v1, manifest, backend="native")
+    metrics = Metrics()
+    second, delta = extract_incremental(v2, manifest, backend="native", metrics=metrics)
+    assert metrics.counters["reused_pages"] == 1
+    assert second == extract_from_pdf(v2, backend="native")
+    assert {n["source"] for n in second} == {"v2.pdf"}
+    assert len(delta.changed) == 2
+
+
+def test_manifest_from_other_backend_is_ignored(revisions, tmp_path):
+    v1, _ = revisions
+    manifest = tmp_path / "m.json"
+    extract_incremental(v1, manifest, backend="native", source="book.pdf")
+    data = json.loads(manifest.read_text())
+    data["engine"] = "other:0"
+    data["pages"] = [[] for _ in data["pages"]]
+    manifest.write_text(json.dumps(data))
+    results, delta = extract_incremental(v1, manifest, backend="native", source="book.pdf")
+    assert len(results) == 3 and delta is None
+
+
+def test_diff_numbers():
+    def n(label, value, page=1):
+        return {"section": "S", "row_label": label, "column": "FY25", "source_type": "table",
+                "value": value, "multiplier": 1, "multiplier_label": None, "raw": str(value), "page": page}
+
+    delta = diff_numbers([n("A", 1), n("A", 2), n("B", 3)], [n("A", 1), n("A", 9, page=40), n("C", 4)])
+    assert [(old["raw"], new["raw"]) for old, new in delta.changed] == [("2", "9")]
+    assert [x["raw"] for x in delta.added] == ["4"]
+    assert [x["raw"] for x in delta.removed] == ["3"]
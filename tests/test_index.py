@@ -0,0 +1,47 @@
+"""Tests for the SQLite number index."""
+
+import pytest
+
+from index import NumberIndex, ingest
+
+
+def _row(value, section="Procurement", source="a.pdf", multiplier=1_000_000):
+    return {
+        "value": value, "raw": str(value), "multiplier_label": "Million", "multiplier": multiplier,
+        "adjusted_value": value * multiplier, "row_label": "Widget", "column": "FY2025",
+        "section": section, "page": 1, "source": source, "source_type": "table", "context": None,
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    with NumberIndex(tmp_path / "numbers.db") as index:
+        yield index
+
+
+def test_query_filters_and_order(index):
+    index.add("a.pdf", "h1", [_row(5.0), _row(-20.0), _row(1.0, section="RDT&E")])
+    index.add("b.pdf", "h2", [_row(7.0, source="b.pdf")])
+    assert [n["value"] for n in index.query()] == [-20.0, 7.0, 5.0, 1.0]
+    assert [n["value"] for n in index.query(top=2)] == [-20.0, 7.0]
+    assert [n["value"] for n in index.query(min_value=2e6, max_value=6e6)] == [5.0]
+    assert [n["value"] for n in index.query(section="RDT&E")] == [1.0]
+    assert [n["value"] for n in index.query(source="b.pdf")] == [7.0]
+    assert next(index.query(top=1)) == _row(-20.0)
+
+
+def test_add_is_idempotent_per_hash(index):
+    assert index.add("a.pdf", "h1", [_row(1.0), _row(2.0)]) == 2
+    assert index.add("a.pdf", "h1", [_row(1.0), _row(2.0)]) == 0
+    assert index.stats() == {"documents": 1, "numbers": 2}
+    # A revised file replaces what was indexed under its path
+    assert index.add("a.pdf", "h2", [_row(3.0)]) == 1
+    assert index.stats() == {"documents": 1, "numbers": 1}
+    assert [n["value"] for n in index.query()] == [3.0]
+
+
+def test_ingest_skips_unchanged_files(index, make_text_pdf):
+    pdf = make_text_pdf("report.pdf", ["Total funding of $1,234.5 million in FY2025."])
+    assert ingest(index, [pdf], backend="native") == {"indexed": 1, "unchanged": 0, "failed": 0}
+    assert ingest(index, [pdf], backend="native") == {"indexed": 0, "unchanged": 1, "failed": 0}
+    assert [n["adjusted_value"] for n in index.query()] == [1_234_500_000.0]
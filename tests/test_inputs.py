@@ -0,0 +1,79 @@
+"""Tests for in-memory PDF inputs to extract_from_pdf() and friends."""
+
+import io
+import mmap
+
+import pytest
+
+from cache import DiskCache
+from extract import (
+    dump_layout_json,
+    extract_from_pdf,
+    extract_pdf_pages,
+    iter_extract_pdf,
+    layout_pdf,
+    pdf_input,
+    triage_pdf,
+)
+
+
+@pytest.fixture
+def table_pdf(make_table_pdf):
+    """Two pages, each with a multiplier line and a ruled 2x2 table."""
+    return make_table_pdf(values=["1,655.9", "2,000.5"])
+
+
+@pytest.fixture
+def expected(table_pdf):
+    return extract_from_pdf(table_pdf, backend="native")
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview, io.BytesIO], ids=lambda w: w.__name__)
+def test_buffers_match_path(table_pdf, expected, wrap):
+    numbers = extract_from_pdf(wrap(table_pdf.read_bytes()), backend="native", source="table.pdf")
+    assert numbers == expected
+    assert len(numbers) == 2
+
+
+def test_file_objects_and_mmap(table_pdf, expected):
+    with open(table_pdf, "rb") as f:
+        assert extract_from_pdf(f, backend="native") == expected  # source taken from f.name
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert extract_from_pdf(mapped, backend="native", source="table.pdf") == expected
+            assert triage_pdf(mapped) == ["layout", "layout"]
+        # pdf_input() mapped the file itself and unmapped it on exit
+        assert list(iter_extract_pdf(f, backend="native")) == expected.to_list()
+
+
+def test_bytes_have_no_source(table_pdf):
+    numbers = extract_from_pdf(table_pdf.read_bytes(), backend="native")
+    assert {n["source"] for n in numbers} == {None}
+
+
+def test_pdf_input_releases_views(table_pdf):
+    data = bytearray(table_pdf.read_bytes())
+    with pdf_input(data) as view:
+        assert view.nbytes == len(data)
+    data.extend(b"\n")  # resizing fails while a view is exported
+    with pdf_input(table_pdf) as path:
+        assert path == str(table_pdf)
+
+
+def test_bytes_share_cache_with_path(table_pdf, tmp_path):
+    cache = DiskCache(tmp_path / "cache")
+    first = layout_pdf(table_pdf, cache=cache, backend="native")
+    assert cache.misses == 2
+    again = layout_pdf(table_pdf.read_bytes(), cache=cache, backend="native")
+    assert dump_layout_json(again) == dump_layout_json(first)
+    assert cache.hits == 2
+
+
+def test_workers_share_memory(table_pdf, expected):
+    numbers = extract_from_pdf(table_pdf.read_bytes(), workers=2, backend="native", source="table.pdf")
+    assert numbers == expected
+
+
+def test_pages_stream_in_order(table_pdf, expected):
+    pages = list(extract_pdf_pages(table_pdf, backend="native"))
+    assert [[n["page"] for n in page] for page in pages] == [[1], [2]]
+    assert [n for page in pages for n in page] == expected.to_list()
@@ -0,0 +1,41 @@
+"""Tests for the profiling metrics collector."""
+
+import json
+
+from benchmarks.generators import make_pages
+from extract import extract_from_pages
+from metrics import Metrics
+
+
+def test_metrics_do_not_change_results():
+    pages = make_pages(pages=3, table_rows=4, table_cols=3)
+    assert extract_from_pages(pages, "a.pdf", Metrics()) == extract_from_pages(pages, "a.pdf")
+
+
+def test_extract_from_pages_records_pages_boxes_and_counts():
+    pages = make_pages(pages=2, boxes=6, table_rows=4, table_cols=3, density=1.0)
+    metrics = Metrics()
+    results = extract_from_pages(pages, "a.pdf", metrics)
+
+    assert [p["page"] for p in metrics.pages] == [1, 2]
+    assert sum(p["numbers"] for p in metrics.pages) == len(results) == metrics.counters["numbers"]
+    assert metrics.counters["tables"] == 2
+    assert metrics.counters["table_cells"] == 2 * 5 * 3
+    assert metrics.counters["tokens"] > 0
+    assert {c: b["count"] for c, b in metrics.box_classes.items()} == {"section-header": 2, "text": 8, "table": 2}
+    assert all(b["seconds"] >= 0 for b in metrics.box_classes.values())
+
+
+def test_trace_memory_and_write(tmp_path):
+    metrics = Metrics()
+    with metrics.trace_memory():
+        blob = bytearray(1_000_000)
+    del blob
+    assert metrics.peak_memory_bytes >= 1_000_000
+
+    metrics.add_stage("layout", 1.5)
+    metrics.add_stage("layout", 0.5)
+    metrics.write(tmp_path / "profile.json")
+    data = json.loads((tmp_path / "profile.json").read_text())
+    assert data["stages"] == {"layout": 2.0}
+    assert data["peak_memory_bytes"] == metrics.peak_memory_bytes
@@ -0,0 +1,71 @@
+"""Tests for extraction from whole PDFs, built on the fly by the conftest fixtures."""
+
+import json
+import math
+
+import pymupdf
+import pytest
+
+from backends import BACKENDS
+from extract import (
+    _page_bounds,
+    dump_layout_json,
+    extract_from_pages,
+    extract_from_pdf,
+    iter_extract_pdf,
+    largest_in_pdf,
+    layout_pdf,
+)
+
+
+def test_largest_in_pdf_matches_full_extraction(make_text_pdf):
+    path = make_text_pdf(
+        "book.pdf", ["Small: $2 million", "Blank page", "Big: $40 billion and $9 billion", "Mid: $700 million"],
+    )
+    full = sorted(extract_from_pdf(path, backend="native"), key=lambda n: -abs(n["adjusted_value"]))
+    top = largest_in_pdf(path, 2, backend="native")
+    assert top.items() == full[:2]
+
+
+def test_image_pages_are_unbounded_when_the_backend_ocrs(make_text_pdf):
+    path = make_text_pdf("figure.pdf", ["Figure 1: $2 million", "Total: $2 million"])
+    with pymupdf.open(path) as doc:
+        pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 8, 8), False)
+        doc[0].insert_image(pymupdf.Rect(50, 100, 150, 200), pixmap=pixmap)
+        assert _page_bounds(doc, "pymupdf4llm") == [math.inf, _page_bounds(doc, "native")[1]]
+        assert all(bound < math.inf for bound in _page_bounds(doc, "native"))
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_parallel_layout_matches_serial(make_table_pdf, backend):
+    path = make_table_pdf(values=["1,655.9", "2,000.5", "310.0"])
+    serial = layout_pdf(path, backend=backend)
+    assert dump_layout_json(layout_pdf(path, workers=2, backend=backend)) == dump_layout_json(serial)
+    assert dump_layout_json(layout_pdf(path, workers=2, pages=[2, 0], backend=backend)) == dump_layout_json(
+        [serial[2], serial[0]]
+    )
+    assert extract_from_pdf(path, workers=3, backend=backend) == extract_from_pdf(path, backend=backend)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5])
+def test_iter_extract_pdf_matches_extract_from_pdf(make_table_pdf, chunk_size):
+    path = make_table_pdf(values=["1,655.9", "2,000.5", "310.0"])
+    streamed = list(iter_extract_pdf(path, chunk_size=chunk_size, backend="native"))
+    assert streamed == extract_from_pdf(path, backend="native").to_list()
+    assert [n["page"] for n in streamed] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_in_memory_layout_matches_json_round_trip(table_pdf, backend, monkeypatch):
+    """Page dicts straight from the backend extract like their JSON form, and are never decoded."""
+    pages = layout_pdf(table_pdf, backend=backend)
+    round_tripped = json.loads(dump_layout_json(pages))["pages"]
+    expected = extract_from_pages(round_tripped, "table.pdf")
+    assert [n["raw"] for n in expected] == ["1,655.9"]
+
+    def no_decoding(*args, **kwargs):
+        raise AssertionError("layout was decoded from JSON")
+
+    monkeypatch.setattr(json, "loads", no_decoding)
+    assert extract_from_pages(pages, "table.pdf") == expected
+    assert extract_from_pdf(table_pdf, backend=backend) == expected
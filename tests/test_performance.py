@@ -0,0 +1,106 @@
+"""Scaling guards for the extraction hot paths.
+
+These compare timings of the same function at two input sizes rather than
+against absolute budgets, so they hold on slow and fast machines alike. The
+adversarial regex cases are the exception: a backtracking pattern takes hours
+on them, so a generous absolute budget is enough to tell.
+"""
+
+import time
+
+import pytest
+
+from benchmarks.startup import heavy_imports, import_profile
+from extract import extract_inline_numbers
+from patterns import (
+    HEADER_UNIT_PATTERN,
+    INLINE_BARE_PATTERN,
+    INLINE_DOLLAR_PATTERN,
+    NUMBER_PATTERN,
+    TOKEN_PATTERN,
+    strip_header_units,
+)
+
+
+def _best_time(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _dense_mentions_page(n: int) -> str:
+    """Narrative text with n dollar mentions and n bare mentions interleaved."""
+    return " ".join(
+        f"Line {i} funds ${i % 97}.{i % 10} million and about {i % 13}.5 billion units."
+        for i in range(n)
+    )
+
+
+def test_inline_extraction_scales_linearly():
+    small, large = _dense_mentions_page(1_000), _dense_mentions_page(8_000)
+    assert len(extract_inline_numbers(large)) == 16_000
+
+    ratio = _best_time(extract_inline_numbers, large) / _best_time(extract_inline_numbers, small)
+    # 8x the input: linear is ~8x, the old dollar/bare overlap check was ~64x
+    assert ratio < 20, f"8x input took {ratio:.1f}x as long"
+
+
+def test_multiline_cell_scales_linearly():
+    """Big table cells go through the same inline scan."""
+    small = "\n".join(["$5.2 million"] * 1_000)
+    large = "\n".join(["$5.2 million"] * 8_000)
+    ratio = _best_time(extract_inline_numbers, large) / _best_time(extract_inline_numbers, small)
+    assert ratio < 20, f"8x input took {ratio:.1f}x as long"
+
+
+# --- Adversarial text layers ---
+
+_MB = 1 << 20
+# Seconds per pattern per 1 MB input; linear patterns take well under one
+_REGEX_BUDGET = 5.0
+
+
+def _repeat(unit: str) -> str:
+    return (unit * (_MB // len(unit) + 1))[:_MB]
+
+
+# Garbage like broken PDFs produce: long digit, comma, point and space runs,
+# with a lead character or a trailing character that makes every match fail
+_PATHOLOGICAL = {
+    "digit run": "1" * _MB + "x",
+    "dollar digit run": "$" + "1" * _MB + "x",
+    "digits and commas": _repeat("1,") + "x",
+    "digits and points": _repeat("1.") + "x",
+    "digits and spaces": _repeat("1 "),
+    "dollar amounts without units": _repeat("$ 1, "),
+    "number then spaces": "1" + " " * _MB + "x",
+    "padded cell": " ( " + "1" * _MB + " ) x",
+    "open parens": _repeat("(a "),
+}
+_PATTERNS = {
+    "TOKEN_PATTERN": lambda text: sum(1 for _ in TOKEN_PATTERN.finditer(text)),
+    "INLINE_DOLLAR_PATTERN": lambda text: sum(1 for _ in INLINE_DOLLAR_PATTERN.finditer(text)),
+    "INLINE_BARE_PATTERN": lambda text: sum(1 for _ in INLINE_BARE_PATTERN.finditer(text)),
+    "NUMBER_PATTERN": NUMBER_PATTERN.match,
+    "HEADER_UNIT_PATTERN": lambda text: sum(1 for _ in HEADER_UNIT_PATTERN.finditer(text)),
+    "strip_header_units": strip_header_units,
+}
+
+
+@pytest.mark.parametrize("case", list(_PATHOLOGICAL))
+def test_patterns_linear_on_adversarial_input(case):
+    text = _PATHOLOGICAL[case]
+    for name, run in _PATTERNS.items():
+        elapsed = _best_time(run, text, repeat=1)
+        assert elapsed < _REGEX_BUDGET, f"{name} took {elapsed:.1f}s on 1 MB of {case}"
+
+
+@pytest.mark.parametrize("module", ["extract", "main", "daemon"])
+def test_cold_import_skips_pdf_engine(module):
+    """Post-processing tools and the daemon client never open a PDF themselves."""
+    profile = import_profile(module)
+    assert module in profile
+    assert heavy_imports(profile) == []
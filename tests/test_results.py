@@ -0,0 +1,117 @@
+"""Tests for the columnar ExtractionResult store."""
+
+import io
+import pickle
+
+import pytest
+
+from results import ExtractionResult, TopK
+
+
+def _row(**overrides):
+    row = {
+        "value": 1.5, "raw": "1.5", "multiplier_label": "Million", "multiplier": 1_000_000,
+        "row_label": "Widget", "column": "FY2023", "source_type": "table",
+        "section": "Procurement", "page": 3, "source": "budget.pdf", "context": None,
+    }
+    row.update(overrides)
+    return row
+
+
+class TestExtractionResult:
+    def test_rows_materialize_as_dicts(self):
+        result = ExtractionResult()
+        result.append(**_row())
+        assert len(result) == 1
+        assert result[0] == {**_row(), "adjusted_value": 1_500_000.0}
+        assert result[-1] == result[0]
+
+    def test_equals_list(self):
+        result = ExtractionResult()
+        assert result == []
+        result.append(**_row())
+        assert result == [{**_row(), "adjusted_value": 1_500_000.0}]
+        assert result != []
+
+    def test_none_page_round_trips(self):
+        result = ExtractionResult()
+        result.append(**_row(page=None, section=None))
+        assert result[0]["page"] is None
+        assert result[0]["section"] is None
+
+    def test_repeated_strings_stored_once(self):
+        result = ExtractionResult()
+        for i in range(100):
+            result.append(**_row(value=float(i), raw=str(i)))
+        assert result.categories["section"].values == ["Procurement"]
+        assert len(result.categories["section"].codes) == 100
+
+    def test_extend_from_result_remaps_categories(self):
+        a, b = ExtractionResult(), ExtractionResult()
+        a.append(**_row(section="A"))
+        b.append(**_row(section="B"))
+        b.append(**_row(section="A"))
+        a.extend(b)
+        assert [r["section"] for r in a] == ["A", "B", "A"]
+        assert a.categories["section"].values == ["A", "B"]
+
+    def test_extend_from_dicts(self):
+        rows = [{**_row(), "adjusted_value": 1_500_000.0}]
+        assert ExtractionResult(rows) == rows
+
+    def test_adjusted_values_column(self):
+        result = ExtractionResult([{**_row(value=2.0, multiplier=1_000), "adjusted_value": 2000.0}])
+        assert list(result.adjusted_values()) == [2000.0]
+
+    def test_index_out_of_range(self):
+        with pytest.raises(IndexError):
+            ExtractionResult()[0]
+
+    def test_pickles(self):
+        result = ExtractionResult()
+        result.append(**_row())
+        assert pickle.loads(pickle.dumps(result)) == result
+
+
+def test_dump_load_round_trip():
+    result = ExtractionResult([_row(), _row(page=None, section=None, context="ctx"), _row(row_label="Gadget")])
+    stream = io.BytesIO()
+    result.dump(stream)
+    ExtractionResult().dump(stream)
+    stream.seek(0)
+    assert ExtractionResult.load(stream) == result
+    assert ExtractionResult.load(stream) == []
+    assert ExtractionResult.load(stream) is None
+
+
+class TestTopK:
+    def test_keeps_largest_magnitudes(self):
+        values = [3.0, -9.0, 1.0, 7.0, 2.0, -4.0]
+        result = ExtractionResult([_row(value=v, raw=str(v)) for v in values])
+        top = TopK(3)
+        top.extend(result)
+        assert [n["value"] for n in top.items()] == [-9.0, 7.0, -4.0]
+        assert top.floor == 4_000_000.0
+
+    def test_floor_before_full_and_offer(self):
+        top = TopK(2)
+        assert top.floor == float("-inf")
+        top.offer({**_row(value=2.0), "adjusted_value": 2_000_000.0})
+        assert top.floor == float("-inf") and len(top) == 1
+
+    def test_ties_keep_earliest(self):
+        result = ExtractionResult([_row(value=5.0, raw=raw) for raw in ["a", "b", "c"]])
+        top = TopK(2)
+        top.extend(result)
+        assert [n["raw"] for n in top.items()] == ["a", "b"]
+
+    def test_extend_from_offset(self):
+        result = ExtractionResult([_row(value=v) for v in [100.0, 1.0, 2.0]])
+        top = TopK(1)
+        top.extend(result, start=1)
+        assert top.items()[0]["value"] == 2.0
+
+    def test_rejects_k_below_one(self):
+        with pytest.raises(ValueError):
+            TopK(0)
+
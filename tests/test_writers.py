@@ -0,0 +1,91 @@
+"""Tests for the streaming output writers."""
+
+import csv
+import io
+import json
+
+import pytest
+
+from results import ExtractionResult
+from writers import (
+    FIELDS,
+    ColumnarWriter,
+    CsvWriter,
+    JsonlWriter,
+    JsonWriter,
+    MarkdownWriter,
+    iter_columnar,
+    open_writer,
+    read_columnar,
+)
+
+
+def _rows(n=5):
+    return [
+        {
+            "value": 1.5 * i, "raw": f"{1.5 * i}", "multiplier_label": "Million" if i % 2 else None,
+            "multiplier": 1_000_000 if i % 2 else 1, "adjusted_value": 1.5 * i * (1_000_000 if i % 2 else 1),
+            "row_label": f"Widget {i % 2}", "column": "FY2025", "section": None if i == 3 else "Procurement",
+            "page": None if i == 4 else i, "source": "budget.pdf", "source_type": "table",
+            "context": "ünïcode" if i == 2 else None,
+        }
+        for i in range(n)
+    ]
+
+
+def _write(writer_cls, rows, **kwargs):
+    stream = io.BytesIO() if writer_cls is ColumnarWriter else io.StringIO()
+    writer = writer_cls(stream, **kwargs)
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    return stream.getvalue()
+
+
+def test_jsonl():
+    out = _write(JsonlWriter, _rows())
+    assert [json.loads(line) for line in out.splitlines()] == _rows()
+
+
+@pytest.mark.parametrize("n", [0, 1, 5])
+def test_json_matches_dumps(n):
+    assert _write(JsonWriter, _rows(n)) == json.dumps(_rows(n), indent=2)
+
+
+def test_csv():
+    rows = list(csv.DictReader(io.StringIO(_write(CsvWriter, _rows()))))
+    assert list(rows[0]) == FIELDS
+    assert rows[3]["section"] == "" and rows[2]["context"] == "ünïcode"
+    assert [float(r["adjusted_value"]) for r in rows] == [r["adjusted_value"] for r in _rows()]
+
+
+def test_markdown():
+    out = _write(MarkdownWriter, _rows(2))
+    assert out.startswith("# Extracted Numbers\n\n- **0.0** (x1) — Widget 0 / FY2025 [page 0, Procurement]")
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 100])
+def test_columnar_round_trip(chunk_rows):
+    data = _write(ColumnarWriter, _rows(), chunk_rows=chunk_rows)
+    chunks = list(iter_columnar(io.BytesIO(data)))
+    assert len(chunks) == -(-5 // chunk_rows)
+    result = ExtractionResult()
+    for chunk in chunks:
+        result.extend(chunk)
+    assert result == _rows()
+
+
+def test_columnar_rejects_other_files():
+    with pytest.raises(ValueError, match="not a columnar"):
+        list(iter_columnar(io.BytesIO(b'{"value": 1}\n')))
+
+
+def test_open_writer_files(tmp_path):
+    for fmt in ["columnar", "csv"]:
+        writer = open_writer(fmt, tmp_path / f"out.{fmt}")
+        for row in _rows():
+            writer.write(row)
+        writer.close()
+    assert read_columnar(tmp_path / "out.columnar") == _rows()
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 5
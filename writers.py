@@ -0,0 +1,176 @@
+"""Streaming output formats for extracted numbers.
+
+Each writer takes numbers one at a time and writes them out as it goes, so a
+run never holds a second copy of its results just to serialize them:
+
+- jsonl: one JSON object per line
+- json: one indented JSON array, byte-identical to json.dumps(rows, indent=2)
+- csv: a header row, then one row per number (None as an empty cell)
+- markdown: the readable "# Extracted Numbers" list written by main.py --debug
+- columnar: binary chunks of typed columns (see ExtractionResult.dump()),
+  read back with read_columnar()
+"""
+
+import csv
+import json
+import os
+import sys
+import textwrap
+from collections.abc import Iterator
+from typing import IO, BinaryIO, Protocol
+
+from results import ExtractedNumber, ExtractionResult
+
+FIELDS = list(ExtractedNumber.__annotations__)
+COLUMNAR_MAGIC = b"NUMCOL1\n"
+COLUMNAR_CHUNK_ROWS = 65_536
+
+
+class ResultWriter(Protocol):
+    def write(self, number: ExtractedNumber) -> None:
+        ...
+
+    def close(self) -> None:
+        """Flush buffered rows and close the stream if the writer opened it."""
+        ...
+
+
+class _StreamWriter:
+    """Shared plumbing: a stream, closed on close() only if we opened it."""
+
+    def __init__(self, stream: IO, owned: bool = False):
+        self.stream = stream
+        self.owned = owned
+
+    def close(self) -> None:
+        self._finish()
+        if self.owned:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def _finish(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JsonlWriter(_StreamWriter):
+    def write(self, number: ExtractedNumber) -> None:
+        self.stream.write(json.dumps(number) + "\n")
+
+
+class JsonWriter(_StreamWriter):
+    def __init__(self, stream: IO, owned: bool = False):
+        super().__init__(stream, owned)
+        self.count = 0
+
+    def write(self, number: ExtractedNumber) -> None:
+        self.stream.write(",\n" if self.count else "[\n")
+        self.stream.write(textwrap.indent(json.dumps(number, indent=2), "  "))
+        self.count += 1
+
+    def _finish(self) -> None:
+        self.stream.write("\n]" if self.count else "[]")
+
+
+class CsvWriter(_StreamWriter):
+    def __init__(self, stream: IO, owned: bool = False):
+        super().__init__(stream, owned)
+        self.writer = csv.DictWriter(stream, FIELDS, lineterminator="\n")
+        self.writer.writeheader()
+
+    def write(self, number: ExtractedNumber) -> None:
+        self.writer.writerow(number)
+
+
+class MarkdownWriter(_StreamWriter):
+    def __init__(self, stream: IO, owned: bool = False):
+        super().__init__(stream, owned)
+        stream.write("# Extracted Numbers\n")
+
+    def write(self, number: ExtractedNumber) -> None:
+        self.stream.write("\n" + format_markdown(number))
+
+
+class ColumnarWriter(_StreamWriter):
+    """Buffers up to chunk_rows numbers in an ExtractionResult, then dumps them as one chunk."""
+
+    def __init__(self, stream: BinaryIO, owned: bool = False, chunk_rows: int = COLUMNAR_CHUNK_ROWS):
+        super().__init__(stream, owned)
+        self.chunk_rows = chunk_rows
+        self.buffer = ExtractionResult()
+        stream.write(COLUMNAR_MAGIC)
+
+    def write(self, number: ExtractedNumber) -> None:
+        self.buffer.extend([number])
+        if len(self.buffer) >= self.chunk_rows:
+            self._flush_chunk()
+
+    def _flush_chunk(self) -> None:
+        self.buffer.dump(self.stream)
+        self.buffer = ExtractionResult()
+
+    def _finish(self) -> None:
+        if len(self.buffer):
+            self._flush_chunk()
+
+
+WRITERS: dict[str, type[_StreamWriter]] = {
+    "jsonl": JsonlWriter,
+    "json": JsonWriter,
+    "csv": CsvWriter,
+    "markdown": MarkdownWriter,
+    "columnar": ColumnarWriter,
+}
+_BINARY = {"columnar"}
+
+
+def open_writer(fmt: str, path: str | os.PathLike) -> ResultWriter:
+    """Open a writer for a format name on a file path, or on stdout for "-"."""
+    binary = fmt in _BINARY
+    if os.fspath(path) == "-":
+        return WRITERS[fmt](sys.stdout.buffer if binary else sys.stdout)
+    if binary:
+        return WRITERS[fmt](open(path, "wb"), owned=True)
+    # newline="" lets the csv module control line endings
+    return WRITERS[fmt](open(path, "w", encoding="utf-8", newline=""), owned=True)
+
+
+def iter_columnar(stream: BinaryIO) -> Iterator[ExtractionResult]:
+    """Yield each chunk of a columnar file in order."""
+    if stream.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("not a columnar numbers file")
+    while (chunk := ExtractionResult.load(stream)) is not None:
+        yield chunk
+
+
+def read_columnar(path: str | os.PathLike) -> ExtractionResult:
+    """Load a whole columnar file written by ColumnarWriter."""
+    result = ExtractionResult()
+    with open(path, "rb") as f:
+        for chunk in iter_columnar(f):
+            result.extend(chunk)
+    return result
+
+
+def format_markdown(n: ExtractedNumber) -> str:
+    """One number as a markdown list item, with its context quoted below."""
+    if n.get("multiplier"):
+        mult = f"x{n['multiplier']:,}"
+        adj = f", adjusted={n['adjusted_value']:,.0f}" if n.get("adjusted_value") else ""
+    else:
+        mult = "NO MULTIPLIER"
+        adj = ""
+    line = (
+        f"- **{n['raw']}** ({mult}{adj}) — "
+        f"{n['row_label']} / {n['column']} "
+        f"[page {n['page']}, {n['section']}]"
+    )
+    if n.get("context"):
+        line += f"\n  > ...{n['context']}..."
+    return line